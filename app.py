@@ -1,26 +1,60 @@
-from flask import Flask, request, jsonify, render_template
-import requests
-import os
-from dotenv import load_dotenv
-from utils import excel_handler as eh 
-import streamlit as st
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context, g
+import json
+import time
+from utils import llm_client, metrics, settings
+from utils.session_store import create_session_store
+from utils.question_bank import get_bank
 
 # Load environment variables
-load_dotenv()
+settings.load_env()
 
 app = Flask(__name__)
 
-try:
-    import streamlit as st
-    GEMINI_API_KEY = st.secrets["GEMINI_API_KEY"]
-except (ImportError, KeyError):
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# GEMINI_API_KEY is resolved by the shared client on the first Gemini call
+# (secrets.toml / .env via utils.settings), so startup does not import Streamlit.
+GEMINI_MODEL = "gemini-1.5-flash-001"
 
-# GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or st.secrets["GEMINI_API_KEY"]
-GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-001:generateContent"
+# Session storage: SESSION_STORE=memory (LRU + idle TTL) or sqlite (shared across workers)
+sessions = create_session_store()
+
+# Fallback set, used while the question bank has too few questions for the requested skills
+QUESTIONS = [
+    "Explain the use of VLOOKUP in Excel.",
+    "How would you use conditional formatting?",
+    "What is the purpose of pivot tables?",
+    "How do you protect cells or a worksheet?",
+    "Describe how to create a chart based on a dataset."
+]
+DEFAULT_KEYWORDS = ["vlookup", "conditional formatting", "pivot tables", "worksheet protection", "charts"]
+NUM_QUESTIONS = len(QUESTIONS)
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_seconds", "Flask request time (streamed responses: until the stream starts)",
+    ["route", "method", "status"],
+)
+
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    start = g.pop("request_start", None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start, route=route, method=request.method, status=str(response.status_code)
+        )
+    return response
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint (LLM, store, backup and request timings of this process)."""
+    return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE)
 
-# In-memory session storage
-sessions = {}
 
 @app.route('/')
 def home():
@@ -29,87 +63,171 @@ def home():
 @app.route('/start', methods=['POST'])
 def start():
     session_id = request.json.get('session_id')
-    sessions[session_id] = {
+    try:
+        yoe = int(request.json.get('yoe') or 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "yoe must be a whole number of years"}), 400
+    # Draw this session's questions from the bank (no Gemini call on the request path)
+    picked = get_bank().assemble(
+        request.json.get('keywords') or DEFAULT_KEYWORDS,
+        max(yoe, 0),
+        NUM_QUESTIONS,
+        seed=session_id,
+    )
+    sessions.put(session_id, {
         "questions_asked": 0,
         "score": 0,
-        "transcript": []
-    }
+        "transcript": [],
+        # Bank ids keep the session record small; None means the QUESTIONS fallback
+        "question_ids": [q["question_id"] for q in picked] if len(picked) == NUM_QUESTIONS else None,
+    })
     return jsonify({"message": "Interview started! Ready for the first question."})
 
 @app.route('/question', methods=['GET'])
 def question():
     session_id = request.args.get('session_id')
-    if session_id not in sessions:
+    session = sessions.get(session_id)
+    if session is None:
         return jsonify({"error": "Invalid session"}), 400
     
-    questions = [
-        "Explain the use of VLOOKUP in Excel.",
-        "How would you use conditional formatting?",
-        "What is the purpose of pivot tables?",
-        "How do you protect cells or a worksheet?",
-        "Describe how to create a chart based on a dataset."
-    ]
-    
-    q_index = sessions[session_id]["questions_asked"]
-    if q_index >= len(questions):
+    q_index = session["questions_asked"]
+    if q_index >= NUM_QUESTIONS:
         return jsonify({"message": "No more questions"}), 200
     
-    question_text = questions[q_index]
-    sessions[session_id]["current_question"] = question_text
-    return jsonify({"question": question_text})
+    # Store only the index; the text is looked up from the bank / QUESTIONS
+    session["current_question"] = q_index
+    sessions.put(session_id, session)
+    # Clients send the index back with their answer so a retried submission is recorded once
+    return jsonify({"question": _current_question(session), "index": q_index})
+
+def _evaluation_prompt(question, answer_text):
+    return f"Question: {question}\nAnswer: {answer_text}\nEvaluate this answer. Is it correct, partially correct, or incorrect? Provide feedback."
+
+
+def _current_question(session):
+    q_index = session.get("current_question")
+    if not isinstance(q_index, int) or q_index >= NUM_QUESTIONS:
+        return None
+    question_ids = session.get("question_ids")
+    if question_ids:
+        return get_bank().text(question_ids[q_index])
+    return QUESTIONS[q_index]
+
+
+def _answered_feedback(session, question_index):
+    """Recorded feedback when question_index was already answered (a retried submission), else None."""
+    if not isinstance(question_index, int) or isinstance(question_index, bool):
+        return None
+    transcript = session["transcript"]
+    if 0 <= question_index < len(transcript):
+        return transcript[question_index]["feedback"]
+    return None
+
+
+def _record_answer(session_id, session, question, answer_text, feedback):
+    """Commit one answered question to the session transcript."""
+    session["questions_asked"] += 1
+    session["transcript"].append({
+        "question": question,
+        "answer": answer_text,
+        "feedback": feedback
+    })
+    sessions.put(session_id, session)
+
 
 @app.route('/answer', methods=['POST'])
 def answer():
     session_id = request.json.get('session_id')
     answer_text = request.json.get('answer')
     
-    if session_id not in sessions:
+    session = sessions.get(session_id)
+    if session is None:
         return jsonify({"error": "Invalid session"}), 400
-    
-    session = sessions[session_id]
-    question = session.get("current_question")
+
+    recorded = _answered_feedback(session, request.json.get('question_index'))
+    if recorded is not None:
+        return jsonify({"feedback": recorded})
+
+    question = _current_question(session)
     
     # Prepare prompt for Gemini
-    prompt = f"Question: {question}\nAnswer: {answer_text}\nEvaluate this answer. Is it correct, partially correct, or incorrect? Provide feedback."
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {GEMINI_API_KEY}"
-    }
-    data = {
-        "contents": [
-            {
-                "parts": [
-                    {
-                        "text": prompt
-                    }
-                ]
-            }
-        ],
-        "temperature": 0.7
-    }
-    
-    response = requests.post(GEMINI_URL, json=data, headers=headers)
-    result = response.json()
+    prompt = _evaluation_prompt(question, answer_text)
+
+    try:
+        result = llm_client.get_client().generate_rest(
+            prompt, model=GEMINI_MODEL, generation_config={"temperature": 0.7}
+        )
+    except Exception as e:
+        # Nothing is recorded; the page shows the error and the candidate can resend the answer
+        return jsonify({"error": f"Could not evaluate the answer: {e}"}), 502
     feedback = result.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "No feedback available.")
     
     # Update session
-    session["questions_asked"] += 1
-    session["transcript"].append({
-        "question": question,
-        "answer": answer_text,
-        "feedback": feedback
-    })
+    _record_answer(session_id, session, question, answer_text, feedback)
     
     return jsonify({"feedback": feedback})
 
+
+def _sse(data: dict, event: str = None):
+    """Format one Server-Sent Events frame."""
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.route('/answer/stream', methods=['POST'])
+def answer_stream():
+    """
+    Same as /answer but streams feedback tokens as Server-Sent Events:
+      data: {"token": "..."}            (repeated)
+      event: done / data: {"feedback": "<full text>"}
+    The full feedback is committed to the session transcript only once the stream completes.
+    If Gemini fails mid-stream an `event: error` frame ends the stream, and a client that
+    disconnects stops it; nothing is recorded in either case, so the client can retry the
+    same answer with /answer. Sending question_index (from /question) makes that retry
+    idempotent: an index that is already answered gets its recorded feedback back.
+    """
+    session_id = request.json.get('session_id')
+    answer_text = request.json.get('answer')
+
+    session = sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Invalid session"}), 400
+
+    recorded = _answered_feedback(session, request.json.get('question_index'))
+    if recorded is not None:
+        return Response(_sse({"feedback": recorded}, event="done"), mimetype="text/event-stream")
+
+    question = _current_question(session)
+    prompt = _evaluation_prompt(question, answer_text)
+
+    def generate():
+        chunks = []
+        try:
+            for token in llm_client.get_client().stream_rest(
+                prompt, model=GEMINI_MODEL, generation_config={"temperature": 0.7}
+            ):
+                chunks.append(token)
+                yield _sse({"token": token})
+        except Exception as e:
+            yield _sse({"error": str(e)}, event="error")
+            return
+        # Not reached when the client disconnects (GeneratorExit at a yield above)
+        feedback = "".join(chunks) or "No feedback available."
+        _record_answer(session_id, session, question, answer_text, feedback)
+        yield _sse({"feedback": feedback}, event="done")
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.route('/end', methods=['GET'])
 def end():
     session_id = request.args.get('session_id')
-    if session_id not in sessions:
-        return jsonify({"error": "Invalid session"}), 400
-    
     session = sessions.pop(session_id)
+    if session is None:
+        return jsonify({"error": "Invalid session"}), 400
 
     # ✅ Save transcript & summary in Excel
     candidate_id = request.args.get('candidate_id')
@@ -118,13 +236,12 @@ def end():
         avg_score = None  # (you can add scoring logic if needed)
         summary = {
             "total_questions": session["questions_asked"],
-            "transcript": session["transcript"],
             "average_score": avg_score
         }
-        eh.update_candidate(candidate_id, {
-            "transcript_json": session["transcript"],
-            "summary_json": summary
-        })
+        # Imported here: the store pulls in pandas, which only /end needs
+        from utils import excel_handler as eh
+        # Answers are stored as rows of the interview, not repeated inside the summary
+        eh.record_interview(candidate_id, session["transcript"], summary, keep_history=False)
 
     # ✅ Only send clean message to frontend
     return jsonify({
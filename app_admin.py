@@ -1,78 +1,146 @@
 import streamlit as st
-from utils import excel_handler as eh
-import json
-import pandas as pd
+from utils import analytics
+from utils import ui_cache
+from utils import question_generator as qg
+from utils import metrics
+import datetime
 import math
+import os
+import requests
 
 
 st.set_page_config(page_title="Admin Dashboard - AI Interviewer", layout="wide")
 st.title("🛠️ Admin Dashboard - AI Excel Mock Interviewer")
 
-def _safe_load_field(val, default=None):
-    if default is None:
-        default = []
-    if val is None:
-        return default
-    if isinstance(val, float):
-        try:
-            if math.isnan(val):
-                return default
-        except Exception:
-            pass
-    if isinstance(val, str):
-        if val.strip() == "":
-            return default
-        try:
-            return json.loads(val)
-        except Exception:
-            return default
-    if isinstance(val, (list, dict)):
-        return val
-    return default
-
-candidates_df = eh._load_candidates()
-# Add filter before building candidate list
-filter_status = st.radio("Filter candidates by status", ["All", "Completed", "Pending"])
-if filter_status != "All":
-    candidates_df = candidates_df[candidates_df["status"] == filter_status.lower()]
+PAGE_SIZE = 50
+LIST_COLUMNS = ["candidate_id", "name", "email", "tech_stack", "status", "timestamp"]
+
+# --- Cohort analytics (all candidates, computed from one pass over the transcripts)
+# Only loaded on request, so the candidate list below stays a single-page query
+with st.expander("📈 Cohort Analytics", expanded=False):
+    if st.toggle("Compute cohort analytics"):
+        cohort = ui_cache.cohort_summary()
+        if cohort["answers"] == 0:
+            st.info("No evaluated answers yet.")
+        else:
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Candidates", cohort["candidates"])
+            c2.metric("Answers", cohort["answers"])
+            c3.metric("Mean Score", f"{cohort['mean_score']:.2f}")
+            c4.metric("Median Score", f"{cohort['percentiles']['p50']:.1f}")
+            st.caption("Percentiles: " + ", ".join(f"{k}={v:.1f}" for k, v in cohort["percentiles"].items()))
+
+            st.subheader("Score Distribution")
+            st.bar_chart(cohort["distribution"].set_index("score"))
+
+            col_a, col_b = st.columns(2)
+            col_a.subheader("By Keyword")
+            col_a.dataframe(cohort["by_keyword"], hide_index=True)
+            col_b.subheader("By Tech Stack")
+            col_b.dataframe(cohort["by_tech_stack"], hide_index=True)
+
+            st.subheader(f"Pass Rate by YOE (average ≥ {analytics.PASS_MARK:g})")
+            st.dataframe(cohort["by_yoe"], hide_index=True)
+
+# --- Bulk question generation (one Gemini call per candidate profile, one write)
+with st.expander("⚡ Bulk Question Generation", expanded=False):
+    st.caption("Generates questions for every candidate that has none. "
+               "Candidates with the same tech stack, keywords and YOE band share one Gemini call.")
+    if st.button("Generate questions for all candidates"):
+        bar = st.progress(0.0, text="Generating...")
+        result = qg.generate_bulk(
+            progress_callback=lambda done, total: bar.progress(done / total if total else 1.0,
+                                                               text=f"{done}/{total} profile groups")
+        )
+        ui_cache.invalidate()
+        st.success(f"✅ {result['candidates']} candidates updated from {result['groups']} profile groups "
+                   f"({result['reused']} resumed from a previous run).")
+        if result["failed"]:
+            st.error(f"⚠️ {len(result['failed'])} group(s) failed; click again to retry them.")
+
+# --- Timings: Gemini (llm_*, gemini_*) vs disk (store_*, backup_*) vs HTTP (http_*)
+with st.expander("⏱️ Performance Metrics", expanded=False):
+    if st.toggle("Show metrics"):
+        source = st.radio("Process", ["Admin dashboard", "Interview server (/metrics)"], horizontal=True)
+        registry = metrics.REGISTRY
+        if source != "Admin dashboard":
+            url = st.text_input("Metrics URL", os.getenv("METRICS_URL", "http://localhost:5000/metrics"))
+            try:
+                response = requests.get(url, timeout=5)
+                response.raise_for_status()
+                registry = metrics.parse(response.text)
+            except requests.RequestException as e:
+                registry = None
+                st.warning(f"Could not fetch {url}: {e}")
+        rows = registry.summary() if registry is not None else []
+        if rows:
+            st.dataframe(rows, hide_index=True)
+            st.caption("p50/p95 are estimated from histogram buckets.")
+        elif registry is not None:
+            st.info("Nothing measured yet in this process.")
+
+# --- Filters (applied by the store, only the visible page is fetched)
+f1, f2, f3, f4 = st.columns([1, 1, 2, 2])
+filter_status = f1.selectbox("Status", ["All", "Completed", "Pending"])
+filter_stack = f2.selectbox("Tech stack", ["All"] + ui_cache.distinct_values("tech_stack"))
+search = f3.text_input("Search name / email (prefix)")
+date_range = f4.date_input("Interview date", value=(), help="Pick a start and end date")
+
+since = until = None
+if isinstance(date_range, (list, tuple)) and len(date_range) == 2:
+    since = date_range[0].isoformat()
+    until = datetime.datetime.combine(date_range[1], datetime.time.max).isoformat()
+
+filters = dict(
+    status=None if filter_status == "All" else filter_status.lower(),
+    tech_stack=None if filter_stack == "All" else filter_stack,
+    since=since,
+    until=until,
+    prefix=search.strip() or None,
+)
+_, total = ui_cache.query_candidates(**filters, limit=0)
+pages = max(1, math.ceil(total / PAGE_SIZE))
+page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1)
+candidates_df, total = ui_cache.query_candidates(
+    **filters, limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE, columns=LIST_COLUMNS
+)
 
 if candidates_df.empty:
     st.warning("⚠️ No candidates found.")
 else:
-    st.subheader("📋 Candidate List")
-    st.dataframe(candidates_df[["candidate_id", "name", "email", "status", "timestamp"]])
+    st.subheader(f"📋 Candidate List ({total} matching)")
+    st.dataframe(candidates_df, hide_index=True)
 
     candidate_list = candidates_df["candidate_id"].tolist()
     selected_candidate_id = st.selectbox("Select Candidate ID", candidate_list)
 
     if selected_candidate_id:
-        candidate = eh.get_candidate(selected_candidate_id)
+        candidate = ui_cache.get_candidate(selected_candidate_id)
         st.subheader(f"Candidate: {candidate.get('name','-')} ({candidate.get('email','-')})")
 
-        # Prefer last_interview_json (latest single interview)
-        last_raw = candidate.get("last_interview_json", "") or candidate.get("transcript_json", "")
-        last_interview = _safe_load_field(last_raw, default=[])
+        # Latest interview (interview tables, or the legacy JSON columns); tables and
+        # download payloads are built once per data version, not on every rerun
+        try:
+            view = ui_cache.interview_view(selected_candidate_id)
+        except Exception as e:
+            st.error("Unable to construct transcript table: " + str(e))
+            view = {"transcript_df": None, "summary": {}, "history": []}
 
-        if last_interview and isinstance(last_interview, list):
+        if view["transcript_df"] is not None:
             st.subheader("📄 Last Interview Transcript")
-            try:
-                transcript_df = pd.DataFrame(last_interview)
-                st.dataframe(transcript_df)
-                st.download_button(
-                    label="📥 Download Transcript (CSV)",
-                    data=transcript_df.to_csv(index=False).encode("utf-8"),
-                    file_name=f"{selected_candidate_id}_last_transcript.csv",
-                    mime="text/csv"
-                )
-            except Exception as e:
-                st.error("Unable to construct transcript table: " + str(e))
+            st.dataframe(view["transcript_df"])
+            st.download_button(
+                label="📥 Download Transcript (CSV)",
+                data=view["transcript_csv"],
+                file_name=f"{selected_candidate_id}_last_transcript.csv",
+                mime="text/csv"
+            )
         else:
             st.info("No transcript available for the last interview for this candidate.")
 
         # --- Summary (stored per last interview)
-        summary_raw = candidate.get("summary_json", "")
-        summary = _safe_load_field(summary_raw, default={})
-        if isinstance(summary, dict) and summary:
+        summary = view["summary"]
+        if summary:
             st.subheader("📊 Summary (Last Interview)")
             avg = summary.get("average_score")
             st.metric("Average Score", f"{avg:.2f}" if isinstance(avg, (int, float)) else "N/A")
@@ -81,7 +149,7 @@ else:
 
             st.download_button(
                 label="📥 Download Summary (JSON)",
-                data=json.dumps(summary, indent=2),
+                data=view["summary_json"],
                 file_name=f"{selected_candidate_id}_summary.json",
                 mime="application/json"
             )
@@ -89,15 +157,14 @@ else:
             st.info("No summary available for this candidate yet.")
 
         # Optional: show interview history (compact)
-        history_raw = candidate.get("interview_history", "")
-        history = _safe_load_field(history_raw, default=[])
+        history = view["history"]
         if history:
             st.subheader("🕘 Interview History (compact)")
             st.write(history)
             # maybe offer CSV/JSON download
             st.download_button(
                 label="📥 Download Interview History (JSON)",
-                data=json.dumps(history, indent=2),
+                data=view["history_json"],
                 file_name=f"{selected_candidate_id}_history.json",
                 mime="application/json"
             )
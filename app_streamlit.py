@@ -63,9 +63,10 @@
 #             st.text(f"Weaknesses: {', '.join(summary.get('weaknesses', []))}")
 
 import streamlit as st
-from utils import excel_handler as eh
 from utils import question_generator as qg
-from utils import interview_flow as iflow
+from utils import job_queue as jq
+from utils.incremental_eval import IncrementalEvaluator
+from utils import ui_cache
 import json
 import math
 
@@ -97,12 +98,13 @@ def _safe_load_field(val, default=None):
     return default
 
 # --- Step 1: Select Candidate ---
-candidates_df = eh._load_candidates()
+# Cached per data version: reruns triggered by typing an answer don't reload the store
+candidates_df = ui_cache.query_candidates(limit=None, columns=["candidate_id"])[0]
 candidate_list = candidates_df["candidate_id"].tolist()
 selected_candidate_id = st.selectbox("Select Candidate ID", candidate_list)
 
 if selected_candidate_id:
-    candidate = eh.get_candidate(selected_candidate_id)
+    candidate = ui_cache.get_candidate(selected_candidate_id)
     st.subheader(f"Candidate Info: {candidate.get('name','-')} ({candidate.get('email','-')})")
     st.text(f"Tech Stack: {candidate.get('tech_stack','-')}")
     st.text(f"Years of Experience: {candidate.get('yoe','-')}")
@@ -111,7 +113,8 @@ if selected_candidate_id:
     if st.button("Generate Questions"):
         qg.generate_and_store_questions(selected_candidate_id)
         # refresh candidate object
-        candidate = eh.get_candidate(selected_candidate_id)
+        ui_cache.invalidate()
+        candidate = ui_cache.get_candidate(selected_candidate_id)
         st.success("✅ Questions generated and stored in Excel.")
 
     questions_raw = candidate.get("questions_json")
@@ -123,15 +126,41 @@ if selected_candidate_id:
 
     if questions:
         st.subheader("Interview Questions")
+        # Grade each answer in the background as soon as it is edited
+        evaluators = st.session_state.setdefault("evaluators", {})
+        evaluator = evaluators.setdefault(selected_candidate_id, IncrementalEvaluator(selected_candidate_id))
+
         answers = {}
         for idx, q in enumerate(questions):
             q_text = q.get("question") if isinstance(q, dict) else str(q)
-            answers[q_text] = st.text_area(f"Q{idx+1}: {q_text}", height=80)
+            key = f"answer_{selected_candidate_id}_{idx}"
+            answers[q_text] = st.text_area(
+                f"Q{idx+1}: {q_text}", height=80, key=key,
+                on_change=lambda q=q_text, k=key: evaluator.submit(q, st.session_state[k]),
+            )
+
+        progress = evaluator.status()
+        if progress["evaluated"] or progress["pending"]:
+            st.caption(f"📝 {progress['evaluated']} answer(s) pre-evaluated, {progress['pending']} in progress.")
 
         if st.button("Submit Answers & Evaluate"):
-            with st.spinner("Evaluating answers... Please wait ⏳"):
-                transcript = iflow.conduct_interview(selected_candidate_id, answers)
-            st.success("✅ Interview completed. Transcript & summary updated.")
-            st.caption("Detailed transcript & summary are stored and accessible to admin only.")
+            # Evaluation runs in background workers; the page stays responsive.
+            # Answers already graded (same hash) are reused, only the rest are evaluated.
+            jq.submit_interview(selected_candidate_id, answers, precomputed=evaluator.completed())
+            jq.ensure_workers()
+            ui_cache.invalidate()
+            st.success("✅ Answers submitted. Evaluation is running in the background.")
+
+        job = ui_cache.latest_job(selected_candidate_id, kind="interview")
+        if job:
+            if job["status"] in (jq.QUEUED, jq.RUNNING):
+                st.progress(float(job.get("progress") or 0), text=f"Evaluation {job['status']}... ⏳")
+                jq.ensure_workers()  # resume queued work after a restart
+                st.button("🔄 Refresh status")
+            elif job["status"] == jq.DONE:
+                st.success("✅ Interview completed. Transcript & summary updated.")
+                st.caption("Detailed transcript & summary are stored and accessible to admin only.")
+            else:
+                st.error("⚠️ Evaluation failed. Please submit your answers again.")
     else:
         st.info("No questions exist for this candidate. Click 'Generate Questions' to create them.")
@@ -0,0 +1,75 @@
+"""
+Cold-import benchmark for the apps' and CLI tools' entry modules.
+
+Each module is imported in a fresh interpreter (several runs, median reported)
+and checked against benchmarks/import_budget.json: a time budget plus heavy
+packages that must not be loaded at import (Streamlit, the Gemini SDK, pandas...).
+Exits with status 1 when a budget is exceeded.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 9 app utils.job_queue
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET = Path(__file__).resolve().parent / "import_budget.json"
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, heavy: list, runs: int) -> dict:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    samples, loaded = [], []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=heavy)],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(result["seconds"] * 1000)
+        loaded = result["loaded"]
+    return {"median_ms": round(statistics.median(samples), 1), "min_ms": round(min(samples), 1), "loaded": loaded}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import time of entry modules.")
+    parser.add_argument("modules", nargs="*", help="Default: every module in the budget file")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=Path, default=BUDGET)
+    args = parser.parse_args(argv)
+
+    budget = json.loads(args.budget.read_text())
+    failures = []
+    print(f"{'module':<28} {'median':>9} {'min':>9} {'budget':>9}  heavy modules loaded")
+    for module in args.modules or list(budget["modules"]):
+        limits = budget["modules"].get(module, {})
+        forbidden = limits.get("forbid", budget["forbid"])
+        result = measure(module, forbidden, args.runs)
+        limit = limits.get("max_ms")
+        print(f"{module:<28} {result['median_ms']:>7} ms {result['min_ms']:>7} ms "
+              f"{(str(limit) + ' ms') if limit else '-':>9}  {', '.join(result['loaded']) or '-'}")
+        if limit and result["median_ms"] > limit:
+            failures.append(f"{module}: {result['median_ms']} ms > {limit} ms")
+        if result["loaded"]:
+            failures.append(f"{module}: imports {', '.join(result['loaded'])} at startup")
+
+    if failures:
+        print("\n❌ " + "\n❌ ".join(failures))
+        sys.exit(1)
+    print("\n✅ All entry modules within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Load-test harness on the offline Gemini stand-in (utils/fake_llm.py).
+
+Scenarios (each on a fresh store in a temp directory):
+  interviews  N concurrent conduct_interview() calls (evaluation + one store write each)
+  flask       N concurrent /start -> (/question, /answer) x 5 -> /end sessions through the Flask app
+  store       mixed get_candidate / update_candidate traffic through excel_handler
+
+Reports p50/p95/p99 latency, throughput and disk writes per interview (store write calls,
+plus write syscalls/bytes from /proc/self/io where available), and compares them with the
+tracked baseline in benchmarks/baseline.json.
+
+    python benchmarks/load_test.py                    # run all, compare with the baseline
+    python benchmarks/load_test.py interviews --concurrency 16
+    python benchmarks/load_test.py --save-baseline    # record a new baseline
+    python benchmarks/load_test.py store --store excel --write-behind
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+SCENARIOS = ("interviews", "flask", "store")
+NUM_QUESTIONS = 5
+# Metrics compared with the baseline (lower is better except throughput)
+COMPARED = ("p50_ms", "p95_ms", "p99_ms", "throughput_per_s", "store_writes_per_interview")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the interview pipeline against a fake Gemini backend.")
+    parser.add_argument("scenarios", nargs="*", help=f"Any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--interviews", type=int, default=40, help="Interviews / Flask sessions per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--candidates", type=int, default=200, help="Rows in the benchmark store")
+    parser.add_argument("--store-ops", type=int, default=2000)
+    parser.add_argument("--store", choices=("sqlite", "excel"), default="sqlite")
+    parser.add_argument("--write-behind", action="store_true", help="Buffer candidate updates (excel_handler write-behind)")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Median fake Gemini latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Share of calls failing with HTTP 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.02, help="Share of calls failing with HTTP 429")
+    parser.add_argument("--rpm", type=float, default=60000, help="Client-side Gemini rate limit")
+    parser.add_argument("--backoff-base", type=float, default=0.05, help="Retry backoff base (seconds)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    return args
+
+
+def configure_env(args, tmp: Path):
+    """Settings read at import time, so this runs before any utils module is imported."""
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY_MS": str(args.latency_ms),
+        "FAKE_LLM_LATENCY_SIGMA": str(args.latency_sigma),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        "FAKE_LLM_429_RATE": str(args.throttle_rate),
+        "FAKE_LLM_SEED": str(args.seed),
+        "GEMINI_RPM": str(args.rpm),
+        "LLM_BACKOFF_BASE": str(args.backoff_base),
+        "LLM_CACHE": "0",
+        "CANDIDATE_STORE": args.store,
+        "QUESTION_BANK_DB": str(tmp / "question_bank.db"),
+        "JOB_DB": str(tmp / "jobs.db"),
+        "JOB_WORKERS": "0",
+        "SESSION_STORE": "memory",
+    })
+
+
+# ---------- measurement ----------
+def percentiles(latencies: list, wall: float) -> dict:
+    import numpy as np
+    values = np.asarray(latencies, dtype=float) * 1000
+    if values.size == 0:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "mean_ms": round(float(values.mean()), 2),
+        "throughput_per_s": round(values.size / wall, 2) if wall else None,
+    }
+
+
+def _proc_io():
+    """(write syscalls, bytes passed to write()) of this process; None off Linux."""
+    try:
+        fields = dict(line.split(": ") for line in Path("/proc/self/io").read_text().splitlines())
+        return int(fields["syscw"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class WriteCounter:
+    """Counts top-level write calls on a store; writes nested inside another write count once."""
+
+    METHODS = ("save_all", "update", "update_many", "record_interview")
+
+    def __init__(self, store):
+        self.count = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        for name in self.METHODS:
+            if hasattr(store, name):
+                setattr(store, name, self._wrap(getattr(store, name)))
+
+    def _wrap(self, method):
+        def counted(*args, **kwargs):
+            depth = getattr(self._local, "depth", 0)
+            if depth == 0:
+                with self._lock:
+                    self.count += 1
+            self._local.depth = depth + 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._local.depth = depth
+        return counted
+
+
+class Measure:
+    """Wall clock, store writes and process I/O around one scenario."""
+
+    def __init__(self, counter: WriteCounter):
+        self.counter = counter
+
+    def __enter__(self):
+        self._writes = self.counter.count
+        self._io = _proc_io()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self._start
+        self.writes = self.counter.count - self._writes
+        end_io = _proc_io()
+        self.io = (end_io[0] - self._io[0], end_io[1] - self._io[1]) if end_io and self._io else None
+
+    def per(self, n: int) -> dict:
+        out = {"store_writes_per_interview": round(self.writes / n, 2) if n else None}
+        if self.io:
+            out["write_syscalls_per_interview"] = round(self.io[0] / n, 1)
+            out["write_kb_per_interview"] = round(self.io[1] / n / 1024, 1)
+        return out
+
+
+def run_concurrently(fn, items, concurrency: int) -> list:
+    """fn(item) for every item on `concurrency` threads; returns per-item latencies (seconds)."""
+    def timed(item):
+        start = time.perf_counter()
+        fn(item)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(timed, items))
+
+
+# ---------- fixtures ----------
+def make_store(args, tmp: Path, name: str):
+    import pandas as pd
+    from utils import excel_handler as eh
+    from utils.backup import build_policy
+    from utils.storage import ExcelCandidateStore, SQLiteCandidateStore
+
+    questions = [{"question": f"Benchmark question {i + 1} about lookup functions?", "answer": "", "score": None,
+                  "strengths": [], "weaknesses": []} for i in range(NUM_QUESTIONS)]
+    rows = pd.DataFrame([{
+        "candidate_id": f"c{i:05d}",
+        "name": f"Candidate {i}",
+        "email": f"candidate{i}@example.com",
+        "tech_stack": "excel",
+        "keywords": "vlookup, pivot tables",
+        "yoe": str(i % 6),
+        "status": "pending",
+        "timestamp": f"2024-01-{i % 28 + 1:02d}T10:00:00",
+        "questions_json": json.dumps(questions),
+    } for i in range(args.candidates)])
+
+    backup_dir = tmp / f"{name}_backups"
+    if args.store == "excel":
+        path = tmp / f"{name}.xlsx"
+        rows.to_excel(path, index=False)
+        store = ExcelCandidateStore(path, backup_policy=build_policy(eh.BACKUP_POLICY, backup_dir, source=path))
+    else:
+        path = tmp / f"{name}.db"
+        store = SQLiteCandidateStore(path, backup_policy=build_policy(eh.BACKUP_POLICY, backup_dir, source=path))
+        store.save_all(rows)
+    eh.set_store(store)
+    if args.write_behind:
+        eh.enable_write_behind(log_dir=tmp / f"{name}_write_behind")
+    return store, questions
+
+
+def _answers(questions, seed):
+    rng = random.Random(seed)
+    words = "lookup range column table exact match approximate sorted index return value".split()
+    return {q["question"]: " ".join(rng.choice(words) for _ in range(rng.randint(5, 40))) for q in questions}
+
+
+# ---------- scenarios ----------
+def bench_interviews(args, tmp: Path) -> dict:
+    from utils import excel_handler as eh
+    from utils import interview_flow as iflow
+
+    store, questions = make_store(args, tmp, "interviews")
+    counter = WriteCounter(store)
+    ids = [f"c{i % args.candidates:05d}" for i in range(args.interviews)]
+
+    def one(candidate_id):
+        iflow.conduct_interview(candidate_id, _answers(questions, candidate_id))
+
+    with Measure(counter) as m:
+        latencies = run_concurrently(one, ids, args.concurrency)
+        eh.flush_writes()
+    return {**percentiles(latencies, m.wall), **m.per(len(ids))}
+
+
+def bench_flask(args, tmp: Path) -> dict:
+    import app as flask_app
+    from utils import excel_handler as eh
+
+    store, _ = make_store(args, tmp, "flask")
+    counter = WriteCounter(store)
+    routes = {}
+    routes_lock = threading.Lock()
+
+    def call(client, route, method, **kwargs):
+        start = time.perf_counter()
+        response = getattr(client, method)(route, **kwargs)
+        if route == "/answer/stream":
+            response.get_data()  # drain the SSE stream
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            raise RuntimeError(f"{route} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        with routes_lock:
+            routes.setdefault(route, []).append(elapsed)
+        return response
+
+    def session(i):
+        client = flask_app.app.test_client()
+        session_id = f"bench-{i}"
+        answer_route = "/answer/stream" if i % 2 else "/answer"
+        call(client, "/start", "post", json={"session_id": session_id, "yoe": i % 6})
+        for q in range(flask_app.NUM_QUESTIONS):
+            call(client, "/question", "get", query_string={"session_id": session_id})
+            call(client, answer_route, "post", json={"session_id": session_id, "answer": f"answer {i}-{q}"})
+        call(client, "/end", "get", query_string={"session_id": session_id, "candidate_id": f"c{i % args.candidates:05d}"})
+
+    with Measure(counter) as m:
+        latencies = run_concurrently(session, range(args.interviews), args.concurrency)
+        eh.flush_writes()
+    result = {**percentiles(latencies, m.wall), **m.per(args.interviews)}
+    result["routes"] = {route: percentiles(values, m.wall) for route, values in sorted(routes.items())}
+    return result
+
+
+def bench_store(args, tmp: Path) -> dict:
+    from utils import excel_handler as eh
+
+    store, _ = make_store(args, tmp, "store")
+    counter = WriteCounter(store)
+    rng = random.Random(args.seed)
+    ops = [(rng.random() < 0.2, f"c{rng.randrange(args.candidates):05d}") for _ in range(args.store_ops)]
+
+    def one(op):
+        is_write, candidate_id = op
+        if is_write:
+            eh.update_candidate(candidate_id, {"status": "in_progress", "timestamp": time.time()})
+        else:
+            eh.get_candidate(candidate_id)
+
+    with Measure(counter) as m:
+        latencies = run_concurrently(one, ops, args.concurrency)
+        eh.flush_writes()
+    result = percentiles(latencies, m.wall)
+    result["writes"] = sum(1 for is_write, _ in ops if is_write)
+    result["store_writes"] = m.writes
+    return result
+
+
+BENCHMARKS = {"interviews": bench_interviews, "flask": bench_flask, "store": bench_store}
+
+
+# ---------- reporting ----------
+def compare(results: dict, baseline: dict):
+    if baseline.get("config") != results["config"]:
+        print("⚠️ Baseline was recorded with different settings; deltas are indicative only.")
+    for name, current in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        print(f"\n{name} vs baseline:")
+        for metric in COMPARED:
+            if metric in current and before.get(metric):
+                delta = (current[metric] - before[metric]) / before[metric] * 100
+                print(f"  {metric:<28} {before[metric]:>10} -> {current[metric]:>10}  ({delta:+.1f}%)")
+
+
+def report(results: dict):
+    for name, r in results["scenarios"].items():
+        print(f"\n=== {name} ===")
+        for key, value in r.items():
+            if key == "routes":
+                for route, stats in value.items():
+                    print(f"  {route:<16} p50 {stats['p50_ms']:>8} ms  p95 {stats['p95_ms']:>8} ms  "
+                          f"p99 {stats['p99_ms']:>8} ms  ({stats['count']} requests)")
+            else:
+                print(f"  {key:<28} {value}")
+    print(f"\nfake Gemini: {results['llm']}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    tmp = Path(tempfile.mkdtemp(prefix="interview-bench-"))
+    configure_env(args, tmp)
+    from utils import excel_handler as eh
+    from utils import llm_client
+
+    config = {k: v for k, v in vars(args).items() if k not in ("scenarios", "baseline", "save_baseline", "json")}
+    results = {"config": config, "python": platform.python_version(), "scenarios": {}}
+    try:
+        for name in args.scenarios:
+            print(f"Running {name} ...")
+            results["scenarios"][name] = BENCHMARKS[name](args, tmp)
+    finally:
+        eh.disable_write_behind()
+        eh.set_store(None)
+        shutil.rmtree(tmp, ignore_errors=True)
+    results["llm"] = dict(llm_client.get_client().fake.stats)
+
+    report(results)
+    if args.baseline.exists() and not args.save_baseline:
+        compare(results, json.loads(args.baseline.read_text()))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 let session_id = Math.random().toString(36).substring(2);
 let currentQuestion = "";
+let currentIndex = null;
 
 window.onload = () => {
     fetch("/start", {
@@ -17,6 +18,7 @@ function askQuestion() {
     .then(data => {
         if (data.question) {
             currentQuestion = data.question;
+            currentIndex = data.index;
             addMessage("bot", data.question);
         } else {
             addMessage("bot", "Interview finished.");
@@ -33,18 +35,102 @@ function sendAnswer() {
     addMessage("user", answer);
     input.value = "";
     
-    fetch("/answer", {
+    fetch("/answer/stream", {
         method: "POST",
         headers: {"Content-Type": "application/json"},
-        body: JSON.stringify({session_id: session_id, answer: answer})
+        body: JSON.stringify({session_id: session_id, answer: answer, question_index: currentIndex})
     })
-    .then(response => response.json())
-    .then(data => {
-        addMessage("bot", data.feedback);
-        askQuestion();
+    .then(response => {
+        if (!response.ok) {
+            return showError(response);
+        }
+        // Browsers without streaming bodies fall back to the blocking endpoint
+        if (!response.body) {
+            return sendAnswerBlocking(answer);
+        }
+        const div = addMessage("bot", "");
+        return readFeedbackStream(response.body.getReader(), div)
+            .catch(() => false)
+            .then(streamed => {
+                if (streamed) return true;
+                // The stream broke off before its done event; the question index makes the retry
+                // return the recorded feedback if the server had already committed it
+                div.remove();
+                return sendAnswerBlocking(answer);
+            });
+    })
+    .then(answered => {
+        if (answered) askQuestion();
+    })
+    .catch(() => addMessage("bot", "⚠️ Could not reach the server. Please try again."));
+}
+
+function sendAnswerBlocking(answer) {
+    return fetch("/answer", {
+        method: "POST",
+        headers: {"Content-Type": "application/json"},
+        body: JSON.stringify({session_id: session_id, answer: answer, question_index: currentIndex})
+    })
+    .then(response => {
+        if (!response.ok) {
+            return showError(response);
+        }
+        return response.json().then(data => {
+            addMessage("bot", data.feedback);
+            return true;
+        });
     });
 }
 
+function showError(response) {
+    // Error replies carry {"error": "..."}; anything else is shown by status
+    return response.json()
+        .then(data => data.error, () => null)
+        .then(message => {
+            addMessage("bot", `⚠️ ${message || `Request failed (HTTP ${response.status})`}`);
+            return false;
+        });
+}
+
+function readFeedbackStream(reader, div) {
+    // Append feedback tokens to `div` as Server-Sent Events arrive.
+    // Resolves true once the done event arrived, false if the stream ended without it.
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let finished = false;
+
+    function handleFrame(frame) {
+        let event = "message";
+        let data = "";
+        frame.split("\n").forEach(line => {
+            if (line.startsWith("event:")) event = line.slice(6).trim();
+            if (line.startsWith("data:")) data += line.slice(5).trim();
+        });
+        if (!data) return;
+        const payload = JSON.parse(data);
+        if (event === "done") {
+            div.innerText = payload.feedback;
+            finished = true;
+        } else if (payload.token) {
+            div.innerText += payload.token;
+        }
+        const chat = document.getElementById("chat");
+        chat.scrollTop = chat.scrollHeight;
+    }
+
+    function pump() {
+        return reader.read().then(({done, value}) => {
+            if (done) return finished;  // an error event ends the stream without done
+            buffer += decoder.decode(value, {stream: true});
+            const frames = buffer.split("\n\n");
+            buffer = frames.pop();
+            frames.forEach(handleFrame);
+            return pump();
+        });
+    }
+    return pump();
+}
+
 function getSummary() {
     fetch(`/end?session_id=${session_id}`)
     .then(response => response.json())
@@ -61,4 +147,5 @@ function addMessage(sender, text) {
     div.innerText = text;
     chat.appendChild(div);
     chat.scrollTop = chat.scrollHeight;
+    return div;
 }
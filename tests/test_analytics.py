@@ -0,0 +1,55 @@
+import sys
+import os
+import json
+import random
+import time
+import pandas as pd
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import analytics
+
+
+def _synthetic_candidates(n_candidates=10000, questions=10):
+    rows = []
+    for i in range(n_candidates):
+        transcript = [
+            {"question": f"Q{j}", "answer": "...", "score": random.randint(0, 10), "strengths": [], "weaknesses": []}
+            for j in range(questions)
+        ]
+        rows.append({
+            "candidate_id": f"c{i:05d}",
+            "tech_stack": random.choice(["excel", "Excel ", "sql"]),
+            "keywords": random.choice(["VLOOKUP, Pivot Table", "Macros, Index Match", "vlookup,PIVOT TABLE "]),
+            "yoe": str(random.randint(0, 8)),
+            "timestamp": "2025-09-18T18:03:56",
+            "last_interview_json": json.dumps(transcript),
+        })
+    return pd.DataFrame(rows)
+
+
+def run_test():
+    df = _synthetic_candidates()
+    start = time.perf_counter()
+    summary = analytics.cohort_summary(df)
+    elapsed = time.perf_counter() - start
+
+    print(f"Answers: {summary['answers']}  Candidates: {summary['candidates']}  ({elapsed:.2f}s)")
+    print("Percentiles:", summary["percentiles"])
+    print(summary["by_tech_stack"])
+    print(summary["by_keyword"])
+    print(summary["by_yoe"])
+
+    assert summary["answers"] == 100000
+    assert summary["distribution"]["count"].sum() == 100000
+    assert set(summary["by_tech_stack"]["tech_stack"]) == {"excel", "sql"}
+    assert set(summary["by_keyword"]["keyword"]) == {"vlookup", "pivot table", "macros", "index match"}
+    assert summary["by_keyword"]["count"].sum() == 200000
+
+    # Empty / malformed cells don't break the table
+    broken = pd.DataFrame([{"candidate_id": "x", "last_interview_json": "not json"}])
+    assert analytics.cohort_summary(broken)["answers"] == 0
+
+
+if __name__ == "__main__":
+    run_test()
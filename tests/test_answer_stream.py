@@ -0,0 +1,99 @@
+import sys
+import os
+import json
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as server
+from utils import llm_client
+from utils.fake_llm import FakeGemini, FakeLLMError
+from utils.llm_client import LLMClient
+from utils.rate_limit import TokenBucket
+
+
+class BrokenStreamFake(FakeGemini):
+    """Fake Gemini whose streams fail after the first chunk."""
+
+    def open_stream(self, prompt, words_per_chunk=3):
+        chunks = super().open_stream(prompt, words_per_chunk)
+
+        def _iter():
+            yield next(chunks)
+            raise FakeLLMError(503)
+        return _iter()
+
+
+def _use(fake):
+    llm_client._client = LLMClient(rate_limiter=TokenBucket(rate=1e6, capacity=1e6), fake=fake)
+
+
+def run_test():
+    client = llm_client._client
+    http = server.app.test_client()
+    try:
+        http.post("/start", json={"session_id": "s1"})
+        first = http.get("/question?session_id=s1").get_json()["question"]
+
+        # A stream that breaks off ends with an error event and records nothing...
+        _use(BrokenStreamFake(latency_ms=0))
+        body = http.post("/answer/stream", json={"session_id": "s1", "answer": "a1"}).get_data(as_text=True)
+        print("Broken stream:", body.replace("\n", " | "))
+        assert "event: error" in body and "event: done" not in body
+        assert server.sessions.get("s1")["questions_asked"] == 0
+
+        # ...so the client's retry with /answer is recorded once, for the same question
+        _use(FakeGemini(latency_ms=0))
+        assert http.post("/answer", json={"session_id": "s1", "answer": "a1"}).get_json()["feedback"]
+        session = server.sessions.get("s1")
+        assert session["questions_asked"] == 1 and session["transcript"][0]["question"] == first
+
+        # A client that disconnects mid-stream leaves the question unanswered
+        index = http.get("/question?session_id=s1").get_json()["index"]
+        assert index == 1
+        response = http.post("/answer/stream", json={"session_id": "s1", "answer": "a2", "question_index": index},
+                             buffered=False)
+        next(iter(response.response))
+        response.close()
+        assert server.sessions.get("s1")["questions_asked"] == 1
+
+        # A complete stream is recorded once; retrying the same index returns the recorded feedback
+        body = http.post("/answer/stream", json={"session_id": "s1", "answer": "a2", "question_index": index}
+                         ).get_data(as_text=True)
+        assert "event: done" in body and server.sessions.get("s1")["questions_asked"] == 2
+        feedback = server.sessions.get("s1")["transcript"][1]["feedback"]
+        retried = http.post("/answer", json={"session_id": "s1", "answer": "a2", "question_index": index})
+        assert retried.get_json()["feedback"] == feedback
+        body = http.post("/answer/stream", json={"session_id": "s1", "answer": "a2", "question_index": index}
+                         ).get_data(as_text=True)
+        assert json.dumps({"feedback": feedback}, ensure_ascii=False) in body
+        assert server.sessions.get("s1")["questions_asked"] == 2
+
+        # Malformed years of experience are a client error, not a 500
+        for yoe in ("3+", "two", [3]):
+            response = http.post("/start", json={"session_id": "s2", "yoe": yoe})
+            assert response.status_code == 400 and "yoe" in response.get_json()["error"]
+        assert http.post("/start", json={"session_id": "s2", "yoe": "4"}).status_code == 200
+
+        # A Gemini error on /answer is a JSON error for the page to show, and nothing is recorded
+        class RejectingFake(FakeGemini):
+            def _simulate(self):
+                raise FakeLLMError(400)
+
+        _use(RejectingFake(latency_ms=0))
+        http.get("/question?session_id=s1")
+        response = http.post("/answer", json={"session_id": "s1", "answer": "a3", "question_index": 2})
+        assert response.status_code == 502 and "400" in response.get_json()["error"]
+        assert server.sessions.get("s1")["questions_asked"] == 2
+        _use(FakeGemini(latency_ms=0))
+
+        # Unknown sessions get a 400 with an error message for the page to show
+        for path in ("/answer/stream", "/answer"):
+            response = http.post(path, json={"session_id": "nope", "answer": "x"})
+            assert response.status_code == 400 and response.get_json()["error"] == "Invalid session"
+        print("✅ Streamed answers are recorded once")
+    finally:
+        llm_client._client = client
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,100 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+from contextlib import closing
+from pathlib import Path
+import pandas as pd
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.backup import JournalBackupPolicy, _open_text
+from utils.storage import SQLiteCandidateStore
+
+
+def _entries(backup_dir: Path) -> list:
+    seqs = []
+    for journal in sorted(backup_dir.glob("journal_*.jsonl*")):
+        with _open_text(journal, "r") as fh:
+            seqs += [json.loads(line)["seq"] for line in fh if line.strip()]
+    return seqs
+
+
+def run_test():
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        db, backup_dir = tmp / "candidates.db", tmp / "backups"
+        pd.DataFrame([{"candidate_id": f"c{i:03d}", "name": f"Candidate {i}", "status": "pending"}
+                      for i in range(4)]).to_excel(tmp / "seed.xlsx", index=False)
+
+        # Two writers (like two Flask workers) on one database and one backup directory,
+        # each with its own policy object
+        writers = [
+            SQLiteCandidateStore(db, seed_excel=tmp / "seed.xlsx",
+                                 backup_policy=JournalBackupPolicy(backup_dir, snapshot_every=5))
+            for w in range(2)
+        ]
+        writers[0].load_all()
+
+        # Alternating writes: each policy must continue the other's sequence
+        for i in range(6):
+            writers[i % 2].update(f"c{i % 4:03d}", {"status": f"step-{i}"})
+
+        # Concurrent writes
+        def write(w):
+            for i in range(10):
+                writers[w].update(f"c{(w + i) % 4:03d}", {"score": f"{w}.{i}"})
+
+        # Interviews go to their own tables; they are journaled with the row change
+        for w in range(2):
+            transcript = [{"question": f"Q{n}", "answer": f"A{w}.{n}", "score": n, "strengths": ["s"],
+                           "weaknesses": []} for n in range(3)]
+            writers[w].record_interview(f"c00{w}", transcript, {"average_score": 1.0 + w},
+                                        {"status": "completed"})
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        seqs = _entries(backup_dir)
+        snapshots = sorted(p.name for p in backup_dir.glob("snapshot_*"))
+        print("Journal seqs:", seqs)
+        print("Snapshots:", snapshots)
+        assert len(seqs) == len(set(seqs)) == 28, "sequence numbers must not collide"
+        assert len(snapshots) == len({s.split(".")[0] for s in snapshots})
+
+        # Snapshot + journal replay gives exactly the current table
+        restored = JournalBackupPolicy(backup_dir).restore().set_index("candidate_id")
+        current = writers[0].load_all().set_index("candidate_id")
+        for col in ("status", "score", "row_version"):
+            assert restored[col].tolist() == current[col].tolist(), col
+
+        # ...and the interview tables, whether their rows came from a snapshot or the journal
+        tables = JournalBackupPolicy(backup_dir).restore_tables()
+        with closing(writers[0]._connect()) as conn:
+            stored = writers[0]._read_tables(conn)
+        for name in ("interviews", "answer_evaluations"):
+            print(f"Restored {name}:", len(tables[name]))
+            assert tables[name].to_dict(orient="records") == stored[name].to_dict(orient="records"), name
+        assert len(tables["answer_evaluations"]) == 6
+
+        # Interview rows replayed from the journal alone (no snapshot after them)
+        journal_only = JournalBackupPolicy(tmp / "journal_only", snapshot_every=1000)
+        store = SQLiteCandidateStore(tmp / "journal_only.db", seed_excel=tmp / "seed.xlsx",
+                                     backup_policy=journal_only)
+        store.load_all()
+        store.record_interview("c001", [{"question": "Q", "answer": "A", "score": 7}], {"average_score": 7})
+        tables = journal_only.restore_tables()
+        assert tables["interviews"]["candidate_id"].tolist() == ["c001"]
+        assert tables["answer_evaluations"][["question", "score"]].values.tolist() == [["Q", 7]]
+        print("✅ Journal restore matches the store with two writers")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,103 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import gemini_handler as gh
+from utils import interview_flow as iflow
+from utils import llm_client
+from utils.fake_llm import FakeGemini, FakeLLMError, FakeResponse, reply_for
+from utils.llm_cache import LLMCache
+from utils.llm_client import LLMClient
+from utils.rate_limit import TokenBucket
+
+
+class BatchReplyFake(FakeGemini):
+    """Fake Gemini whose batch replies are replaced by `batch_reply(prompt)`."""
+
+    def __init__(self, batch_reply):
+        super().__init__(latency_ms=0)
+        self.batch_reply = batch_reply
+        self.prompts = {"batch": 0, "single": 0}
+
+    def generate_content(self, prompt, request_options=None, **kwargs):
+        batch = "JSON array" in prompt
+        self.prompts["batch" if batch else "single"] += 1
+        return FakeResponse(self.batch_reply(prompt) if batch else reply_for(prompt))
+
+
+def _use(fake):
+    llm_client._client = LLMClient(rate_limiter=TokenBucket(rate=1e6, capacity=1e6), fake=fake)
+    return fake
+
+
+def run_test():
+    tmp = Path(tempfile.mkdtemp())
+    client, cache, backoff = llm_client._client, gh.llm_cache, llm_client.backoff_delay
+    pairs = [(f"What does feature {i} do?", f"It does thing {i}.") for i in range(4)]
+    try:
+        gh.llm_cache = LLMCache(tmp / "llm_cache.db")
+
+        # Well-formed batch reply: one request for all pairs
+        fake = _use(BatchReplyFake(reply_for))
+        batch_scores = [ev["score"] for ev in gh.evaluate_answers_batch(pairs, use_cache=False)]
+        assert fake.prompts == {"batch": 1, "single": 0}
+        single_scores = [gh.evaluate_answer(q, a, use_cache=False)["score"] for q, a in pairs]
+        assert all(0 <= score <= 10 for score in batch_scores + single_scores)
+
+        # Unparseable batch reply: re-asked, then every pair is evaluated on its own
+        fake = _use(BatchReplyFake(lambda prompt: "Sorry, I cannot grade these."))
+        results = gh.evaluate_answers_batch(pairs, use_cache=False)
+        print("Unparseable batch:", fake.prompts)
+        assert fake.prompts == {"batch": gh.PARSE_REASKS + 1, "single": len(pairs)}
+        assert [ev["score"] for ev in results] == single_scores
+
+        # Partial reply: only the missing / malformed items fall back, in the right order
+        def partial(prompt):
+            items = json.loads(reply_for(prompt).strip("`").removeprefix("json"))
+            items[1]["score"] = 42                       # out of range
+            return json.dumps([items[3], items[1], items[0]])  # [2] missing, shuffled order
+        fake = _use(BatchReplyFake(partial))
+        results = gh.evaluate_answers_batch(pairs, use_cache=False)
+        print("Partial batch:", fake.prompts)
+        assert fake.prompts == {"batch": 1, "single": 2}
+        assert [ev["score"] for ev in results] == [batch_scores[0], single_scores[1], single_scores[2], batch_scores[3]]
+
+        # A batch request that keeps failing (retries exhausted) also falls back per item
+        class FailingBatchFake(BatchReplyFake):
+            def generate_content(self, prompt, request_options=None, **kwargs):
+                if "JSON array" in prompt:
+                    self.prompts["batch"] += 1
+                    raise FakeLLMError(503)
+                return super().generate_content(prompt, request_options, **kwargs)
+
+        fake = FailingBatchFake(reply_for)
+        llm_client._client = LLMClient(max_retries=1, rate_limiter=TokenBucket(rate=1e6, capacity=1e6), fake=fake)
+        llm_client.backoff_delay = lambda attempt: 0
+        results = gh.evaluate_answers_batch(pairs, use_cache=False)
+        print("Failing batch:", fake.prompts)
+        assert fake.prompts == {"batch": 2, "single": len(pairs)}
+        assert [ev["score"] for ev in results] == single_scores
+
+        # Batch mode in the interview flow falls back the same way
+        fake = _use(BatchReplyFake(lambda prompt: "not json"))
+        results = iflow._evaluate_pairs(pairs, mode="batch")
+        assert fake.prompts["single"] == len(pairs)
+        assert [ev["score"] for ev in results] == single_scores
+
+        # Fallback results are cached: the next batch sends nothing
+        fake = _use(BatchReplyFake(reply_for))
+        assert gh.evaluate_answers_batch(pairs) == results
+        assert fake.prompts == {"batch": 0, "single": 0}
+        print("✅ Batch evaluation falls back to single evaluations")
+    finally:
+        llm_client._client, gh.llm_cache, llm_client.backoff_delay = client, cache, backoff
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_test()
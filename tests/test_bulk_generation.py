@@ -0,0 +1,104 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+import pandas as pd
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import excel_handler as eh
+from utils import question_generator as qg
+from utils.storage import SQLiteCandidateStore
+
+
+def run_test():
+    tmp = Path(tempfile.mkdtemp())
+    questions_for = qg._questions_for
+    try:
+        store = SQLiteCandidateStore(tmp / "candidates.db")
+        store.save_all(pd.DataFrame([
+            {"candidate_id": f"c{i:03d}", "name": f"Candidate {i}", "yoe": 2,
+             "tech_stack": ["Excel", "SQL", "Python"][i % 3], "keywords": "", "status": "pending"}
+            for i in range(6)
+        ]))
+        eh.set_store(store)
+        checkpoint = tmp / "checkpoint.json"
+
+        calls, fail = [], {"SQL"}
+        lock = threading.Lock()
+
+        def fake_questions_for(candidate, num_questions, use_bank=None, seed=None):
+            with lock:
+                calls.append(candidate["tech_stack"])
+            if candidate["tech_stack"] in fail:
+                raise RuntimeError("Gemini unavailable")
+            return [{"question": f"{candidate['tech_stack']} question {n}"} for n in range(num_questions)]
+
+        qg._questions_for = fake_questions_for
+
+        # First run: one group fails and the process dies before the store write
+        def crash(*args, **kwargs):
+            raise KeyboardInterrupt
+
+        update_many, eh.update_many = eh.update_many, crash
+        try:
+            qg.generate_bulk(num_questions=2, checkpoint=checkpoint)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            eh.update_many = update_many
+        print("First run calls:", sorted(calls))
+        assert sorted(calls) == ["Excel", "Python", "SQL"]
+        assert len(json.loads(checkpoint.read_text())["groups"]) == 2
+
+        # Resume: checkpointed groups are reused, only the failed one calls the LLM again
+        calls.clear()
+        fail.clear()
+        result = qg.generate_bulk(num_questions=2, checkpoint=checkpoint)
+        print("Resumed run:", result)
+        assert calls == ["SQL"]
+        assert result["reused"] == 2 and result["generated"] == 1 and not result["failed"]
+        assert result["candidates"] == 6 and not checkpoint.exists()
+        assert all(json.loads(c["questions_json"]) for c in store.load_all().to_dict(orient="records"))
+
+        # overwrite=True ignores a leftover checkpoint and regenerates every group
+        qg._save_checkpoint(checkpoint, 2, {qg.profile_key(eh.get_candidate("c000")): [{"question": "stale"}]})
+        calls.clear()
+        result = qg.generate_bulk(num_questions=2, overwrite=True, checkpoint=checkpoint)
+        print("Overwrite run:", result)
+        assert sorted(calls) == ["Excel", "Python", "SQL"]
+        assert result["reused"] == 0 and result["generated"] == 3
+        assert json.loads(eh.get_candidate("c000")["questions_json"])[0]["question"] == "Excel question 0"
+
+        # Roster clean-up merges paraphrases of the same difficulty only
+        def q(text, difficulty=None):
+            return {"question": text, "answer": "", **({"difficulty": difficulty} if difficulty else {})}
+        eh.update_many({
+            "c000": {"questions_json": [q("Explain the use of VLOOKUP in Excel.", "basic"),
+                                        q("What is the purpose of pivot tables?")]},
+            "c001": {"questions_json": [q("Can you explain the use of VLOOKUP in Excel?", "basic"),
+                                        q("What is the purpose of a pivot table in Excel?")]},
+            "c002": {"questions_json": [q("Can you explain the use of VLOOKUP in Excel?", "advanced")]},
+            "c003": {"questions_json": [q("What is the purpose of pivot tables?"),
+                                        q("What is the purpose of a pivot table in Excel?")]},
+        })
+        result = qg.clean_question_sets(["c000", "c001", "c002", "c003"])
+        print("Clean-up:", result)
+        stored = {cid: json.loads(eh.get_candidate(cid)["questions_json"]) for cid in ("c001", "c002", "c003")}
+        assert stored["c001"][0]["question"] == "Explain the use of VLOOKUP in Excel."
+        assert stored["c001"][1]["question"] == "What is the purpose of a pivot table in Excel?"  # untagged
+        assert stored["c002"][0]["question"] == "Can you explain the use of VLOOKUP in Excel?"  # other level
+        assert [x["question"] for x in stored["c003"]] == ["What is the purpose of pivot tables?"]
+        assert result["merged"] == 1 and result["removed"] == 1 and result["candidates_changed"] == 2
+        print("✅ Bulk generation checkpoints and resumes")
+    finally:
+        qg._questions_for = questions_for
+        eh.set_store(None)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,87 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import multiprocessing
+from pathlib import Path
+import pandas as pd
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import excel_handler as eh
+from utils.storage import ConflictError, ExcelCandidateStore, SQLiteCandidateStore
+
+WORKERS = 4
+APPENDS = 5
+
+
+def _make_store(kind, path):
+    return ExcelCandidateStore(path) if kind == "excel" else SQLiteCandidateStore(path)
+
+
+def _append_worker(kind, path, worker):
+    # Each process has its own store object, cache and lock handle, like separate Flask workers
+    eh.set_store(_make_store(kind, path))
+    for i in range(APPENDS):
+        eh.append_transcript("c001", {"question": f"w{worker}-q{i}", "score": 5})
+
+
+def run_test():
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        seed = pd.DataFrame([
+            {"candidate_id": "c001", "name": "Alice", "status": "pending"},
+            {"candidate_id": "c002", "name": "Bob", "status": "pending"},
+        ])
+        for kind, path in (("excel", tmp / "candidates.xlsx"), ("sqlite", tmp / "candidates.db")):
+            eh.set_store(_make_store(kind, path))
+            eh._save_candidates(seed)
+
+            # Concurrent read-modify-write from several processes loses nothing
+            ctx = multiprocessing.get_context("spawn")
+            procs = [ctx.Process(target=_append_worker, args=(kind, str(path), w)) for w in range(WORKERS)]
+            for p in procs:
+                p.start()
+            for p in procs:
+                p.join()
+            assert all(p.exitcode == 0 for p in procs)
+
+            eh.clear_cache()
+            row = eh.get_candidate("c001")
+            transcript = json.loads(row["transcript_json"])
+            print(f"{kind}: {len(transcript)} entries, row_version {row['row_version']}")
+            assert len(transcript) == WORKERS * APPENDS
+            assert len({e["question"] for e in transcript}) == WORKERS * APPENDS
+
+            # A write based on a stale read is refused, and nothing is written
+            stale = int(row["row_version"])
+            eh.set_status("c001", "in_progress")
+            try:
+                eh.update_many({"c001": {"status": "completed"}}, {"c001": stale})
+            except ConflictError as e:
+                assert e.expected == stale and e.actual == stale + 1
+            else:
+                raise AssertionError("stale update should conflict")
+            assert eh.get_candidate("c001")["status"] == "in_progress"
+
+            # A batch that read a row fails as a whole if the row changed before it exits
+            try:
+                with eh.batch():
+                    eh.append_transcript("c001", {"question": "late"})
+                    eh.set_status("c002", "completed")
+                    eh.get_store().update("c001", {"status": "reviewed"})  # another writer
+            except ConflictError:
+                pass
+            else:
+                raise AssertionError("batch should conflict")
+            assert eh.get_candidate("c002")["status"] == "pending"
+            assert len(json.loads(eh.get_candidate("c001")["transcript_json"])) == WORKERS * APPENDS
+        print("✅ Concurrent writers don't lose updates")
+    finally:
+        eh.set_store(None)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,54 @@
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep retry backoff short for the injected failures below
+os.environ.setdefault("LLM_BACKOFF_BASE", "0.001")
+from utils.fake_llm import FakeGemini, reply_for
+from utils.llm_client import LLMClient, LLMRequestError
+from utils.llm_parse import parse_json, parse_numbered_list
+from utils.rate_limit import TokenBucket
+
+
+def run_test():
+    question_prompt = "Generate 4 structured interview questions.\n- Keywords: VLOOKUP, Pivot Tables\nReturn as a numbered list."
+    questions = parse_numbered_list(reply_for(question_prompt))
+    print("Questions:", questions)
+    assert len(questions) == 4 and reply_for(question_prompt) == reply_for(question_prompt)
+
+    evaluation = parse_json(reply_for("Question: What is VLOOKUP?\nReturn strictly in JSON format"), expect=dict)
+    assert 0 <= evaluation["score"] <= 10 and len(evaluation["strengths"]) == 2
+
+    batch_prompt = "\n    [0]\n    Question: a\n\n    [1]\n    Question: b\n\nReturn strictly a JSON array"
+    assert [e["index"] for e in parse_json(reply_for(batch_prompt), expect=list)] == [0, 1]
+
+    # Injected 429/500s are retried by the shared client; same seed -> same sequence
+    unlimited = TokenBucket(rate=1e6, capacity=1e6)
+    fake = FakeGemini(latency_ms=0, error_rate=0.2, throttle_rate=0.2, seed=7)
+    client = LLMClient(max_retries=10, rate_limiter=unlimited, fake=fake)
+    for _ in range(20):
+        assert client.generate("Question: x\nAnswer: y").text
+    print("Fake stats:", fake.stats)
+    assert fake.stats["calls"] > 20 and fake.stats["errors"] and fake.stats["throttled"]
+    again = FakeGemini(latency_ms=0, error_rate=0.2, throttle_rate=0.2, seed=7)
+    for _ in range(20):
+        LLMClient(max_retries=10, rate_limiter=unlimited, fake=again).generate("Question: x\nAnswer: y")
+    assert again.stats == fake.stats
+
+    # Every call failing ends in LLMRequestError after the retries
+    failing = LLMClient(max_retries=2, rate_limiter=unlimited, fake=FakeGemini(latency_ms=0, error_rate=1.0))
+    try:
+        failing.generate_rest("Question: x")
+    except LLMRequestError as e:
+        assert e.status == 500
+    else:
+        raise AssertionError("expected LLMRequestError")
+
+    streamed = "".join(LLMClient(rate_limiter=unlimited, fake=FakeGemini(latency_ms=0)).stream_rest("Question: x"))
+    assert streamed == reply_for("Question: x")
+    print("✅ Fake Gemini backend works")
+
+
+if __name__ == "__main__":
+    run_test()
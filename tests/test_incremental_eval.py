@@ -0,0 +1,85 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+import pandas as pd
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY_MS", "0")
+from utils import excel_handler as eh
+from utils import interview_flow as iflow
+from utils.incremental_eval import IncrementalEvaluator
+from utils.storage import SQLiteCandidateStore
+
+QUESTIONS = ["What is VLOOKUP?", "What is a pivot table?", "How do you protect a sheet?"]
+
+
+def run_test():
+    tmp = Path(tempfile.mkdtemp())
+    graded = []
+
+    def evaluate_one(pair):
+        # Stand-in for the Gemini call: records what gets graded; "garbled" answers fail to parse
+        graded.append(pair)
+        if "garbled" in pair[1]:
+            return {"score": None, "strengths": [], "weaknesses": [], "parse_error": {"kind": "json"}}
+        return {"score": 7, "strengths": [pair[1]], "weaknesses": []}
+
+    original = iflow._evaluate_one
+    iflow._evaluate_one = evaluate_one
+    try:
+        store = SQLiteCandidateStore(tmp / "candidates.db")
+        store.save_all(pd.DataFrame([{"candidate_id": "c001", "name": "Alice", "status": "pending",
+                                      "questions_json": json.dumps([{"question": q} for q in QUESTIONS])}]))
+        eh.set_store(store)
+
+        evaluator = IncrementalEvaluator("c001")
+        evaluator.submit(QUESTIONS[0], "Looks up a value")
+        evaluator.submit(QUESTIONS[0], "Looks up   a value ").result()  # whitespace edit: same hash, no new call
+        evaluator.submit(QUESTIONS[1], "Summarises data").result()
+        evaluator.submit(QUESTIONS[1], "Summarises and groups data").result()  # edited: graded again
+        evaluator.submit(QUESTIONS[2], "garbled").result()
+        print("Graded while answering:", len(graded), evaluator.status())
+        assert len(graded) == 4
+
+        answers = {QUESTIONS[0]: "Looks up a value", QUESTIONS[1]: "Summarises and groups data",
+                   QUESTIONS[2]: "garbled"}
+        completed = evaluator.completed()
+        assert set(completed) == {iflow.answer_hash(QUESTIONS[0], answers[QUESTIONS[0]]),
+                                  iflow.answer_hash(QUESTIONS[1], answers[QUESTIONS[1]])}
+
+        # Final evaluation only grades what is missing: the failed grade is retried, the rest reused
+        graded.clear()
+        iflow.conduct_interview("c001", answers, mode="single", precomputed=completed)
+        print("Graded at submit:", graded)
+        assert graded == [(QUESTIONS[2], "garbled")]
+        transcript = eh.get_latest_interview("c001")["transcript"]
+        assert [e["strengths"] for e in transcript][:2] == [["Looks up a value"], ["Summarises and groups data"]]
+
+        # A grade still in flight at submit is waited for instead of being graded again
+        release = threading.Event()
+
+        def slow_evaluate(pair):
+            release.wait(5)
+            return evaluate_one(pair)
+
+        iflow._evaluate_one = slow_evaluate
+        late = IncrementalEvaluator("c001")
+        late.submit(QUESTIONS[0], "Looks up a value")
+        assert late.completed(timeout=0.05) == {}  # gives up after the timeout
+        threading.Timer(0.2, release.set).start()
+        assert set(late.completed(timeout=5)) == {iflow.answer_hash(QUESTIONS[0], "Looks up a value")}
+        print("✅ Incremental evaluation reuses only valid, current grades")
+    finally:
+        iflow._evaluate_one = original
+        eh.set_store(None)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,87 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+from pathlib import Path
+import pandas as pd
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import excel_handler as eh
+from utils import analytics
+from utils.migrate import migrate_workbook
+from utils.storage import SQLiteCandidateStore
+
+
+def run_test():
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        # Workbook in the old layout: transcript/summary/history as JSON cells
+        transcript = [
+            {"question": "What is VLOOKUP?", "answer": "A lookup", "score": 7, "strengths": ["clear"], "weaknesses": []},
+            {"question": "What is a pivot table?", "answer": "", "score": 0, "strengths": [], "weaknesses": ["blank"]},
+        ]
+        summary = {"average_score": 3.5, "strengths": ["clear"], "weaknesses": ["blank"], "timestamp": "2024-05-02T10:00:00"}
+        history = [
+            {"timestamp": "2024-05-01T10:00:00", "summary": {"average_score": 2.0}, "num_questions": 2},
+            {"timestamp": "2024-05-02T10:00:00", "summary": summary, "num_questions": 2},
+        ]
+        workbook = tmp / "candidates.xlsx"
+        pd.DataFrame([
+            {"candidate_id": "c001", "name": "Alice", "tech_stack": "excel", "yoe": "2", "status": "completed",
+             "last_interview_json": json.dumps(transcript), "transcript_json": json.dumps(transcript),
+             "summary_json": json.dumps(summary), "interview_history": json.dumps(history)},
+            {"candidate_id": "c002", "name": "Bob", "tech_stack": "excel", "yoe": "5", "status": "pending"},
+        ]).to_excel(workbook, index=False)
+
+        result = migrate_workbook(workbook, tmp / "candidates.db")
+        print("Migration:", result)
+        assert result["interviews_created"] == 2
+        # Re-running does not duplicate interviews or overwrite rows changed since
+        SQLiteCandidateStore(tmp / "candidates.db").update("c002", {"status": "in_progress"})
+        again = migrate_workbook(workbook, tmp / "candidates.db")
+        assert again["interviews_created"] == 0 and again["candidates_added"] == 0
+        c002 = SQLiteCandidateStore(tmp / "candidates.db").get("c002")
+        assert c002["status"] == "in_progress" and c002["row_version"] == "1"
+
+        eh.set_store(SQLiteCandidateStore(tmp / "candidates.db"))
+        assert not eh.get_candidate("c001")["transcript_json"]  # JSON columns are cleared
+        latest = eh.get_latest_interview("c001")
+        print("Latest interview:", latest)
+        assert [e["score"] for e in latest["transcript"]] == [7, 0]
+        assert len(eh.get_interview_history("c001")) == 2
+
+        # New interviews are appended as rows; the candidate row only gets the status change
+        eh.record_interview("c002", transcript[:1], {"average_score": 7}, updates={"status": "completed"})
+        assert eh.get_candidate("c002")["status"] == "completed"
+        assert eh.get_latest_interview("c002")["transcript"][0]["question"] == "What is VLOOKUP?"
+
+        # Exported workbooks carry the interviews in the JSON columns and import back unchanged
+        exported = tmp / "export.xlsx"
+        assert eh.export_to_excel(exported) == 2
+        sheet = pd.read_excel(exported, dtype=str).set_index("candidate_id")
+        assert [e["score"] for e in json.loads(sheet.at["c001", "transcript_json"])] == [7, 0]
+        assert json.loads(sheet.at["c002", "summary_json"]) == {"average_score": 7}
+        assert len(json.loads(sheet.at["c001", "interview_history"])) == 2
+        assert migrate_workbook(exported, tmp / "roundtrip.db")["interviews_created"] == 3
+
+        # New workbook rows are added; --force puts the workbook's values back
+        pd.concat([pd.read_excel(workbook, dtype=str),
+                   pd.DataFrame([{"candidate_id": "c003", "name": "Cy", "status": "pending"}])]
+                  ).to_excel(workbook, index=False)
+        assert migrate_workbook(workbook, tmp / "roundtrip.db")["candidates_added"] == 1
+        assert SQLiteCandidateStore(tmp / "roundtrip.db").get("c002")["status"] == "completed"
+        assert migrate_workbook(workbook, tmp / "roundtrip.db", force=True)["candidates_added"] == 3
+        assert SQLiteCandidateStore(tmp / "roundtrip.db").get("c002")["status"] == "pending"
+
+        cohort = analytics.cohort_summary(eh._load_candidates(), answers=eh.load_latest_answers())
+        print("Cohort answers:", cohort["answers"], "mean:", cohort["mean_score"])
+        assert cohort["answers"] == 3
+    finally:
+        eh.set_store(None)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,139 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import time
+from contextlib import closing
+from pathlib import Path
+import pandas as pd
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY_MS", "0")
+from utils import excel_handler as eh
+from utils import job_queue as jq
+from utils.storage import SQLiteCandidateStore
+
+
+def _drain(db, worker="test"):
+    """Claim and run queued jobs in this thread until the queue is empty."""
+    while True:
+        job = jq.claim(worker, db)
+        if job is None:
+            return
+        jq.run_job(job, db)
+
+
+def run_test():
+    tmp = Path(tempfile.mkdtemp())
+    db = tmp / "jobs.db"
+    calls = {"flaky": 0}
+
+    def flaky(job, report):
+        calls["flaky"] += 1
+        report(0.5)
+        if calls["flaky"] < 3:
+            raise RuntimeError("Gemini 503")
+        return {"ok": True}
+
+    def broken(job, report):
+        raise RuntimeError("always fails")
+
+    def slow(job, report):
+        time.sleep(1.0)
+        return {"ok": True}
+
+    jq.HANDLERS.update(flaky=flaky, broken=broken, slow=slow)
+    settings = (jq.JOB_RETRY_BACKOFF, jq.JOB_LEASE_SECONDS)
+    try:
+        # A failed attempt waits for its backoff before it can be claimed again
+        backoff_id = jq.submit("c000", "broken", db_path=db)
+        jq.run_job(jq.claim("test", db), db)
+        job = jq.get_job(backoff_id, db)
+        assert job["status"] == jq.QUEUED and job["run_after"] >= time.time() + jq.retry_delay(1) - 1
+        assert jq.claim("test", db) is None
+        assert jq.retry_delay(2) == 2 * jq.retry_delay(1) and jq.retry_delay(50) == jq.JOB_RETRY_BACKOFF_MAX
+        with closing(jq._connect(db)) as conn:
+            conn.execute("UPDATE jobs SET status = ? WHERE job_id = ?", (jq.FAILED, backoff_id))
+
+        # Failures are re-queued until JOB_MAX_ATTEMPTS, then the job is failed
+        jq.JOB_RETRY_BACKOFF = 0
+        flaky_id = jq.submit("c001", "flaky", db_path=db)
+        broken_id = jq.submit("c002", "broken", db_path=db)
+        _drain(db)
+        flaky_job, broken_job = jq.get_job(flaky_id, db), jq.get_job(broken_id, db)
+        print("Flaky:", flaky_job["status"], flaky_job["attempts"], "Broken:", broken_job["status"], broken_job["attempts"])
+        assert flaky_job["status"] == jq.DONE and flaky_job["attempts"] == 3 and flaky_job["result"] == {"ok": True}
+        assert broken_job["status"] == jq.FAILED and broken_job["attempts"] == jq.JOB_MAX_ATTEMPTS
+        assert "always fails" in broken_job["error"]
+
+        # A worker that dies mid-job: the job stays "running" until its lease expires
+        crashed_id = jq.submit("c003", "flaky", db_path=db)
+        assert jq.claim("crashing-worker", db)["job_id"] == crashed_id
+        assert jq.claim("other", db) is None and jq.requeue_stale(db) == 0  # lease still valid
+        with closing(jq._connect(db)) as conn:
+            conn.execute("UPDATE jobs SET updated = ? WHERE job_id = ?", (time.time() - jq.JOB_LEASE_SECONDS - 1, crashed_id))
+        assert jq.requeue_stale(db) == 1
+        recovered = jq.claim("other", db)
+        assert recovered["job_id"] == crashed_id and recovered["attempts"] == 2
+        jq.run_job(recovered, db)
+        assert jq.get_job(crashed_id, db)["status"] == jq.DONE
+
+        # ...unless it already used all its attempts
+        with closing(jq._connect(db)) as conn:
+            conn.execute("UPDATE jobs SET status = ?, attempts = ?, updated = 0 WHERE job_id = ?",
+                         (jq.RUNNING, jq.JOB_MAX_ATTEMPTS, crashed_id))
+        assert jq.requeue_stale(db) == 0 and jq.get_job(crashed_id, db)["status"] == jq.FAILED
+
+        # A running pool picks up jobs orphaned after it started, and its own long jobs
+        # keep their lease through heartbeats instead of being handed to another worker
+        jq.JOB_LEASE_SECONDS = 0.4
+        orphan_id = jq.submit("c004", "flaky", db_path=db)
+        assert jq.claim("dead-worker", db)["job_id"] == orphan_id
+        slow_id = jq.submit("c005", "slow", db_path=db)
+        pool = jq.WorkerPool(num_workers=2, poll_interval=0.05, db_path=db, requeue_interval=0.05).start()
+        try:
+            deadline = time.time() + 10
+            while time.time() < deadline and any(
+                    jq.get_job(j, db)["status"] != jq.DONE for j in (orphan_id, slow_id)):
+                time.sleep(0.05)
+        finally:
+            pool.stop()
+        orphan, slow_job = jq.get_job(orphan_id, db), jq.get_job(slow_id, db)
+        print("Orphan:", orphan["status"], orphan["attempts"], "Slow:", slow_job["status"], slow_job["attempts"])
+        assert orphan["status"] == jq.DONE and orphan["attempts"] == 2
+        assert slow_job["status"] == jq.DONE and slow_job["attempts"] == 1
+        jq.JOB_LEASE_SECONDS = settings[1]
+
+        # Worker pool runs an interview evaluation end to end on the fake Gemini backend
+        questions = [{"question": "What is VLOOKUP?"}, {"question": "What is a pivot table?"}]
+        store = SQLiteCandidateStore(tmp / "candidates.db")
+        store.save_all(pd.DataFrame([{"candidate_id": "c010", "name": "Dana", "status": "in_progress",
+                                      "questions_json": json.dumps(questions)}]))
+        eh.set_store(store)
+        job_id = jq.submit_interview("c010", {"What is VLOOKUP?": "Looks up values"}, db_path=db)
+        pool = jq.WorkerPool(num_workers=2, poll_interval=0.05, db_path=db).start()
+        try:
+            deadline = time.time() + 30
+            while jq.get_job(job_id, db)["status"] not in (jq.DONE, jq.FAILED) and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            pool.stop()
+        job = jq.get_job(job_id, db)
+        print("Interview job:", job["status"], job["progress"], jq.queue_stats(db))
+        assert job["status"] == jq.DONE and job["progress"] == 1
+        assert eh.get_candidate("c010")["status"] == "completed"
+        assert len(eh.get_latest_interview("c010")["transcript"]) == 2
+        print("✅ Job queue retries, recovers crashed jobs and runs interviews")
+    finally:
+        jq.JOB_RETRY_BACKOFF, jq.JOB_LEASE_SECONDS = settings
+        for kind in ("flaky", "broken", "slow"):
+            jq.HANDLERS.pop(kind, None)
+        eh.set_store(None)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_test()
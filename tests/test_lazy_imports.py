@@ -0,0 +1,44 @@
+import sys
+import os
+import json
+import subprocess
+
+# Add project root to PYTHONPATH
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+# Runs in a fresh interpreter so modules imported by other tests don't count
+_PROBE = """
+import json, pathlib, sys
+mkdirs = []
+_mkdir = pathlib.Path.mkdir
+pathlib.Path.mkdir = lambda self, *a, **k: (mkdirs.append(str(self)), _mkdir(self, *a, **k))[1]
+import app
+import utils.gemini_handler, utils.job_queue, utils.question_bank
+app_loaded = [m for m in ("streamlit", "google.generativeai", "pandas", "numpy") if m in sys.modules]
+import utils.excel_handler
+print(json.dumps({"mkdirs": mkdirs, "app_loaded": app_loaded,
+                  "loaded": [m for m in ("streamlit", "google.generativeai") if m in sys.modules]}))
+"""
+
+
+def run_test():
+    env = dict(os.environ, GEMINI_API_KEY="", HOME=os.path.join(ROOT, "tests"))
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT, env=env,
+                         capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    print("Import probe:", result)
+
+    # No API key and no secrets.toml: importing must still work, and must not create data dirs
+    assert result["mkdirs"] == [], result["mkdirs"]
+    assert result["app_loaded"] == [], result["app_loaded"]
+    assert result["loaded"] == [], result["loaded"]
+
+    from utils import settings
+    assert settings.data_path("jobs.db").parent == settings.DATA_DIR
+    print("✅ Imports are lazy")
+
+
+if __name__ == "__main__":
+    run_test()
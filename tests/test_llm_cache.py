@@ -0,0 +1,68 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import gemini_handler as gh
+from utils import llm_client
+from utils.fake_llm import FakeGemini
+from utils.llm_cache import LLMCache
+from utils.llm_client import LLMClient
+from utils.rate_limit import TokenBucket
+
+
+def run_test():
+    tmp = Path(tempfile.mkdtemp())
+    client, cache = llm_client._client, gh.llm_cache
+    try:
+        # TTL: an expired entry is a miss and is deleted
+        ttl_cache = LLMCache(tmp / "ttl.db", ttl_seconds=0.2)
+        ttl_cache.set("k", {"score": 7})
+        assert ttl_cache.get("k") == {"score": 7}
+        time.sleep(0.3)
+        assert ttl_cache.get("k") is None
+        stats = ttl_cache.stats()
+        print("TTL cache:", stats)
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 0
+
+        # LRU: past max_entries the least recently READ entry goes first
+        lru = LLMCache(tmp / "lru.db", max_entries=3)
+        for key in ("a", "b", "c"):
+            lru.set(key, key)
+            time.sleep(0.01)
+        assert lru.get("a") == "a"
+        time.sleep(0.01)
+        lru.set("d", "d")
+        print("LRU cache:", lru.stats())
+        assert lru.get("b") is None
+        assert [lru.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+        assert lru.stats()["evictions"] == 1 and lru.stats()["entries"] == 3
+
+        # Entries survive a new cache object on the same file (another process / restart)
+        assert LLMCache(tmp / "lru.db", max_entries=3).get("d") == "d"
+
+        # Through gemini_handler: a repeated evaluation (modulo case/whitespace of the
+        # question) is served from the cache, and an expired one calls Gemini again
+        fake = FakeGemini(latency_ms=0)
+        llm_client._client = LLMClient(rate_limiter=TokenBucket(rate=1e6, capacity=1e6), fake=fake)
+        gh.llm_cache = LLMCache(tmp / "llm_cache.db", ttl_seconds=0.2)
+        first = gh.evaluate_answer("What is VLOOKUP?", "A lookup function.")
+        assert gh.evaluate_answer("  what is   VLOOKUP? ", "A lookup function.") == first
+        assert fake.stats["calls"] == 1
+        gh.evaluate_answer("What is VLOOKUP?", "A LOOKUP function.")  # answers keep their case
+        assert fake.stats["calls"] == 2
+        time.sleep(0.3)
+        assert gh.evaluate_answer("What is VLOOKUP?", "A lookup function.") == first
+        assert fake.stats["calls"] == 3
+        print("✅ LLM cache expires and evicts entries")
+    finally:
+        llm_client._client, gh.llm_cache = client, cache
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_test()
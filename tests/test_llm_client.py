@@ -0,0 +1,128 @@
+import sys
+import os
+import threading
+import time
+
+import requests
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import llm_client
+from utils.fake_llm import FakeGemini, FakeLLMError
+from utils.llm_client import LLMClient, LLMRequestError, backoff_delay
+from utils.rate_limit import TokenBucket
+
+
+class ScriptedFake(FakeGemini):
+    """Fake Gemini that fails with the given HTTP statuses before answering."""
+
+    def __init__(self, statuses):
+        super().__init__(latency_ms=0)
+        self.statuses = list(statuses)
+
+    def _simulate(self):
+        self.stats["calls"] += 1
+        if self.statuses:
+            raise FakeLLMError(self.statuses.pop(0))
+        return 0.0
+
+
+def run_test():
+    unlimited = TokenBucket(rate=1e6, capacity=1e6)
+    delays = []
+    real_backoff = llm_client.backoff_delay
+    llm_client.backoff_delay = lambda attempt: delays.append(attempt) or 0
+    try:
+        # 429 and 5xx are retried with growing backoff until a call succeeds
+        fake = ScriptedFake([429, 503, 500])
+        assert LLMClient(max_retries=3, rate_limiter=unlimited, fake=fake).generate("Question: x").text
+        print("Retried attempts:", delays)
+        assert fake.stats["calls"] == 4 and delays == [0, 1, 2]
+
+        # Giving up after max_retries raises LLMRequestError with the last status
+        delays.clear()
+        fake = ScriptedFake([429] * 5)
+        try:
+            LLMClient(max_retries=2, rate_limiter=unlimited, fake=fake).generate_rest("Question: x")
+        except LLMRequestError as e:
+            assert e.status == 429
+        else:
+            raise AssertionError("expected LLMRequestError")
+        assert fake.stats["calls"] == 3 and delays == [0, 1]
+
+        # Other client errors are not retried
+        delays.clear()
+        fake = ScriptedFake([400])
+        try:
+            LLMClient(max_retries=3, rate_limiter=unlimited, fake=fake).generate("Question: x")
+        except FakeLLMError as e:
+            assert e.code == 400
+        else:
+            raise AssertionError("400 should not be retried")
+        assert fake.stats["calls"] == 1 and delays == []
+
+        # Over REST, non-retryable 4xx responses raise instead of returning the error body
+        class StubSession:
+            def __init__(self, status):
+                self.status, self.calls = status, 0
+
+            def post(self, url, **kwargs):
+                self.calls += 1
+                response = requests.Response()
+                response.status_code, response.url = self.status, url
+                response._content = b'{"error": {"code": %d}}' % self.status
+                return response
+
+        delays.clear()
+        client = LLMClient(api_key="test", max_retries=3, rate_limiter=unlimited)
+        client.fake, client._session = None, StubSession(403)
+        try:
+            client.generate_rest("Question: x")
+        except requests.HTTPError as e:
+            assert e.response.status_code == 403
+        else:
+            raise AssertionError("403 should raise")
+        assert client._session.calls == 1 and delays == []
+
+        # Streams retry only until the first byte
+        fake = ScriptedFake([502])
+        assert "".join(LLMClient(max_retries=1, rate_limiter=unlimited, fake=fake).stream_rest("Question: x"))
+        assert fake.stats["calls"] == 2
+    finally:
+        llm_client.backoff_delay = real_backoff
+
+    # Full jitter: uniform(0, min(cap, base * 2**attempt))
+    for attempt in range(8):
+        bound = min(4.0, 0.5 * 2 ** attempt)
+        samples = [backoff_delay(attempt, base=0.5, cap=4.0) for _ in range(200)]
+        assert all(0 <= d <= bound for d in samples) and max(samples) > bound / 2
+
+    # TokenBucket: a burst up to capacity, then `rate` tokens per second
+    bucket = TokenBucket(rate=20, capacity=5)
+    assert all(bucket.try_acquire() for _ in range(5)) and not bucket.try_acquire()
+    start = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    print(f"4 tokens at 20/s took {elapsed:.3f}s")
+    assert 0.15 <= elapsed < 0.5
+    empty = TokenBucket(rate=1, capacity=1)
+    empty.acquire()
+    assert not empty.acquire(timeout=0.05)
+
+    # The client's rate limiter is shared by all threads: 10 calls at 50/s with burst 2
+    client = LLMClient(rate_limiter=TokenBucket(rate=50, capacity=2), fake=FakeGemini(latency_ms=0))
+    start = time.monotonic()
+    threads = [threading.Thread(target=client.generate, args=("Question: x",)) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+    print(f"10 concurrent calls at 50/s took {elapsed:.3f}s")
+    assert client.fake.stats["calls"] == 10 and elapsed >= 0.15
+    print("✅ LLM client retries and throttles")
+
+
+if __name__ == "__main__":
+    run_test()
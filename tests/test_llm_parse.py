@@ -0,0 +1,78 @@
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.llm_parse import Field, NumberedListParser, ParseError, parse_json, parse_numbered_list
+
+EVALUATION_SCHEMA = {
+    "score": Field((int, float), minimum=0, maximum=10),
+    "strengths": Field(list, default=[]),
+    "weaknesses": Field(list, default=[]),
+}
+
+
+def run_test():
+    print("=== Numbered lists ===")
+    reply = """Here are 3 questions for the candidate:
+
+**1.** What does VLOOKUP return when
+the lookup value is missing?
+2) How do you refresh a pivot table?
+   - mention the data source
+Q3: Explain conditional formatting rules.
+
+Good luck!"""
+    items = parse_numbered_list(reply)
+    for item in items:
+        print(" ", item)
+    assert items == [
+        "What does VLOOKUP return when the lookup value is missing?",
+        "How do you refresh a pivot table? mention the data source",
+        "Explain conditional formatting rules.",
+    ]
+    assert parse_numbered_list("- Define a named range\n- Explain INDEX/MATCH") == [
+        "Define a named range", "Explain INDEX/MATCH",
+    ]
+    assert parse_numbered_list("Sorry, I cannot help with that.") == []
+
+    # Streaming in small chunks gives the same items
+    parser = NumberedListParser()
+    streamed = []
+    for i in range(0, len(reply), 7):
+        streamed.extend(parser.feed(reply[i:i + 7]))
+    assert streamed + parser.close() == items
+
+    print("=== JSON ===")
+    fenced = 'Sure!\n```json\n{"score": "7/10", "strengths": ["clear {example}"], "weaknesses": None,}\n```'
+    evaluation = parse_json(fenced, EVALUATION_SCHEMA, expect=dict)
+    print(" ", evaluation)
+    assert evaluation == {"score": 7, "strengths": ["clear {example}"], "weaknesses": []}
+
+    quoted = "{'score': 8, 'strengths': ['uses INDEX/MATCH'], // note\n 'weaknesses': [\"doesn't\"]}"
+    assert parse_json(quoted, EVALUATION_SCHEMA)["weaknesses"] == ["doesn't"]
+
+    truncated = '[{"index": 0, "score": 6, "strengths": ["ok"], "weaknesses": []}, {"index": 1, "score": 4, "strengths": ["gu'
+    batch = parse_json(truncated, EVALUATION_SCHEMA, expect=list)
+    assert [e["score"] for e in batch] == [6, 4]
+
+    # Out-of-range items are dropped (None) instead of failing the whole batch
+    batch = parse_json('[{"score": 11}, {"score": 5}]', EVALUATION_SCHEMA, expect=list)
+    assert batch[0] is None and batch[1]["score"] == 5
+
+    print("=== Errors ===")
+    for text, kind in [("", "empty"), ("no json here", "no_json"),
+                       ('{"score": }', "invalid_json"), ('{"strengths": []}', "schema")]:
+        try:
+            parse_json(text, EVALUATION_SCHEMA)
+        except ParseError as e:
+            print(f"  {kind}: {e.reask_hint()}")
+            assert e.kind == kind and e.to_dict()["kind"] == kind
+        else:
+            raise AssertionError(f"{text!r} should not parse")
+
+    print("✅ LLM output parsing works")
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,52 @@
+import sys
+import os
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.metrics import Registry, parse
+
+
+def run_test():
+    registry = Registry()
+    latency = registry.histogram("llm_request_seconds", "Gemini request time", ["method"], buckets=(0.1, 0.5, 1.0))
+    attempts = registry.counter("llm_attempts_total", "Attempts", ["outcome"])
+
+    for value in (0.05, 0.2, 0.3, 0.4, 2.0):
+        latency.observe(value, method="generate")
+
+    @latency.time(method="stream")
+    def stream():
+        return "ok"
+
+    assert stream() == "ok"
+    attempts.inc(outcome="ok")
+    attempts.inc(2, outcome="429")
+
+    text = registry.render()
+    print(text)
+    assert 'llm_request_seconds_bucket{method="generate",le="0.5"} 4' in text
+    assert 'llm_request_seconds_bucket{method="generate",le="+Inf"} 5' in text
+    assert 'llm_request_seconds_count{method="generate"} 5' in text
+    assert 'llm_attempts_total{outcome="429"} 2' in text
+    assert "# TYPE llm_request_seconds histogram" in text
+
+    rows = {(r["metric"], r["labels"]): r for r in registry.summary()}
+    generate = rows[("llm_request_seconds", "method=generate")]
+    print("Summary:", generate)
+    assert generate["count"] == 5 and 100 <= generate["p50_ms"] <= 500
+    assert rows[("llm_request_seconds", "method=stream")]["count"] == 1
+
+    # The admin portal rebuilds the server's numbers from its /metrics text
+    assert parse(text).summary() == registry.summary()
+
+    try:
+        latency.observe(1.0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("missing labels should be rejected")
+    print("✅ Metrics work")
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,98 @@
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from pathlib import Path
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.dedup import dedupe
+from utils.question_bank import BANK_TOP_UP_FAILURES, QuestionBank
+
+
+def run_test():
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        bank = QuestionBank(tmp / "bank.db")
+        topics = {
+            "basic": ["syntax", "arguments", "examples", "shortcuts", "limitations", "alternatives"],
+            "medium": ["nested formulas", "error handling", "dynamic ranges",
+                       "named cells", "data validation", "conditional logic"],
+            "advanced": ["large datasets", "recalculation speed", "audit trails",
+                         "dashboard design", "automation macros", "external connections"],
+        }
+        for keyword in ("VLOOKUP", "pivot tables"):
+            for difficulty, items in topics.items():
+                bank.add([f"{keyword}: {t}" for t in items], [keyword], difficulty, "excel")
+        print("Stats:", bank.stats()["questions"], "questions")
+        assert bank.stats()["questions"] == 36
+
+        # A paraphrase of a stored question only gains the new tag, it is not stored twice
+        bank.add(["Explain the use of VLOOKUP in Excel."], ["vlookup"], "basic")
+        assert bank.add(["Can you explain the use of VLOOKUP in Excel?"], ["lookup functions"], "basic") == 0
+        assert bank.count("lookup functions", "basic") == 1 and bank.stats()["questions"] == 37
+
+        # Same topic, different question or difficulty: stored separately so every level fills up
+        assert bank.add(["What is conditional formatting?"], ["conditional formatting"], "basic") == 1
+        assert bank.add(["How would you debug conditional formatting?"], ["conditional formatting"], "basic") == 1
+        bank.add(["How do you use VLOOKUP with exact match?"], ["vlookup"], "basic")
+        assert bank.add(["How do you use VLOOKUP with an exact match?"], ["exact match"], "advanced") == 1
+        assert bank.add(["Would you use VLOOKUP with an exact match?"], ["exact match"], "advanced") == 0
+        assert bank.count("exact match", "advanced") == 1 and bank.count("exact match", "basic") == 0
+        assert bank.stats()["questions"] == 41
+
+        # Identical wording at another difficulty fills that category too
+        assert bank.add(["What is conditional formatting?"], ["conditional formatting"], "medium") == 1
+        assert bank.count("conditional formatting", "medium") == 1
+        assert bank.count("conditional formatting", "basic") == 2 and bank.stats()["questions"] == 42
+
+        # Banks created with a globally unique text_key are upgraded in place
+        old = tmp / "old_bank.db"
+        with closing(sqlite3.connect(old)) as conn, conn:
+            conn.execute("CREATE TABLE questions (question_id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT NOT NULL, "
+                         "text_key TEXT NOT NULL UNIQUE, difficulty TEXT NOT NULL, tech_stack TEXT, created REAL)")
+            conn.execute("INSERT INTO questions VALUES (7, 'What is a chart?', 'what is a chart?', 'basic', NULL, 0)")
+        upgraded = QuestionBank(old)
+        assert upgraded.text(7) == "What is a chart?"
+        assert upgraded.add(["What is a chart?"], ["charts"], "advanced") == 1
+
+        # A failed Gemini top-up is counted and the bank serves what it has
+        failures = BANK_TOP_UP_FAILURES._child({"error": "RuntimeError"}).value
+
+        def failing_top_up(*args, **kwargs):
+            raise RuntimeError("Gemini unavailable")
+        bank.top_up = failing_top_up
+        assert len(bank.questions_for("excel", "vlookup, charts", yoe=2, n=3, seed=1)) == 3
+        assert BANK_TOP_UP_FAILURES._child({"error": "RuntimeError"}).value == failures + 2
+        del bank.top_up
+
+        # Fresher: basic + medium only, every keyword covered
+        picked = bank.assemble("vlookup, Pivot Tables", yoe=0, n=5, seed="c001")
+        for q in picked:
+            print(f"  [{q['keyword']} / {q['difficulty']}] {q['question']}")
+        assert len(picked) == 5 and len({q["question_id"] for q in picked}) == 5
+        assert {q["difficulty"] for q in picked} <= {"basic", "medium"}
+        assert {q["keyword"] for q in picked} == {"vlookup", "pivot tables"}
+        assert bank.assemble("vlookup", yoe=6, n=3, seed=1)[0]["difficulty"] == "advanced"
+        assert bank.thin_categories("vlookup, charts", yoe=2) == [("charts", "medium"), ("charts", "advanced")]
+
+        # Near-duplicate filter used for each candidate's set
+        kept = dedupe(["What is the purpose of pivot tables?",
+                       "What is the purpose of a pivot table in Excel?",
+                       "How do you protect cells or a worksheet?"])
+        print("Kept after dedupe:", kept)
+        assert kept == [0, 2]
+
+        start = time.perf_counter()
+        for i in range(1000):
+            bank.assemble("vlookup, pivot tables", yoe=2, n=5, seed=i)
+        print(f"assemble(): {(time.perf_counter() - start) * 1000:.3f} µs avg")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_test()
@@ -0,0 +1,66 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.session_store import MemorySessionStore, SQLiteSessionStore
+
+
+def run_test():
+    # Memory store: least recently used session is evicted first
+    memory = MemorySessionStore(max_sessions=2, ttl_seconds=60)
+    memory.put("a", {"n": 1})
+    memory.put("b", {"n": 2})
+    assert memory.get("a") == {"n": 1}  # "a" is now the most recent
+    memory.put("c", {"n": 3})
+    assert "b" not in memory and "a" in memory and len(memory) == 2
+
+    # ...and idle sessions expire after the TTL
+    short = MemorySessionStore(ttl_seconds=0.1)
+    short.put("x", {"n": 1})
+    time.sleep(0.2)
+    assert short.get("x") is None and len(short) == 0
+    assert memory.pop("a") == {"n": 1} and memory.pop("a") is None
+
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        # SQLite store: expired sessions are invisible and purged
+        sessions = SQLiteSessionStore(tmp / "sessions.db", ttl_seconds=0.2)
+        sessions.put("old", {"n": 1})
+        time.sleep(0.3)
+        sessions.put("new", {"n": 2})
+        assert sessions.get("old") is None and sessions.pop("old") is None
+        assert sessions.get("new") == {"n": 2} and len(sessions) == 1
+        assert sessions.purge_expired() == 1
+
+        # Two workers finishing the same interview: only one of them gets the session
+        workers = [SQLiteSessionStore(tmp / "sessions.db") for _ in range(8)]
+        for round_ in range(5):
+            workers[0].put("last-answer", {"round": round_})
+            got = []
+            barrier = threading.Barrier(len(workers))
+
+            def finish(store):
+                barrier.wait()
+                record = store.pop("last-answer")
+                if record is not None:
+                    got.append(record)
+
+            threads = [threading.Thread(target=finish, args=(w,)) for w in workers]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert got == [{"round": round_}], got
+        print("✅ Session stores evict, expire and pop atomically")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_test()
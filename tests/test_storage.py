@@ -0,0 +1,73 @@
+import sys
+import os
+import shutil
+import tempfile
+from pathlib import Path
+import pandas as pd
+
+# Add project root to PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import excel_handler as eh
+from utils.storage import SQLiteCandidateStore
+
+
+def run_test():
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        # Seed a throwaway SQLite store from a small workbook
+        seed = tmp / "candidates.xlsx"
+        pd.DataFrame([
+            {"candidate_id": "c001", "name": "Alice", "tech_stack": "excel", "yoe": "0", "status": "pending"},
+            {"candidate_id": "c002", "name": "Bob", "tech_stack": "excel", "yoe": "3", "status": "pending"},
+        ]).to_excel(seed, index=False)
+        store = SQLiteCandidateStore(tmp / "candidates.db", seed_excel=seed)
+        eh.set_store(store)
+
+        df = eh._load_candidates()
+        print("Seeded rows:", len(df))
+        candidate_id = df["candidate_id"].iloc[0]
+
+        version = eh.data_version()
+        eh.set_status(candidate_id, "in_progress")
+        assert eh.data_version() != version  # UI caches keyed on it are invalidated
+        eh.append_transcript(candidate_id, {"question": "What is VLOOKUP?", "score": 8})
+        eh.update_candidate(candidate_id, {"new_column": {"a": 1}})
+
+        c = eh.get_candidate(candidate_id)
+        print("After update:", c["status"], c["transcript_json"], c["new_column"])
+        assert c["status"] == "in_progress"
+
+        # Round-trip through Excel export / import
+        exported = tmp / "export.xlsx"
+        print("Exported rows:", eh.export_to_excel(exported))
+        print("Imported rows:", eh.import_from_excel(exported))
+        assert eh.get_candidate(candidate_id)["new_column"] == '{"a": 1}'
+
+        # Batched updates are written together when the block exits
+        with eh.batch():
+            eh.set_status("c001", "completed")
+            eh.update_candidate("c002", {"summary_json": {"average_score": 7}})
+            print("Inside batch:", eh.get_candidate("c001")["status"])
+        assert eh.get_candidate("c002")["summary_json"] == '{"average_score": 7}'
+
+        # Paginated, filtered queries come straight from the store
+        page, total = eh.query_candidates(status="completed", limit=1)
+        print("Completed:", total, page["candidate_id"].tolist())
+        assert total == 1 and page["candidate_id"].tolist() == ["c001"]
+        assert eh.query_candidates(prefix="bo")[1] == 1
+        assert eh.query_candidates(limit=1, offset=1)[0]["candidate_id"].tolist() == ["c002"]
+
+        # Repeated reads without writes are served from the cache
+        before = eh.cache_stats()["hits"]
+        for _ in range(5):
+            eh._load_candidates()
+            eh.get_candidate(candidate_id)
+        print("Cache stats:", eh.cache_stats())
+        assert eh.cache_stats()["hits"] - before >= 9
+    finally:
+        eh.set_store(None)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_test()
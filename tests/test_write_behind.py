@@ -0,0 +1,114 @@
+import sys
+import os
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+import pandas as pd
+
+# Add project root to PYTHONPATH
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from utils import excel_handler as eh
+from utils.storage import SQLiteCandidateStore
+from utils.write_behind import WRITE_BEHIND_DROPPED
+
+# A process that buffers updates and dies before any flush
+_CRASH = """
+import os, sys
+sys.path.insert(0, {root!r})
+from utils import excel_handler as eh
+from utils.storage import SQLiteCandidateStore
+eh.set_store(SQLiteCandidateStore({db!r}))
+eh.enable_write_behind(log_dir={log_dir!r}, interval=0, max_dirty=1000)
+eh.set_status("c002", "crashed")
+eh.append_transcript("c002", {{"question": "before crash"}})
+os._exit(1)
+"""
+
+
+def run_test():
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        db, log_dir = tmp / "candidates.db", tmp / "write_behind"
+        store = SQLiteCandidateStore(db)
+        store.save_all(pd.DataFrame([
+            {"candidate_id": f"c{i:03d}", "name": f"Candidate {i}", "status": "pending"} for i in range(5)
+        ]))
+        eh.set_store(store)
+
+        writes = []
+        update_many = store.update_many
+        store.update_many = lambda *a, **k: (writes.append(a[0]), update_many(*a, **k))[1]
+
+        # A burst of updates is buffered: no store writes, but reads see the values
+        buffer = eh.enable_write_behind(log_dir=log_dir, interval=0, max_dirty=1000)
+        for i in range(50):
+            cid = f"c{i % 5:03d}"
+            eh.set_status(cid, "in_progress")
+            eh.append_transcript(cid, {"question": f"q{i}"})
+            eh.update_candidate(cid, {"summary_json": {"average_score": i}})
+        assert writes == []
+        assert eh.get_candidate("c001")["status"] == "in_progress"
+        assert len(json.loads(eh.get_candidate("c001")["transcript_json"])) == 10
+        assert set(eh._load_candidates()["status"]) == {"in_progress"}
+        assert store.get("c001")["status"] == "pending"
+
+        # ...and written in one save
+        assert eh.flush_writes() == 5
+        print("Buffered updates:", buffer.stats["updates"], "store writes:", len(writes))
+        assert len(writes) == 1 and store.get("c004")["summary_json"] == '{"average_score": 49}'
+        assert not list(log_dir.glob("*.log"))
+
+        # Size-triggered flush
+        eh.enable_write_behind(log_dir=log_dir, interval=0, max_dirty=2)
+        eh.set_status("c000", "reviewed")
+        assert len(writes) == 1
+        eh.set_status("c001", "reviewed")
+        assert len(writes) == 2 and store.get("c001")["status"] == "reviewed"
+
+        # Interval-triggered flush
+        eh.enable_write_behind(log_dir=log_dir, interval=0.05, max_dirty=1000)
+        eh.set_status("c003", "completed")
+        time.sleep(0.5)
+        assert store.get("c003")["status"] == "completed"
+        eh.disable_write_behind()
+
+        # Crash before flushing: the log is replayed by the next process to start
+        crashed = subprocess.run([sys.executable, "-c", _CRASH.format(root=ROOT, db=str(db), log_dir=str(log_dir))])
+        assert crashed.returncode == 1 and list(log_dir.glob("*.log"))
+        assert store.get("c002")["status"] != "crashed"
+        replayed = eh.enable_write_behind(log_dir=log_dir, interval=0)
+        print("Replayed rows:", replayed.stats["replayed"])
+        c002 = store.get("c002")
+        assert c002["status"] == "crashed" and json.loads(c002["transcript_json"])[-1]["question"] == "before crash"
+        assert not list(log_dir.glob("*.log"))
+
+        try:
+            eh.set_status("missing", "x")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("unknown candidate should still be rejected")
+        assert not list(log_dir.glob("*.log")), "rejected updates must not be logged"
+
+        # A row deleted before the flush is dropped and counted; the rest of the batch is written
+        dropped = WRITE_BEHIND_DROPPED._child({}).value
+        eh.set_status("c001", "deleted-later")
+        eh.set_status("c004", "kept")
+        store.save_all(store.load_all().query("candidate_id != 'c001'"))
+        assert eh.flush_writes() == 2
+        print("Dropped rows:", replayed.stats["dropped"])
+        assert replayed.stats["dropped"] == 1 and WRITE_BEHIND_DROPPED._child({}).value == dropped + 1
+        assert store.get("c001") is None and store.get("c004")["status"] == "kept"
+        print("✅ Write-behind buffer works")
+    finally:
+        eh.disable_write_behind()
+        eh.set_store(None)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_test()
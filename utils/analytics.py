@@ -0,0 +1,174 @@
+"""
+Cohort analytics for the admin dashboard.
+
+Transcripts are decoded once into a columnar fact table (one row per
+candidate/question/score); every statistic afterwards is a vectorized
+pandas/NumPy operation over that table. With the SQLite store the answers
+already come as rows (eh.load_latest_answers()) and no JSON is decoded.
+"""
+import numpy as np
+import pandas as pd
+import json
+
+# YOE bands follow the question-generation rules (0-1 fresher, 2-3 mid, 4+ senior)
+YOE_BINS = [-np.inf, 1, 3, np.inf]
+YOE_LABELS = ["0-1", "2-3", "4+"]
+PASS_MARK = 6.0
+
+FACT_COLUMNS = ["candidate_id", "tech_stack", "keywords", "yoe", "timestamp", "question_idx", "question", "score"]
+
+
+def _empty_facts() -> pd.DataFrame:
+    facts = pd.DataFrame({c: pd.Series(dtype=object) for c in FACT_COLUMNS})
+    facts["score"] = facts["score"].astype(float)
+    facts["yoe"] = facts["yoe"].astype(float)
+    facts["yoe_band"] = pd.cut(facts["yoe"], bins=YOE_BINS, labels=YOE_LABELS)
+    return facts
+
+
+def _decode(raw):
+    """json.loads for a transcript cell; anything unusable becomes []."""
+    if not isinstance(raw, str) or not raw.strip():
+        return []
+    try:
+        value = json.loads(raw)
+    except (ValueError, TypeError):
+        return []
+    return value if isinstance(value, list) else []
+
+
+def build_fact_table(candidates_df: pd.DataFrame, answers: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    One row per answered question of each candidate's latest interview.
+    answers: optional (candidate_id, question_idx, question, score) rows from the interview
+    tables; candidates not covered by it fall back to last_interview_json / transcript_json.
+    """
+    if candidates_df is None or candidates_df.empty:
+        return _empty_facts()
+
+    if answers is None or answers.empty:
+        return _facts_from_json(candidates_df)
+
+    attrs = [c for c in ("candidate_id", "tech_stack", "keywords", "yoe", "timestamp") if c in candidates_df.columns]
+    facts = answers[["candidate_id", "question_idx", "question", "score"]].merge(
+        candidates_df[attrs], on="candidate_id", how="inner"
+    )
+    for col in FACT_COLUMNS:
+        if col not in facts.columns:
+            facts[col] = None
+    facts["yoe"] = pd.to_numeric(facts["yoe"], errors="coerce")
+    facts["timestamp"] = pd.to_datetime(facts["timestamp"], errors="coerce")
+    facts["score"] = pd.to_numeric(facts["score"], errors="coerce")
+    facts["tech_stack"] = facts["tech_stack"].fillna("").astype(str).str.strip().str.lower()
+    facts["yoe_band"] = pd.cut(facts["yoe"], bins=YOE_BINS, labels=YOE_LABELS)
+    facts = facts[FACT_COLUMNS + ["yoe_band"]]
+
+    legacy = candidates_df[~candidates_df["candidate_id"].isin(answers["candidate_id"])]
+    legacy_facts = _facts_from_json(legacy) if not legacy.empty else None
+    if legacy_facts is None or legacy_facts.empty:
+        return facts.reset_index(drop=True)
+    return pd.concat([facts, legacy_facts], ignore_index=True)
+
+
+def _facts_from_json(df: pd.DataFrame) -> pd.DataFrame:
+    """Fact rows decoded from the legacy transcript JSON columns."""
+    last = df["last_interview_json"] if "last_interview_json" in df.columns else pd.Series(None, index=df.index)
+    fallback = df["transcript_json"] if "transcript_json" in df.columns else pd.Series(None, index=df.index)
+    raw = last.where(last.notna() & (last.astype(str).str.strip() != ""), fallback)
+
+    # The only per-row Python work: decode each JSON cell once
+    transcripts = [_decode(r) for r in raw.tolist()]
+    lengths = np.fromiter((len(t) for t in transcripts), dtype=np.int64, count=len(transcripts))
+    if lengths.sum() == 0:
+        return _empty_facts()
+
+    entries = [e if isinstance(e, dict) else {} for t in transcripts for e in t]
+
+    def repeat(col):
+        # Broadcast a per-candidate column to one value per answer
+        if col not in df.columns:
+            return np.full(lengths.sum(), None, dtype=object)
+        return np.repeat(df[col].to_numpy(dtype=object), lengths)
+
+    facts = pd.DataFrame({
+        "candidate_id": repeat("candidate_id"),
+        "tech_stack": repeat("tech_stack"),
+        "keywords": repeat("keywords"),
+        "yoe": pd.to_numeric(pd.Series(repeat("yoe")), errors="coerce").to_numpy(),
+        "timestamp": pd.to_datetime(pd.Series(repeat("timestamp")), errors="coerce").to_numpy(),
+        "question_idx": np.concatenate([np.arange(n) for n in lengths]),
+        "question": [e.get("question") for e in entries],
+        "score": pd.to_numeric(pd.Series([e.get("score") for e in entries]), errors="coerce").to_numpy(),
+    })
+    facts["tech_stack"] = facts["tech_stack"].fillna("").astype(str).str.strip().str.lower()
+    facts["yoe_band"] = pd.cut(facts["yoe"], bins=YOE_BINS, labels=YOE_LABELS)
+    return facts
+
+
+def score_distribution(facts: pd.DataFrame, bins=None) -> pd.DataFrame:
+    """Histogram of scores (default: one bin per integer score 0..10)."""
+    bins = np.arange(0, 12) if bins is None else np.asarray(bins)
+    scores = facts["score"].dropna().to_numpy(dtype=float)
+    counts, edges = np.histogram(scores, bins=bins)
+    return pd.DataFrame({"score": edges[:-1].astype(int), "count": counts})
+
+
+def score_percentiles(facts: pd.DataFrame, q=(10, 25, 50, 75, 90)) -> dict:
+    scores = facts["score"].dropna().to_numpy(dtype=float)
+    if scores.size == 0:
+        return {f"p{p}": None for p in q}
+    return {f"p{p}": float(v) for p, v in zip(q, np.percentile(scores, q))}
+
+
+def keyword_averages(facts: pd.DataFrame) -> pd.DataFrame:
+    """Mean answer score per skill keyword (comma-separated per candidate, matched case-insensitively)."""
+    kw = facts[["keywords", "score"]].dropna(subset=["score"])
+    kw = kw.assign(keyword=kw["keywords"].fillna("").astype(str).str.split(",")).explode("keyword")
+    kw["keyword"] = kw["keyword"].str.strip().str.lower()
+    kw = kw[kw["keyword"] != ""]
+    out = kw.groupby("keyword")["score"].agg(["mean", "count"]).reset_index()
+    return out.sort_values("mean", ascending=False, ignore_index=True)
+
+
+def tech_stack_averages(facts: pd.DataFrame) -> pd.DataFrame:
+    out = facts.dropna(subset=["score"]).groupby("tech_stack")["score"].agg(["mean", "median", "count"])
+    return out.reset_index().sort_values("mean", ascending=False, ignore_index=True)
+
+
+def candidate_scores(facts: pd.DataFrame) -> pd.DataFrame:
+    """Average score per candidate (with their YOE band)."""
+    scored = facts.dropna(subset=["score"])
+    return scored.groupby("candidate_id", observed=True).agg(
+        average_score=("score", "mean"),
+        answers=("score", "size"),
+        yoe_band=("yoe_band", "first"),
+    ).reset_index()
+
+
+def pass_rates_by_yoe(facts: pd.DataFrame, pass_mark: float = PASS_MARK) -> pd.DataFrame:
+    """Share of candidates whose average score >= pass_mark, per YOE band."""
+    per_candidate = candidate_scores(facts)
+    per_candidate["passed"] = per_candidate["average_score"] >= pass_mark
+    out = per_candidate.groupby("yoe_band", observed=False).agg(
+        candidates=("candidate_id", "size"),
+        pass_rate=("passed", "mean"),
+        average_score=("average_score", "mean"),
+    )
+    return out.reset_index()
+
+
+def cohort_summary(candidates_df: pd.DataFrame, pass_mark: float = PASS_MARK, answers: pd.DataFrame = None) -> dict:
+    """All dashboard statistics from one pass over the transcripts."""
+    facts = build_fact_table(candidates_df, answers)
+    scores = facts["score"].dropna()
+    return {
+        "facts": facts,
+        "answers": int(scores.size),
+        "candidates": int(facts["candidate_id"].nunique()),
+        "mean_score": float(scores.mean()) if scores.size else None,
+        "percentiles": score_percentiles(facts),
+        "distribution": score_distribution(facts),
+        "by_keyword": keyword_averages(facts),
+        "by_tech_stack": tech_stack_averages(facts),
+        "by_yoe": pass_rates_by_yoe(facts, pass_mark),
+    }
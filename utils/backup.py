@@ -0,0 +1,341 @@
+"""
+Backup policies for the candidate store.
+
+JournalBackupPolicy keeps an append-only journal of row diffs plus periodic
+full snapshots, so each write costs O(size of the change) instead of a full
+workbook copy. Any point in time since the oldest retained snapshot can be
+rebuilt with restore(until=...).
+
+Stores with more than the candidates table (SQLite: interviews, answer_evaluations)
+pass {table: DataFrame} instead of a single frame; snapshots then hold every table
+and journal entries carry the rows they inserted.
+
+Layout of backup_dir:
+    snapshot_<seq>.json[.gz]   full table state after journal entry <seq>
+    journal_<seq>.jsonl[.gz]   entries seq+1, seq+2, ... recorded after that snapshot:
+                               {"seq", "ts", "changes": {candidate_id: {col: value}},
+                                "inserts": {table: [row, ...]}}  (inserts optional)
+    .lock                      held while writing; the last seq is re-read from disk under it,
+                               so several processes can share one backup_dir
+"""
+import pandas as pd
+from pathlib import Path
+from contextlib import contextmanager
+import argparse
+import datetime
+import gzip
+import json
+import os
+import shutil
+import threading
+
+from utils import metrics
+from utils.file_lock import FileLock
+
+SNAPSHOT_PREFIX = "snapshot_"
+JOURNAL_PREFIX = "journal_"
+
+BACKUP_SECONDS = metrics.histogram("backup_seconds", "Backup write time", ["operation"])
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="microseconds")
+
+
+def _open_text(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _seq_of(path: Path) -> int:
+    name = path.name.split(".", 1)[0]
+    return int(name.rsplit("_", 1)[1])
+
+
+def _frame_to_payload(df: pd.DataFrame) -> dict:
+    clean = df.astype(object).where(pd.notna(df), None)
+    return {"columns": [str(c) for c in clean.columns], "rows": clean.values.tolist()}
+
+
+def _tables(frames) -> dict:
+    """{table: DataFrame}; a single frame is the candidates table."""
+    return {"candidates": frames} if isinstance(frames, pd.DataFrame) else dict(frames)
+
+
+def _payload_to_rows(payload: dict):
+    columns = list(payload["columns"])
+    rows = {}
+    for values in payload["rows"]:
+        row = dict(zip(columns, values))
+        rows[row.get("candidate_id")] = row
+    return columns, rows
+
+
+class NoBackupPolicy:
+    """
+    Keep no backups at all. Also documents the hooks stores call:
+    ensure_base() before a write, record() for a row update (plus rows inserted into
+    other tables) and snapshot() for a full replace. Stores call record()/snapshot()
+    inside their write critical section, before the change is committed, so the
+    journal has the same order as the store. load_frame() and snapshot() take the
+    candidates DataFrame or {table: DataFrame}.
+    """
+
+    def ensure_base(self, load_frame):
+        pass
+
+    def record(self, changes: dict, load_frame, inserts: dict = None):
+        pass
+
+    def snapshot(self, df):
+        pass
+
+
+class CopyBackupPolicy(NoBackupPolicy):
+    """Legacy behaviour: copy the whole workbook before every save, bounded by `keep`."""
+
+    def __init__(self, source: Path, backup_dir: Path, keep: int = 50):
+        self.source = Path(source)
+        self.backup_dir = Path(backup_dir)
+        self.keep = keep
+
+    @BACKUP_SECONDS.time(operation="copy")
+    def copy(self):
+        """Copy the source file into backup_dir and drop copies beyond `keep`."""
+        if not self.source.exists():
+            return None
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        backup_path = self.backup_dir / f"candidates_backup_{ts}{self.source.suffix}"
+        shutil.copy(self.source, backup_path)
+
+        backups = sorted(self.backup_dir.glob(f"candidates_backup_*{self.source.suffix}"))
+        for old in backups[:-self.keep] if self.keep else []:
+            old.unlink(missing_ok=True)
+        return backup_path
+
+    def ensure_base(self, load_frame):
+        self.copy()
+
+
+class JournalBackupPolicy(NoBackupPolicy):
+    """
+    Append-only row-diff journal + periodic snapshots with retention.
+    snapshot_every: journal entries between two snapshots
+    keep_snapshots: snapshots (and their journal segments) kept on disk
+    compress: gzip snapshots and closed journal segments
+    """
+
+    def __init__(self, backup_dir: Path, snapshot_every: int = 100,
+                 keep_snapshots: int = 10, compress: bool = True):
+        self.backup_dir = Path(backup_dir)
+        self.snapshot_every = max(1, int(snapshot_every))
+        self.keep_snapshots = max(1, int(keep_snapshots))
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(self.backup_dir / ".lock")
+        self._seq = None          # last journal sequence number written
+        self._has_base = False    # a snapshot exists to replay from
+        self._since_snapshot = 0  # entries in the open journal segment
+
+    # ---------- discovery ----------
+    def _snapshots(self):
+        return sorted(self.backup_dir.glob(f"{SNAPSHOT_PREFIX}*.json*"), key=_seq_of)
+
+    def _journals(self):
+        return sorted(self.backup_dir.glob(f"{JOURNAL_PREFIX}*.jsonl*"), key=_seq_of)
+
+    def _open_journal(self):
+        journals = self._journals()
+        if journals and journals[-1].suffix == ".jsonl":
+            return journals[-1]
+        return None
+
+    def _load_state(self):
+        """Last seq on disk; re-read on every write since another process may have appended."""
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        snapshots = self._snapshots()
+        self._has_base = bool(snapshots)
+        self._seq = _seq_of(snapshots[-1]) if snapshots else -1
+        self._since_snapshot = 0
+        journal = self._open_journal()
+        if journal is not None:
+            with _open_text(journal, "r") as fh:
+                for line in fh:
+                    if line.strip():
+                        self._seq = max(self._seq, json.loads(line)["seq"])
+                        self._since_snapshot += 1
+
+    # ---------- writing ----------
+    def _write_snapshot(self, frames):
+        tables = _tables(frames)
+        payload = {"seq": self._seq, "ts": _now(), **_frame_to_payload(tables.pop("candidates"))}
+        if tables:
+            payload["tables"] = {name: _frame_to_payload(df) for name, df in tables.items()}
+        suffix = ".json.gz" if self.compress else ".json"
+        path = self.backup_dir / f"{SNAPSHOT_PREFIX}{self._seq:012d}{suffix}"
+        tmp = path.with_name(path.name + ".tmp")
+        opener = gzip.open(tmp, "wt", encoding="utf-8") if self.compress else open(tmp, "w", encoding="utf-8")
+        with opener as fh:
+            json.dump(payload, fh, ensure_ascii=False)
+        os.replace(tmp, path)
+        self._has_base = True
+
+        # Close the current journal segment and start a new one after this snapshot
+        journal = self._open_journal()
+        if journal is not None and self.compress:
+            with open(journal, "rb") as src, gzip.open(journal.with_name(journal.name + ".gz"), "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            journal.unlink()
+        (self.backup_dir / f"{JOURNAL_PREFIX}{self._seq:012d}.jsonl").touch()
+        self._since_snapshot = 0
+        self._apply_retention()
+
+    def _apply_retention(self):
+        snapshots = self._snapshots()
+        if len(snapshots) <= self.keep_snapshots:
+            return
+        oldest_kept = _seq_of(snapshots[-self.keep_snapshots])
+        for path in snapshots[:-self.keep_snapshots]:
+            path.unlink(missing_ok=True)
+        for path in self._journals():
+            if _seq_of(path) < oldest_kept:
+                path.unlink(missing_ok=True)
+
+    @contextmanager
+    def _exclusive(self):
+        with self._lock, self._file_lock:
+            self._load_state()
+            yield
+
+    def ensure_base(self, load_frame):
+        """Take the initial snapshot before the first journaled change."""
+        if self._has_base:
+            return
+        with self._exclusive():
+            if not self._has_base:
+                self._seq = max(self._seq, 0)
+                self._write_snapshot(load_frame())
+
+    @BACKUP_SECONDS.time(operation="journal")
+    def record(self, changes: dict, load_frame, inserts: dict = None):
+        """
+        Append one journal entry: changes {candidate_id: {col: value}} and the rows
+        inserted into other tables {table: [row dict, ...]}; snapshot every N entries.
+        """
+        if not changes and not inserts:
+            return
+        with self._exclusive():
+            self._seq += 1
+            entry = {"seq": self._seq, "ts": _now(), "changes": changes}
+            if inserts:
+                entry["inserts"] = inserts
+            journal = self._open_journal() or self.backup_dir / f"{JOURNAL_PREFIX}{self._seq - 1:012d}.jsonl"
+            with open(journal, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._since_snapshot += 1
+
+            if self._since_snapshot >= self.snapshot_every:
+                self._write_snapshot(load_frame())
+
+    @BACKUP_SECONDS.time(operation="snapshot")
+    def snapshot(self, df):
+        """Force a snapshot (full-table replacements can't be expressed as row diffs)."""
+        with self._exclusive():
+            self._seq += 1
+            self._write_snapshot(df)
+
+    # ---------- reading ----------
+    def restore(self, until=None) -> pd.DataFrame:
+        """
+        Rebuild the candidates table as it was at `until` (datetime or ISO string;
+        None = latest) from the newest snapshot at or before that time plus the journal after it.
+        """
+        return self.restore_tables(until)["candidates"]
+
+    def restore_tables(self, until=None) -> dict:
+        """Like restore(), for every backed-up table: {table: DataFrame}, candidates first."""
+        if isinstance(until, datetime.datetime):
+            until = until.isoformat(timespec="microseconds")
+
+        base = None
+        for path in reversed(self._snapshots()):
+            with _open_text(path, "r") as fh:
+                payload = json.load(fh)
+            if until is None or payload["ts"] <= until:
+                base = payload
+                break
+        if base is None:
+            raise ValueError(f"No snapshot available at or before {until}.")
+
+        columns, rows = _payload_to_rows(base)
+        others = {name: (list(table["columns"]), [dict(zip(table["columns"], values)) for values in table["rows"]])
+                  for name, table in base.get("tables", {}).items()}
+
+        def frames():
+            out = {"candidates": pd.DataFrame(list(rows.values()), columns=columns)}
+            for name, (cols, table_rows) in others.items():
+                out[name] = pd.DataFrame(table_rows, columns=cols)
+            return out
+
+        for journal in self._journals():
+            if _seq_of(journal) < base["seq"]:
+                continue
+            with _open_text(journal, "r") as fh:
+                for line in fh:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if entry["seq"] <= base["seq"]:
+                        continue
+                    if until is not None and entry["ts"] > until:
+                        return frames()
+                    for candidate_id, updates in entry["changes"].items():
+                        row = rows.get(candidate_id)
+                        if row is None:
+                            continue
+                        for col, val in updates.items():
+                            if col not in columns:
+                                columns.append(col)
+                            row[col] = val
+                    for name, inserted in entry.get("inserts", {}).items():
+                        cols, table_rows = others.setdefault(name, ([], []))
+                        for row in inserted:
+                            cols += [c for c in row if c not in cols]
+                            table_rows.append(row)
+
+        return frames()
+
+
+def build_policy(kind: str, backup_dir: Path, source: Path = None):
+    """Create a backup policy from BACKUP_* environment settings."""
+    kind = (kind or "journal").lower()
+    if kind == "none":
+        return NoBackupPolicy()
+    if kind == "copy":
+        return CopyBackupPolicy(source, backup_dir, keep=int(os.getenv("BACKUP_KEEP_COPIES", "50")))
+    if kind == "journal":
+        return JournalBackupPolicy(
+            backup_dir,
+            snapshot_every=int(os.getenv("BACKUP_SNAPSHOT_EVERY", "100")),
+            keep_snapshots=int(os.getenv("BACKUP_KEEP_SNAPSHOTS", "10")),
+            compress=os.getenv("BACKUP_COMPRESS", "1") not in ("0", "false", "no"),
+        )
+    raise ValueError(f"Unknown BACKUP_POLICY: {kind}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild candidates (and interviews) from the backup journal.")
+    parser.add_argument("backup_dir", help="Directory holding snapshot_*/journal_* files")
+    parser.add_argument("--until", help="ISO timestamp to restore to (default: latest)")
+    parser.add_argument("--out", default="candidates_restored.xlsx",
+                        help="Output workbook (one sheet per table, candidates first)")
+    args = parser.parse_args()
+
+    restored = JournalBackupPolicy(args.backup_dir).restore_tables(args.until)
+    with pd.ExcelWriter(args.out, engine="openpyxl") as writer:
+        for name, df in restored.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    counts = ", ".join(f"{len(df)} {name}" for name, df in restored.items())
+    print(f"✅ Restored {counts} to {args.out}")
@@ -0,0 +1,130 @@
+"""
+Near-duplicate detection for interview questions (MinHash over word shingles + LSH).
+
+A question becomes a set of k-word shingles over its content words (stop words
+such as "explain", "the", "how" are dropped, plurals folded); MinHash compresses that set into a
+fixed-size signature whose matching positions estimate Jaccard similarity. The
+LSH index buckets signatures band by band, so a lookup only compares against
+questions sharing at least one band instead of scanning everything.
+"""
+import re
+import zlib
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.6
+NUM_PERM = 64
+# Word pairs: single words call "What is X?" and "How would you debug X?" duplicates
+SHINGLE_SIZE = 2
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"[a-z0-9]+")
+# Question phrasing that carries no topic
+STOP_WORDS = frozenset(
+    "a an and are based be by can could describe do does explain for from how in is it of on or "
+    "please some the this to use used using what when which why with would you your".split()
+)
+
+
+def _content_words(text: str) -> list:
+    words = [w for w in _WORD.findall(str(text or "").lower()) if w not in STOP_WORDS]
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words]
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> set:
+    """k-word shingles of the content words (fewer words -> one shingle)."""
+    words = _content_words(text)
+    if len(words) < k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+class MinHasher:
+    """Signatures of num_perm universal hash functions (a*x + b) mod p, computed with NumPy."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        # a, b < 2**31 keep a*x + b below 2**64 for 32-bit shingle hashes
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles(text)), dtype=np.uint64
+        )
+        if hashes.size == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        values = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return (values & _MAX_HASH).min(axis=1)
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+
+def _bands_for(threshold: float, num_perm: int):
+    """(bands, rows) with bands*rows == num_perm whose S-curve midpoint is closest to threshold."""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class LSHIndex:
+    """
+    Banded LSH over MinHash signatures.
+    add(key, text) / query(text) are O(bands) dict lookups plus a check of the few colliding keys.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = NUM_PERM, hasher: MinHasher = None):
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher(num_perm)
+        self.bands, self.rows = _bands_for(threshold, self.hasher.num_perm)
+        self._buckets = [dict() for _ in range(self.bands)]
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, sig):
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key, text: str = None, signature: np.ndarray = None):
+        sig = self.hasher.signature(text) if signature is None else signature
+        self._signatures[key] = sig
+        for bucket, band in zip(self._buckets, self._band_keys(sig)):
+            bucket.setdefault(band, []).append(key)
+        return sig
+
+    def query(self, text: str = None, signature: np.ndarray = None) -> list:
+        """[(key, similarity)] of stored items at or above the threshold, most similar first."""
+        sig = self.hasher.signature(text) if signature is None else signature
+        seen = set()
+        for bucket, band in zip(self._buckets, self._band_keys(sig)):
+            seen.update(bucket.get(band, ()))
+        matches = [(k, similarity(sig, self._signatures[k])) for k in seen]
+        return sorted((m for m in matches if m[1] >= self.threshold), key=lambda m: -m[1])
+
+    def find_duplicate(self, text: str = None, signature: np.ndarray = None):
+        """Key of the most similar stored item, or None."""
+        matches = self.query(text, signature)
+        return matches[0][0] if matches else None
+
+
+def dedupe(texts: list, threshold: float = DEFAULT_THRESHOLD, against: LSHIndex = None) -> list:
+    """
+    Indices of `texts` to keep: a text that is a near-duplicate of an earlier one
+    (or of anything stored in `against`) is dropped.
+    """
+    local = LSHIndex(threshold, hasher=against.hasher if against is not None else None)
+    keep = []
+    for i, text in enumerate(texts):
+        sig = local.hasher.signature(text)
+        if local.find_duplicate(signature=sig) is not None:
+            continue
+        if against is not None and against.find_duplicate(signature=sig) is not None:
+            continue
+        local.add(i, signature=sig)
+        keep.append(i)
+    return keep
@@ -1,51 +1,347 @@
 import pandas as pd
-from openpyxl import load_workbook
 from pathlib import Path
+from contextlib import contextmanager
+import atexit
 import datetime
 import json
-import shutil
+import os
+import random
+import threading
+import time
+
+from utils import metrics, settings
+from utils.backup import CopyBackupPolicy, build_policy
+from utils.storage import (ConflictError, ExcelCandidateStore, SQLiteCandidateStore, filter_candidates,
+                           row_version)
+from utils.write_behind import WriteBehindBuffer
 
 # Path constants
-CANDIDATES_FILE = Path(__file__).resolve().parent.parent / "candidates.xlsx"
-BACKUP_DIR = Path(__file__).resolve().parent.parent / "data" / "backups"
+CANDIDATES_FILE = settings.PROJECT_ROOT / "candidates.xlsx"
+BACKUP_DIR = settings.data_path("backups")
+DB_FILE = settings.data_path("candidates.db")
+
+# Storage backend: "sqlite" (indexed, default) or "excel" (legacy whole-workbook writes)
+STORE_BACKEND = os.getenv("CANDIDATE_STORE", "sqlite").lower()
+
+# Backup policy: "journal" (row-diff journal + rotating snapshots, default), "copy" or "none"
+BACKUP_POLICY = os.getenv("BACKUP_POLICY", "journal").lower()
+
+# Read-modify-write updates (append_transcript, modify_candidate) re-read and retry this
+# many times when another writer changed the row in between
+CAS_RETRIES = int(os.getenv("STORE_CAS_RETRIES", "8"))
+
+# Write-behind: buffer updates (durable log + dirty rows) and save them together every
+# WRITE_BEHIND_INTERVAL seconds or once WRITE_BEHIND_MAX_DIRTY rows are waiting
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "0").lower() in ("1", "true", "yes")
+WRITE_BEHIND_INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL", "2"))
+WRITE_BEHIND_MAX_DIRTY = int(os.getenv("WRITE_BEHIND_MAX_DIRTY", "100"))
+WRITE_BEHIND_DIR = settings.data_path("write_behind")
+
+STORE_SECONDS = metrics.histogram("store_seconds", "Candidate store operation time", ["operation"])
+STORE_CACHE_LOOKUPS = metrics.counter("store_cache_lookups_total", "Candidate read-cache lookups", ["result"])
+STORE_CONFLICTS = metrics.counter("store_conflicts_total", "Row version conflicts on compare-and-swap updates")
+
+_store = None
 
-# Ensure backup dir exists
-BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+# Read cache: parsed DataFrame + {candidate_id: row}, keyed on the store's on-disk version
+_cache = {"version": None, "df": None, "rows": {}}
+_cache_stats = {"hits": 0, "misses": 0}
+_cache_lock = threading.RLock()
+# Bumped on every write made through this module (see data_version())
+_write_generation = 0
+
+# Pending updates of the current thread's batch() block ({candidate_id: {col: value}})
+# and the row versions it read ({candidate_id: version}, checked when the block exits)
+_batch_local = threading.local()
+
+_write_behind = None
+_write_behind_lock = threading.Lock()
+
+
+def get_store():
+    """Return the configured candidate store (created once per process)."""
+    global _store
+    if _store is None:
+        if STORE_BACKEND == "excel":
+            policy = build_policy(BACKUP_POLICY, BACKUP_DIR, source=CANDIDATES_FILE)
+            _store = ExcelCandidateStore(CANDIDATES_FILE, backup_policy=policy)
+        elif STORE_BACKEND == "sqlite":
+            policy = build_policy(BACKUP_POLICY, BACKUP_DIR, source=DB_FILE)
+            _store = SQLiteCandidateStore(DB_FILE, seed_excel=CANDIDATES_FILE, backup_policy=policy)
+        else:
+            raise ValueError(f"Unknown CANDIDATE_STORE backend: {STORE_BACKEND}")
+    return _store
+
+
+def set_store(store):
+    """Swap the active store (tests, scripts pointing at another file)."""
+    global _store
+    flush_writes()  # buffered rows belong to the old store
+    _store = store
+    clear_cache()
 
 
 def _backup_excel():
-    """Create a timestamped backup of the Excel file."""
-    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = BACKUP_DIR / f"candidates_backup_{ts}.xlsx"
-    shutil.copy(CANDIDATES_FILE, backup_path)
-    return backup_path
+    """Create a timestamped full copy of the Excel file (manual / legacy backup; timed as backup_seconds)."""
+    return CopyBackupPolicy(CANDIDATES_FILE, BACKUP_DIR).copy()
+
+
+def restore_backup(until=None):
+    """Rebuild candidates as of `until` from the backup journal (does not write them)."""
+    policy = get_store().backup_policy
+    if not hasattr(policy, "restore"):
+        raise ValueError("Point-in-time restore needs BACKUP_POLICY=journal.")
+    return policy.restore(until)
+
+
+def clear_cache():
+    """Drop cached rows (called after every write made through this module)."""
+    global _write_generation
+    with _cache_lock:
+        _write_generation += 1
+        _cache["version"] = None
+        _cache["df"] = None
+        _cache["rows"] = {}
+
+
+def _bump_generation():
+    global _write_generation
+    with _cache_lock:
+        _write_generation += 1
+
+
+def data_version():
+    """
+    Cheap token that changes after any write: the store's file signature (catches other
+    processes) plus this process's write counter (catches coarse mtime resolution).
+    UI caches key on it instead of re-reading the data.
+    """
+    return get_store().version(), _write_generation
+
+
+# ---------- write-behind ----------
+def enable_write_behind(log_dir=None, interval=None, max_dirty=None, fsync=True):
+    """
+    Route candidate updates through a WriteBehindBuffer (see utils/write_behind.py).
+    Logs left by a crashed process are replayed into the store first.
+    Reads see buffered values; compare-and-swap checks are skipped, so use it where
+    one process owns each candidate's updates (e.g. one interview session per candidate).
+    """
+    global _write_behind
+    disable_write_behind()
+    buffer = WriteBehindBuffer(
+        _flush_buffered,
+        log_dir or WRITE_BEHIND_DIR,
+        interval=WRITE_BEHIND_INTERVAL if interval is None else interval,
+        max_dirty=WRITE_BEHIND_MAX_DIRTY if max_dirty is None else max_dirty,
+        fsync=fsync,
+        exists=lambda candidate_id: _get_stored_candidate(candidate_id) is not None,
+    )
+    _write_behind = buffer.start()
+    return buffer
 
 
+def disable_write_behind():
+    """Flush buffered updates and go back to writing through."""
+    global _write_behind
+    buffer, _write_behind = _write_behind, None
+    if buffer is not None:
+        buffer.close()
+
+
+def flush_writes() -> int:
+    """Write buffered updates to the store now; returns rows written (0 without write-behind)."""
+    return _write_behind.flush() if _write_behind is not None else 0
+
+
+def _buffer():
+    """The active write-behind buffer, started on first use when WRITE_BEHIND=1."""
+    if _write_behind is None and WRITE_BEHIND:
+        with _write_behind_lock:
+            if _write_behind is None:
+                enable_write_behind()
+                atexit.register(disable_write_behind)
+    return _write_behind
+
+
+@STORE_SECONDS.time(operation="write_behind_flush")
+def _flush_buffered(updates_by_id: dict) -> list:
+    """Write buffered rows; returns the ids of rows deleted since they were buffered."""
+    store = get_store()
+    missing = []
+    try:
+        try:
+            store.update_many(updates_by_id)
+        except ValueError:
+            # A buffered row was deleted meanwhile: write the others
+            missing = [cid for cid in updates_by_id if store.get(cid) is None]
+            if len(missing) == len(updates_by_id):
+                return missing
+            store.update_many({cid: u for cid, u in updates_by_id.items() if cid not in missing})
+    finally:
+        clear_cache()
+    return missing
+
+
+def _count_cache(result):
+    _cache_stats[result] += 1
+    STORE_CACHE_LOOKUPS.inc(result=result)
+
+
+def cache_stats():
+    """Return read-cache hit/miss counters."""
+    with _cache_lock:
+        total = _cache_stats["hits"] + _cache_stats["misses"]
+        return {
+            **_cache_stats,
+            "hit_rate": _cache_stats["hits"] / total if total else 0.0,
+        }
+
+
+def _check_cache_version(store):
+    """Invalidate the cache if the backing file changed (other process / manual edit)."""
+    version = store.version()
+    if version is None or version != _cache["version"]:
+        _cache["version"] = version
+        _cache["df"] = None
+        _cache["rows"] = {}
+    return version is not None
+
+
+def _cached_frame(store):
+    """Return the cached DataFrame, parsing the store only on a miss."""
+    if _cache["df"] is not None:
+        _count_cache("hits")
+        return _cache["df"]
+
+    _count_cache("misses")
+    df = store.load_all()
+    _cache["df"] = df
+    _cache["rows"] = {
+        row["candidate_id"]: row for row in df.to_dict(orient="records")
+    }
+    return df
+
+
+@STORE_SECONDS.time(operation="load_candidates")
 def _load_candidates():
-    """Load Excel into pandas DataFrame with safe dtypes (avoid float warnings)."""
-    df = pd.read_excel(CANDIDATES_FILE, engine="openpyxl", dtype=str)
+    """Load all candidates into a pandas DataFrame (string dtypes)."""
+    store = get_store()
+    buffer = _buffer()
+    buffered = buffer.pending() if buffer is not None else {}
+    with _cache_lock:
+        if not _check_cache_version(store):
+            _count_cache("misses")
+            df = store.load_all()
+        else:
+            # Hand out a copy so callers can filter/mutate freely
+            df = _cached_frame(store).copy()
+    return _apply_buffered(df, buffered) if buffered else df
 
-    # Ensure essential columns exist
-    for col in ["transcript_json", "summary_json", "status", "timestamp"]:
-        if col not in df.columns:
-            df[col] = ""  # initialize empty column
 
+def _apply_buffered(df, buffered: dict):
+    positions = dict(zip(df["candidate_id"], df.index))
+    for candidate_id, updates in buffered.items():
+        if candidate_id not in positions:
+            continue
+        for col, val in updates.items():
+            if col not in df.columns:
+                df[col] = ""
+            df[col] = df[col].astype(object)
+            df.at[positions[candidate_id], col] = val
     return df
 
 
+@STORE_SECONDS.time(operation="query_candidates")
+def query_candidates(status=None, tech_stack=None, since=None, until=None, prefix=None,
+                     limit=50, offset=0, columns=None):
+    """
+    One page of candidates matching the filters -> (DataFrame, total matches).
+    The SQLite store answers from its indexes; the Excel store filters the cached frame.
+    """
+    flush_writes()  # filters must see buffered status / timestamp changes
+    store = get_store()
+    if store.indexed:
+        return store.query(status, tech_stack, since, until, prefix, limit, offset, columns)
+    page, total = filter_candidates(_load_candidates(), status, tech_stack, since, until, prefix, limit, offset)
+    return (page[columns] if columns else page), total
+
+
+def distinct_values(column: str) -> list:
+    """Distinct non-empty values of a candidate column (e.g. tech_stack filter choices)."""
+    flush_writes()
+    return get_store().distinct(column)
+
+
+@STORE_SECONDS.time(operation="save_candidates")
 def _save_candidates(df):
-    """Write DataFrame back to Excel (with backup)."""
-    _backup_excel()
-    df.to_excel(CANDIDATES_FILE, index=False, engine="openpyxl")
+    """Replace all candidates with the given DataFrame."""
+    flush_writes()
+    try:
+        get_store().save_all(df)
+    finally:
+        clear_cache()
+
+
+def _serialize(val):
+    """Serialize JSON if dict or list."""
+    if isinstance(val, (dict, list)):
+        return json.dumps(val, ensure_ascii=False)
+    return val
 
 
+def _pending_updates():
+    return getattr(_batch_local, "pending", None)
+
+
+@STORE_SECONDS.time(operation="get_candidate")
 def get_candidate(candidate_id: str):
-    """Return candidate row as dict (or None)."""
-    df = _load_candidates()
-    row = df[df["candidate_id"] == candidate_id]
-    if row.empty:
-        return None
-    return row.iloc[0].to_dict()
+    """
+    Return candidate row as dict (or None). Inside batch() it includes pending updates,
+    and the row's version is remembered so the batch fails if someone else writes it first.
+    """
+    row = _get_stored_candidate(candidate_id)
+    pending = _pending_updates()
+    if row is not None and pending is not None:
+        _batch_local.read_versions.setdefault(candidate_id, row_version(row))
+        row.update(pending.get(candidate_id, {}))
+    return row
+
+
+def _get_stored_candidate(candidate_id: str):
+    """Stored row plus any write-behind values not saved yet."""
+    # Snapshot the buffer first: a flush finishing in between is then still covered
+    buffer = _buffer()
+    buffered = buffer.overlay(candidate_id) if buffer is not None else {}
+    row = _read_store_row(candidate_id)
+    if row is not None and buffered:
+        row.update(buffered)
+    return row
+
+
+def _read_store_row(candidate_id: str):
+    store = get_store()
+    with _cache_lock:
+        if not _check_cache_version(store):
+            _count_cache("misses")
+            return store.get(candidate_id)
+
+        row = _cache["rows"].get(candidate_id)
+        if row is not None:
+            _count_cache("hits")
+            return dict(row)
+
+        if store.indexed:
+            # Single-row lookup is cheap; don't pull the whole table for it
+            _count_cache("misses")
+            row = store.get(candidate_id)
+            if row is not None:
+                _cache["rows"][candidate_id] = row
+            return dict(row) if row is not None else None
+
+        _cached_frame(store)
+        row = _cache["rows"].get(candidate_id)
+        return dict(row) if row is not None else None
 
 
 def update_candidate(candidate_id: str, updates: dict):
@@ -53,26 +349,96 @@ def update_candidate(candidate_id: str, updates: dict):
     Update candidate row with given dict {col: value}.
     Handles JSON serialization for dict/list automatically.
     Auto-creates new columns if missing.
+    Inside a batch() block the change is queued and written when the block exits.
     """
-    df = _load_candidates()
-    idx = df.index[df["candidate_id"] == candidate_id]
+    pending = _pending_updates()
+    if pending is not None:
+        if candidate_id not in pending and _get_stored_candidate(candidate_id) is None:
+            raise ValueError(f"Candidate {candidate_id} not found.")
+        pending.setdefault(candidate_id, {}).update(
+            {col: _serialize(val) for col, val in updates.items()}
+        )
+        return True
 
-    if len(idx) == 0:
-        raise ValueError(f"Candidate {candidate_id} not found.")
+    return update_many({candidate_id: updates})
 
-    for col, val in updates.items():
-        # Create column if missing
-        if col not in df.columns:
-            df[col] = ""
 
-        # Serialize JSON if dict or list
-        if isinstance(val, (dict, list)):
-            val = json.dumps(val, ensure_ascii=False)
+@STORE_SECONDS.time(operation="update_many")
+def update_many(updates_by_id: dict, expected_versions: dict = None):
+    """
+    Apply {candidate_id: {col: value}} for several candidates in one load + one save.
+    Either every row is written or none is (unknown candidate -> ValueError).
+    With expected_versions {candidate_id: row_version} the write only happens if those
+    rows are unchanged since they were read (otherwise ConflictError).
+    With write-behind on, the updates are buffered instead (and versions not checked).
+    """
+    serialized = {
+        cid: {col: _serialize(val) for col, val in updates.items()}
+        for cid, updates in updates_by_id.items()
+    }
+    if not serialized:
+        return True
+    buffer = _buffer()
+    if buffer is not None:
+        buffer.put(serialized)
+        _bump_generation()
+        return True
+    try:
+        return get_store().update_many(serialized, expected_versions or None)
+    except ConflictError:
+        STORE_CONFLICTS.inc()
+        raise
+    finally:
+        clear_cache()
 
-        df.at[idx[0], col] = val
 
-    _save_candidates(df)
-    return True
+def modify_candidate(candidate_id: str, change, retries: int = None):
+    """
+    Optimistic read-modify-write: `change(row) -> {col: value}` is applied only if the
+    row still has the version it was read at; on a conflict the row is re-read and
+    `change` called again (up to `retries` times, then ConflictError).
+    Safe against other sessions / processes writing the same candidate.
+    """
+    retries = CAS_RETRIES if retries is None else retries
+    for attempt in range(retries + 1):
+        row = _get_stored_candidate(candidate_id)
+        if row is None:
+            raise ValueError(f"Candidate {candidate_id} not found.")
+        try:
+            return update_many({candidate_id: change(row)}, {candidate_id: row_version(row)})
+        except ConflictError:
+            if attempt == retries:
+                raise
+            # Short jittered pause so colliding writers don't retry in lockstep
+            time.sleep(random.uniform(0, 0.005 * 2 ** min(attempt, 5)))
+
+
+@contextmanager
+def batch():
+    """
+    Coalesce every update_candidate/set_status/append_transcript call in the block
+    into a single update_many() on exit. Nothing is written if the block raises.
+    Rows read in the block (get_candidate, append_transcript) must be unchanged on
+    exit, otherwise ConflictError is raised and nothing is written.
+    Nested batch() blocks join the outermost one.
+
+        with eh.batch():
+            eh.update_candidate(cid, {...})
+            eh.set_status(cid, "completed")
+    """
+    if _pending_updates() is not None:
+        yield
+        return
+
+    _batch_local.pending = {}
+    _batch_local.read_versions = {}
+    try:
+        yield
+        pending, read_versions = _batch_local.pending, _batch_local.read_versions
+    finally:
+        _batch_local.pending = None
+        _batch_local.read_versions = None
+    update_many(pending, read_versions)
 
 
 def set_status(candidate_id: str, status: str):
@@ -83,9 +449,7 @@ def set_status(candidate_id: str, status: str):
     })
 
 
-def append_transcript(candidate_id: str, new_entry: dict):
-    """Append one QA evaluation to transcript_json column."""
-    candidate = get_candidate(candidate_id)
+def _appended_transcript(candidate, new_entry):
     transcript_raw = candidate.get("transcript_json")
 
     transcript = []
@@ -96,4 +460,77 @@ def append_transcript(candidate_id: str, new_entry: dict):
             transcript = []
 
     transcript.append(new_entry)
-    return update_candidate(candidate_id, {"transcript_json": transcript})
+    return {"transcript_json": transcript}
+
+
+def append_transcript(candidate_id: str, new_entry: dict):
+    """Append one QA evaluation to transcript_json column (retried if another writer got there first)."""
+    if _pending_updates() is None:
+        return modify_candidate(candidate_id, lambda row: _appended_transcript(row, new_entry))
+
+    candidate = get_candidate(candidate_id)
+    if candidate is None:
+        raise ValueError(f"Candidate {candidate_id} not found.")
+    return update_candidate(candidate_id, _appended_transcript(candidate, new_entry))
+
+
+@STORE_SECONDS.time(operation="record_interview")
+def record_interview(candidate_id: str, transcript: list, summary: dict,
+                     updates: dict = None, keep_history: bool = True):
+    """
+    Store a finished interview (transcript + summary) and apply candidate `updates`
+    (e.g. status) together. With the SQLite store this appends rows to the interview
+    tables instead of rewriting JSON columns; returns the new interview_id (None for Excel).
+    """
+    serialized = {col: _serialize(val) for col, val in (updates or {}).items()}
+    flush_writes()  # keep buffered row updates ordered before the interview
+    try:
+        return get_store().record_interview(candidate_id, transcript, summary, serialized, keep_history)
+    finally:
+        clear_cache()
+
+
+def get_latest_interview(candidate_id: str):
+    """{"transcript": [...], "summary": {...}} of the candidate's latest interview, or None."""
+    flush_writes()  # legacy stores read it from buffered JSON columns
+    return get_store().latest_interview(candidate_id)
+
+
+def get_interview_history(candidate_id: str) -> list:
+    """Compact record of every interview of a candidate, oldest first."""
+    flush_writes()
+    return get_store().interview_history(candidate_id)
+
+
+def load_latest_answers():
+    """Per-answer rows of every candidate's latest interview (None if the store keeps JSON columns)."""
+    flush_writes()
+    return get_store().latest_answers()
+
+
+def import_from_excel(path=CANDIDATES_FILE):
+    """Load a workbook into the active store (no-op copy for the excel backend)."""
+    flush_writes()
+    store = get_store()
+    if isinstance(store, SQLiteCandidateStore):
+        try:
+            return store.import_excel(Path(path))
+        finally:
+            clear_cache()
+    df = pd.read_excel(path, engine="openpyxl", dtype=str)
+    _save_candidates(df)
+    return len(df)
+
+
+def export_to_excel(path=CANDIDATES_FILE):
+    """
+    Dump the active store to a workbook (e.g. for sharing / offline review).
+    Stores with their own export (SQLite) flatten the interview tables back into the JSON columns.
+    """
+    store = get_store()
+    if hasattr(store, "export_excel"):
+        flush_writes()
+        return store.export_excel(Path(path))
+    df = _load_candidates()
+    df.to_excel(path, index=False, engine="openpyxl")
+    return len(df)
@@ -0,0 +1,197 @@
+"""
+Offline, deterministic stand-in for Gemini (LLM_BACKEND=fake).
+
+Replies are derived from the prompt alone (same prompt -> same text), in the
+shapes the real callers expect: a numbered list for question prompts, a JSON
+object/array for evaluation prompts, plain feedback text otherwise. Latency is
+log-normal around FAKE_LLM_LATENCY_MS, and a share of calls fails with HTTP
+500 (FAKE_LLM_ERROR_RATE) or 429 (FAKE_LLM_429_RATE), so retries, rate limiting
+and tail latency can be exercised without an API key or network access.
+"""
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import zlib
+
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "300"))     # median
+FAKE_LLM_LATENCY_SIGMA = float(os.getenv("FAKE_LLM_LATENCY_SIGMA", "0.5"))  # log-normal spread
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+FAKE_LLM_429_RATE = float(os.getenv("FAKE_LLM_429_RATE", "0"))
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "42"))
+
+# Distinct angles so generated questions do not collapse into near-duplicates
+_ANGLES = [
+    "What problem does {kw} solve, and when would you avoid it",
+    "Walk through a {level} example of {kw} on a sales report",
+    "How would you troubleshoot wrong results from {kw} in a shared file",
+    "Which limitations of {kw} matter with very large datasets",
+    "Compare {kw} against an alternative approach and justify your choice",
+    "How do you document {kw} usage so teammates can maintain it",
+    "Describe a mistake beginners make with {kw} and its fix",
+    "How would you automate a recurring monthly task involving {kw}",
+    "What performance tuning applies to {kw} inside complex dashboards",
+    "How can {kw} interact badly with filtering, sorting or inserted rows",
+    "Explain how you would test that {kw} output stays correct after source changes",
+    "Which keyboard shortcuts or settings speed up working with {kw}",
+]
+_STRENGTHS = ["clear structure", "correct terminology", "practical example", "mentions edge cases", "concise"]
+_WEAKNESSES = ["no example given", "misses error handling", "vague on limitations", "too brief", "no alternatives"]
+
+
+class FakeLLMError(Exception):
+    """Injected failure; `code` is read as the HTTP status by llm_client's retry loop."""
+
+    def __init__(self, code: int):
+        super().__init__(f"fake Gemini returned HTTP {code}")
+        self.code = code
+
+
+class FakeUsage:
+    """SDK-shaped usage_metadata (token counts estimated from word counts)."""
+
+    def __init__(self, prompt: str, text: str):
+        self.prompt_token_count = _tokens(prompt)
+        self.candidates_token_count = _tokens(text)
+
+
+class FakeResponse:
+    """SDK-shaped response: .text and .usage_metadata."""
+
+    def __init__(self, text: str, usage: FakeUsage = None):
+        self.text = text
+        self.usage_metadata = usage
+
+
+def _tokens(text: str) -> int:
+    return len(text.split()) * 4 // 3 + 1
+
+
+def _digest(text: str) -> int:
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def _field(prompt: str, label: str) -> str:
+    match = re.search(rf"{label}:\s*(.+)", prompt)
+    return match.group(1).strip() if match else ""
+
+
+def _evaluation(seed_text: str) -> dict:
+    h = _digest(seed_text)
+    return {
+        "score": h % 11,
+        "strengths": [_STRENGTHS[h % 5], _STRENGTHS[(h >> 3) % 5]],
+        "weaknesses": [_WEAKNESSES[(h >> 6) % 5], _WEAKNESSES[(h >> 9) % 5]],
+    }
+
+
+def reply_for(prompt: str) -> str:
+    """Deterministic reply text for a prompt."""
+    if "numbered list" in prompt:
+        count = int((re.search(r"Generate (\d+)", prompt) or [0, 5])[1])
+        keywords = _field(prompt, "Skill") or _field(prompt, "Keywords") or "the tool"
+        keywords = [k.strip() for k in keywords.split(",") if k.strip()] or ["the tool"]
+        level = _field(prompt, "Difficulty").split(" ")[0] or "realistic"
+        start = _digest(prompt)
+        lines = []
+        for i in range(count):
+            angle = _ANGLES[(start + i) % len(_ANGLES)]
+            kw = keywords[i % len(keywords)]
+            lines.append(f"{i + 1}. {angle.format(kw=kw, level=level)}?")
+        return "\n".join(lines)
+
+    if "JSON array" in prompt:
+        blocks = re.split(r"^\s*\[(\d+)\]\s*$", prompt, flags=re.MULTILINE)
+        items = [
+            {"index": int(blocks[i]), **_evaluation(blocks[i + 1])}
+            for i in range(1, len(blocks) - 1, 2)
+        ]
+        return "```json\n" + json.dumps(items, indent=2) + "\n```"
+
+    if "JSON" in prompt:
+        return json.dumps(_evaluation(prompt), indent=2)
+
+    evaluation = _evaluation(prompt)
+    verdict = "correct" if evaluation["score"] >= 7 else "partially correct" if evaluation["score"] >= 4 else "incorrect"
+    return (
+        f"The answer is {verdict} ({evaluation['score']}/10). "
+        f"Strengths: {', '.join(evaluation['strengths'])}. "
+        f"To improve: {', '.join(evaluation['weaknesses'])}."
+    )
+
+
+class FakeGemini:
+    """Thread-safe fake backend with seeded latency and failure injection."""
+
+    def __init__(self, latency_ms: float = FAKE_LLM_LATENCY_MS, latency_sigma: float = FAKE_LLM_LATENCY_SIGMA,
+                 error_rate: float = FAKE_LLM_ERROR_RATE, throttle_rate: float = FAKE_LLM_429_RATE,
+                 seed: int = FAKE_LLM_SEED, sleep=time.sleep):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "errors": 0, "throttled": 0}
+
+    def _draw(self):
+        with self._lock:
+            self.stats["calls"] += 1
+            latency = self.latency_ms * math.exp(self._rng.gauss(0, self.latency_sigma)) if self.latency_ms else 0.0
+            roll = self._rng.random()
+            if roll < self.throttle_rate:
+                self.stats["throttled"] += 1
+                return latency, 429
+            if roll < self.throttle_rate + self.error_rate:
+                self.stats["errors"] += 1
+                return latency, 500
+            return latency, None
+
+    def _simulate(self) -> float:
+        """Sleep for one call's latency; raise the injected failure if any. Returns seconds slept."""
+        latency, status = self._draw()
+        # Throttled calls are rejected quickly, like the real API
+        seconds = latency / 1000.0 / (10 if status == 429 else 1)
+        if seconds:
+            self._sleep(seconds)
+        if status:
+            raise FakeLLMError(status)
+        return seconds
+
+    # ---------- SDK shape (GenerativeModel) ----------
+    def generate_content(self, prompt, request_options=None, **kwargs):
+        self._simulate()
+        text = reply_for(str(prompt))
+        return FakeResponse(text, FakeUsage(str(prompt), text))
+
+    # ---------- REST shapes ----------
+    def generate_rest(self, prompt: str) -> dict:
+        self._simulate()
+        text = reply_for(prompt)
+        usage = FakeUsage(prompt, text)
+        return {
+            "candidates": [{"content": {"parts": [{"text": text}]}}],
+            "usageMetadata": {"promptTokenCount": usage.prompt_token_count,
+                              "candidatesTokenCount": usage.candidates_token_count},
+        }
+
+    def open_stream(self, prompt: str, words_per_chunk: int = 3):
+        """Wait for the first byte (may fail), then return an iterator of text chunks."""
+        first_byte = self._simulate()
+        words = reply_for(prompt).split(" ")
+        chunks = [
+            (" " if i else "") + " ".join(words[i:i + words_per_chunk])
+            for i in range(0, len(words), words_per_chunk)
+        ]
+        per_chunk = first_byte / 4 / max(len(chunks), 1)
+
+        def _iter():
+            for chunk in chunks:
+                if per_chunk:
+                    self._sleep(per_chunk)
+                yield chunk
+        return _iter()
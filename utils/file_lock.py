@@ -0,0 +1,106 @@
+"""
+Cross-process advisory file lock for the candidate stores.
+
+The lock lives in its own `<store>.lock` file: the workbook itself is replaced by
+rename on every save, so a lock taken on it would be held on the old inode.
+Reentrant within a thread (record_interview -> update_many), exclusive between
+threads and processes. Uses flock on POSIX and msvcrt.locking on Windows.
+
+    lock = FileLock(path.with_name(path.name + ".lock"))
+    with lock:
+        ...  # load, modify, write
+"""
+from pathlib import Path
+import os
+import threading
+import time
+
+from utils import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Seconds a writer waits for another process before giving up
+LOCK_TIMEOUT = float(os.getenv("STORE_LOCK_TIMEOUT", "30"))
+
+LOCK_WAIT_SECONDS = metrics.histogram("file_lock_wait_seconds", "Time spent waiting for a store lock", ["lock"])
+
+
+class LockTimeout(TimeoutError):
+    """Another writer held the lock for longer than the timeout."""
+
+
+def _try_lock(fd) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    """Exclusive lock on `path` (created on first acquire)."""
+
+    def __init__(self, path: Path, timeout: float = None, poll: float = 0.005):
+        self.path = Path(path)
+        self.timeout = LOCK_TIMEOUT if timeout is None else timeout
+        self.poll = poll
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        start = time.monotonic()
+        if not self._thread_lock.acquire(timeout=self.timeout):
+            raise LockTimeout(f"Timed out waiting for {self.path}")
+        if self._depth == 0:
+            try:
+                self._fd = self._lock_file(start + self.timeout)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            LOCK_WAIT_SECONDS.observe(time.monotonic() - start, lock=self.path.name)
+        self._depth += 1
+
+    def _lock_file(self, deadline):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        delay = self.poll
+        while not _try_lock(fd):
+            if time.monotonic() >= deadline:
+                os.close(fd)
+                raise LockTimeout(f"Timed out waiting for {self.path}")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+        return fd
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            try:
+                _unlock(fd)
+            finally:
+                os.close(fd)
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
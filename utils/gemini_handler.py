@@ -1,34 +1,115 @@
 import os
-import json
-import re
-import google.generativeai as genai
-from dotenv import load_dotenv
-import streamlit as st
-
-# # Load environment variables
-# load_dotenv()
-# GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or st.secrets["GEMINI_API_KEY"]
-
-try:
-    import streamlit as st
-    GEMINI_API_KEY = st.secrets["GEMINI_API_KEY"]
-except (ImportError, KeyError):
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-    
-if not GEMINI_API_KEY:
-    raise ValueError("⚠️ Missing GEMINI_API_KEY in .env file")
 
-# Configure Gemini
-genai.configure(api_key=GEMINI_API_KEY)
+from utils import llm_client, metrics, settings
+from utils.llm_cache import LLMCache, normalize_text
+from utils.llm_parse import Field, ParseError, parse_json, parse_numbered_list
+
+# The shared client resolves GEMINI_API_KEY (secrets.toml / .env) and loads the
+# Gemini SDK on the first request, so importing this module stays cheap.
 
 # Pick model
 MODEL_NAME = "gemini-1.5-flash"  # free-tier friendly
 
+# Bump a version whenever its prompt text changes so stale cached answers are not reused
+QUESTION_PROMPT_VERSION = "1"
+EVAL_PROMPT_VERSION = "1"
+
+# How many times a reply that cannot be parsed is re-asked before giving up
+PARSE_REASKS = int(os.getenv("LLM_PARSE_REASKS", "1"))
+
+EVALUATION_SCHEMA = {
+    "score": Field((int, float), minimum=0, maximum=10),
+    "strengths": Field(list, default=[]),
+    "weaknesses": Field(list, default=[]),
+}
+
+GEMINI_CALL_SECONDS = metrics.histogram(
+    "gemini_call_seconds", "gemini_handler call time (cache lookup, LLM requests, parsing)", ["operation"]
+)
+LLM_CACHE_LOOKUPS = metrics.counter("llm_cache_lookups_total", "LLM response cache lookups", ["operation", "result"])
+LLM_PARSE_FAILURES = metrics.counter("llm_parse_failures_total", "Gemini replies that could not be parsed", ["kind"])
+
+# Persistent response cache (set LLM_CACHE=0 to disable globally, or pass use_cache=False)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") not in ("0", "false", "no")
+llm_cache = LLMCache(
+    settings.data_path("llm_cache.db"),
+    ttl_seconds=float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+)
+
+
+def _question_cache_key(tech_stack, keywords, yoe, num_questions):
+    keyword_list = sorted({normalize_text(k) for k in str(keywords or "").split(",") if k.strip()})
+    inputs = {
+        "tech_stack": normalize_text(tech_stack),
+        "keywords": keyword_list,
+        "yoe": int(yoe or 0),
+        "num_questions": int(num_questions),
+    }
+    return LLMCache.make_key(MODEL_NAME, "generate_questions", QUESTION_PROMPT_VERSION, inputs)
+
+
+def _evaluation_cache_key(question, answer):
+    # Answers keep their case (it can matter for formulas); only whitespace is collapsed
+    inputs = {"question": normalize_text(question), "answer": " ".join(str(answer or "").split())}
+    return LLMCache.make_key(MODEL_NAME, "evaluate_answer", EVAL_PROMPT_VERSION, inputs)
+
+
+def _cache_get(key, operation):
+    value = llm_cache.get(key)
+    LLM_CACHE_LOOKUPS.inc(operation=operation, result="miss" if value is None else "hit")
+    return value
+
+
+def cache_stats():
+    """Hit-rate statistics of the LLM response cache."""
+    return llm_cache.stats()
 
-def generate_questions(tech_stack: str, keywords: str, yoe: int, num_questions: int = 5):
+
+def _generate(prompt: str):
+    """Send a prompt to Gemini through the shared client (rate limit + retries)."""
+    return llm_client.get_client().generate(prompt, model=MODEL_NAME)
+
+
+def _generate_parsed(prompt: str, parse):
+    """
+    _generate() + parse(text). A ParseError re-asks the model (up to PARSE_REASKS times)
+    with the reason appended to the prompt; the last error is raised if it never parses.
+    Returns (parsed value, reply text).
+    """
+    ask = prompt
+    for attempt in range(PARSE_REASKS + 1):
+        text = _generate(ask).text.strip()
+        try:
+            return parse(text), text
+        except ParseError as e:
+            LLM_PARSE_FAILURES.inc(kind=e.kind)
+            if attempt >= PARSE_REASKS:
+                raise
+            ask = f"{prompt}\n\n{e.reask_hint()}"
+
+
+def _require_items(text: str):
+    items = parse_numbered_list(text)
+    if not items:
+        raise ParseError("no_items", "no numbered list of questions was found", text)
+    return items
+
+
+@GEMINI_CALL_SECONDS.time(operation="generate_questions")
+def generate_questions(tech_stack: str, keywords: str, yoe: int, num_questions: int = 5,
+                       use_cache: bool = True):
     """
     Generate interview questions dynamically from Gemini based on skill keywords + YOE.
+    Identical (normalized) requests are served from the LLM cache unless use_cache=False.
     """
+    use_cache = use_cache and LLM_CACHE_ENABLED
+    key = _question_cache_key(tech_stack, keywords, yoe, num_questions)
+    if use_cache:
+        cached = _cache_get(key, "generate_questions")
+        if cached is not None:
+            return cached
+
     prompt = f"""
     You are an AI mock interviewer.
     Generate {num_questions} structured interview questions for a candidate.
@@ -45,32 +126,74 @@ def generate_questions(tech_stack: str, keywords: str, yoe: int, num_questions:
     - Return as a numbered list, plain text (no explanations).
     """
 
-    response = genai.GenerativeModel(MODEL_NAME).generate_content(prompt)
-    return response.text.strip()
+    _, text = _generate_parsed(prompt, _require_items)
+    if use_cache and text:
+        llm_cache.set(key, text)
+    return text
+
 
+DIFFICULTY_GUIDE = {
+    "basic": "fundamentals a fresher (0-1 YOE) should know",
+    "medium": "practical, medium-difficulty usage",
+    "advanced": "advanced, scenario-based problems for experienced (4+ YOE) candidates",
+}
 
-def _parse_json_response(text: str, default: dict = None):
+
+@GEMINI_CALL_SECONDS.time(operation="generate_tagged_questions")
+def generate_tagged_questions(tech_stack: str, keyword: str, difficulty: str, num_questions: int = 10,
+                              use_cache: bool = True):
     """
-    Try parsing Gemini response into JSON.
-    Handles cases where response is wrapped in ```json ... ```.
+    Generate questions about a single skill keyword at one difficulty level
+    (used to fill the question bank). Returns a numbered-list string.
     """
-    if default is None:
-        default = {}
+    use_cache = use_cache and LLM_CACHE_ENABLED
+    inputs = {
+        "tech_stack": normalize_text(tech_stack),
+        "keyword": normalize_text(keyword),
+        "difficulty": difficulty,
+        "num_questions": int(num_questions),
+    }
+    key = LLMCache.make_key(MODEL_NAME, "generate_tagged_questions", QUESTION_PROMPT_VERSION, inputs)
+    if use_cache:
+        cached = _cache_get(key, "generate_tagged_questions")
+        if cached is not None:
+            return cached
 
-    try:
-        # Remove markdown fences if present
-        cleaned = re.sub(r"^```json|```$", "", text, flags=re.MULTILINE).strip()
-        return json.loads(cleaned)
-    except Exception:
-        print("⚠️ Response was not valid JSON:", text)
-        return default
+    prompt = f"""
+    You are an AI mock interviewer building a question bank.
+    Generate {num_questions} distinct interview questions.
+
+    - Tech stack: {tech_stack}
+    - Skill: {keyword}
+    - Difficulty: {difficulty} ({DIFFICULTY_GUIDE.get(difficulty, difficulty)})
+
+    Rules:
+    - Every question must be about the skill above.
+    - Return as a numbered list, plain text (no explanations).
+    """
+
+    _, text = _generate_parsed(prompt, _require_items)
+    if use_cache and text:
+        llm_cache.set(key, text)
+    return text
 
 
-def evaluate_answer(question: str, answer: str):
+@GEMINI_CALL_SECONDS.time(operation="evaluate_answer")
+def evaluate_answer(question: str, answer: str, use_cache: bool = True):
     """
     Evaluate a candidate's answer.
     Returns a dict with score, strengths, weaknesses.
+    Re-grading an identical question/answer pair is served from the LLM cache.
+    If the reply still cannot be parsed after re-asking, score is None and
+    "parse_error" says why.
     """
+    use_cache = use_cache and LLM_CACHE_ENABLED
+    key = _evaluation_cache_key(question, answer)
+    if use_cache:
+        cached = _cache_get(key, "evaluate_answer")
+        if cached is not None:
+            return cached
+
     prompt = f"""
     You are an AI evaluator.
     Question: {question}
@@ -89,5 +212,85 @@ def evaluate_answer(question: str, answer: str):
     }}
     """
 
-    response = genai.GenerativeModel(MODEL_NAME).generate_content(prompt)
-    return _parse_json_response(response.text.strip())
+    try:
+        evaluation, _ = _generate_parsed(prompt, lambda text: parse_json(text, EVALUATION_SCHEMA, expect=dict))
+    except ParseError as e:
+        return {"score": None, "strengths": [], "weaknesses": [], "parse_error": e.to_dict()}
+    evaluation = {k: evaluation[k] for k in EVALUATION_SCHEMA}
+    # Only well-formed results reach this point, so a bad reply is retried next time
+    if use_cache:
+        llm_cache.set(key, evaluation)
+    return evaluation
+
+
+@GEMINI_CALL_SECONDS.time(operation="evaluate_answers_batch")
+def evaluate_answers_batch(pairs, use_cache: bool = True):
+    """
+    Evaluate several (question, answer) pairs with ONE Gemini request.
+    Returns a list of dicts (score, strengths, weaknesses) in the same order as pairs.
+    Pairs already in the LLM cache are not sent; items missing or malformed
+    in the batch reply (or all of them, if the batch request keeps failing)
+    are re-evaluated one by one.
+    """
+    all_pairs = list(pairs)
+    use_cache = use_cache and LLM_CACHE_ENABLED
+    final = [_cache_get(_evaluation_cache_key(*p), "evaluate_answer") if use_cache else None for p in all_pairs]
+    pending = [i for i, ev in enumerate(final) if ev is None]
+    pairs = [all_pairs[i] for i in pending]
+
+    if not pairs:
+        return final
+    if len(pairs) == 1:
+        final[pending[0]] = evaluate_answer(*pairs[0], use_cache=use_cache)
+        return final
+
+    items = "\n".join(
+        f"""
+    [{i}]
+    Question: {question}
+    Candidate's Answer: {answer}"""
+        for i, (question, answer) in enumerate(pairs)
+    )
+    prompt = f"""
+    You are an AI evaluator.
+    Evaluate each of the {len(pairs)} question/answer pairs below independently.
+    {items}
+
+    Task for EACH pair:
+    - Give a score from 0-10
+    - List 2 strengths
+    - List 2 weaknesses
+
+    Return strictly a JSON array with exactly {len(pairs)} objects, one per pair, in order:
+    [
+        {{
+            "index": <int>,
+            "score": <int>,
+            "strengths": ["..", ".."],
+            "weaknesses": ["..", ".."]
+        }}
+    ]
+    """
+
+    try:
+        parsed, _ = _generate_parsed(prompt, lambda text: parse_json(text, EVALUATION_SCHEMA, expect=list))
+    except (ParseError, llm_client.LLMRequestError):
+        parsed = []  # every pair falls back to a single evaluation below
+
+    # Map results back to pairs by "index" (fall back to position)
+    results = [None] * len(pairs)
+    if isinstance(parsed, list):
+        for pos, item in enumerate(parsed):
+            if item is None:
+                continue
+            idx = item.get("index", pos)
+            if isinstance(idx, int) and 0 <= idx < len(pairs) and results[idx] is None:
+                results[idx] = {k: item[k] for k in ("score", "strengths", "weaknesses")}
+
+    for i, result in enumerate(results):
+        if result is None:
+            result = evaluate_answer(*pairs[i], use_cache=use_cache)
+        elif use_cache:
+            llm_cache.set(_evaluation_cache_key(*pairs[i]), result)
+        final[pending[i]] = result
+    return final
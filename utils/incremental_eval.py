@@ -0,0 +1,67 @@
+"""
+Incremental answer evaluation.
+
+Each answer is graded in the background as soon as the candidate finishes it,
+so the final submission only has to grade answers that are still missing or
+were changed afterwards (detected by interview_flow.answer_hash).
+"""
+from concurrent.futures import ThreadPoolExecutor, wait
+import os
+import threading
+
+from utils import interview_flow as iflow
+
+# One shared pool for all candidates in this process; the Gemini rate limiter still applies
+_executor = ThreadPoolExecutor(max_workers=iflow.EVAL_MAX_WORKERS, thread_name_prefix="incremental-eval")
+# How long completed() waits for grades still in flight (e.g. the last answer) before giving up on them
+SUBMIT_WAIT_SECONDS = float(os.getenv("INCREMENTAL_EVAL_WAIT", "10"))
+
+
+class IncrementalEvaluator:
+    """Per-interview partial transcript: {question: (answer_hash, answer, future)}."""
+
+    def __init__(self, candidate_id: str):
+        self.candidate_id = candidate_id
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def submit(self, question: str, answer: str):
+        """Queue evaluation of one answer unless the same answer is already graded / in flight."""
+        answer = answer or ""
+        if not answer.strip():
+            return None
+        key = iflow.answer_hash(question, answer)
+        with self._lock:
+            entry = self._entries.get(question)
+            if entry and entry[0] == key:
+                return entry[2]
+            # Changed answer: the old future (if still running) is simply ignored
+            future = _executor.submit(iflow._evaluate_one, (question, answer))
+            self._entries[question] = (key, answer, future)
+            return future
+
+    def completed(self, timeout: float = None) -> dict:
+        """
+        {answer_hash: evaluation} for successfully graded answers (feeds conduct_interview(precomputed=...)).
+        Waits up to timeout seconds (default SUBMIT_WAIT_SECONDS) for grades still in flight so they are
+        not graded a second time at submit; failed or unfinished grades are left out for the final evaluation.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+        pending = [future for _key, _answer, future in entries if not future.done()]
+        if pending:
+            wait(pending, timeout=SUBMIT_WAIT_SECONDS if timeout is None else timeout)
+        completed = {}
+        for key, _answer, future in entries:
+            if not future.done() or future.exception() is not None:
+                continue
+            evaluation = future.result()
+            if isinstance(evaluation, dict) and evaluation.get("score") is not None and not evaluation.get("parse_error"):
+                completed[key] = evaluation
+        return completed
+
+    def status(self) -> dict:
+        with self._lock:
+            futures = [entry[2] for entry in self._entries.values()]
+        done = sum(1 for f in futures if f.done())
+        return {"evaluated": done, "pending": len(futures) - done}
@@ -86,8 +86,18 @@
 
 from utils import excel_handler as eh
 from utils import gemini_handler as gh
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import datetime
+import hashlib
 import json
+import os
+
+# Max Gemini evaluations in flight per interview (the shared rate limiter in gemini_handler still applies)
+EVAL_MAX_WORKERS = int(os.getenv("EVAL_MAX_WORKERS", "5"))
+
+# "concurrent": one request per answer in parallel, "batch": EVAL_BATCH_SIZE answers per request
+EVAL_MODE = os.getenv("EVAL_MODE", "concurrent").lower()
+EVAL_BATCH_SIZE = int(os.getenv("EVAL_BATCH_SIZE", "10"))
 
 def _safe_load(value, default=None):
     """Return Python object for JSON-like Excel cell values (string, list, NaN)."""
@@ -117,11 +127,84 @@ def _safe_load(value, default=None):
     return default
 
 
-def conduct_interview(candidate_id: str, answers: dict = None, keep_history: bool = True):
+def answer_hash(question: str, answer: str) -> str:
+    """Stable key for one (question, answer) pair; whitespace-only edits keep the same hash."""
+    normalized = " ".join(str(question or "").split()) + "\0" + " ".join(str(answer or "").split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _evaluate_one(pair):
+    """Evaluate one (question, answer) pair via Gemini and always return a dict."""
+    question_text, answer_text = pair
+    evaluation_raw = gh.evaluate_answer(question_text, answer_text)
+    # evaluation_raw might be dict already or a string
+    if isinstance(evaluation_raw, dict):
+        return evaluation_raw
+    try:
+        return json.loads(evaluation_raw)
+    except Exception:
+        return {"score": None, "strengths": [], "weaknesses": []}
+
+
+def _evaluate_chunk(chunk):
+    """Evaluate a list of pairs with a single batched Gemini request."""
+    return [ev if isinstance(ev, dict) else {"score": None, "strengths": [], "weaknesses": []}
+            for ev in gh.evaluate_answers_batch(chunk)]
+
+
+def _evaluate_pairs(pairs, max_workers: int = None, mode: str = None, progress_callback=None):
+    """
+    Evaluate all pairs concurrently (at most max_workers in flight).
+    In "batch" mode each worker sends EVAL_BATCH_SIZE pairs per request.
+    progress_callback(done, total) is called as answers finish (in completion order).
+    Results come back in the same order as `pairs`.
+    """
+    max_workers = max_workers or EVAL_MAX_WORKERS
+    mode = (mode or EVAL_MODE).lower()
+
+    if mode == "batch":
+        size = max(1, EVAL_BATCH_SIZE)
+        tasks, fn = [pairs[i:i + size] for i in range(0, len(pairs), size)], _evaluate_chunk
+    else:
+        tasks, fn = pairs, _evaluate_one
+
+    total = len(pairs)
+    done = 0
+    results = [None] * len(tasks)
+
+    def _finished(i, result):
+        nonlocal done
+        results[i] = result
+        done += len(tasks[i]) if mode == "batch" else 1
+        if progress_callback:
+            progress_callback(done, total)
+
+    if max_workers <= 1 or len(tasks) <= 1:
+        for i, t in enumerate(tasks):
+            _finished(i, fn(t))
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+            futures = {pool.submit(fn, t): i for i, t in enumerate(tasks)}
+            for future in as_completed(futures):
+                _finished(futures[future], future.result())
+
+    if mode == "batch":
+        return [ev for chunk in results for ev in chunk]
+    return results
+
+
+def conduct_interview(candidate_id: str, answers: dict = None, keep_history: bool = True,
+                      max_workers: int = None, mode: str = None, progress_callback=None,
+                      precomputed: dict = None):
     """
     Conduct a single interview for candidate_id.
-    - Always generates a NEW transcript (fresh) for this interview and stores it as last_interview_json.
-    - Optionally appends to interview_history (kept for analytics).
+    - Always generates a NEW transcript (fresh) for this interview and stores it as the latest interview.
+    - Answers are evaluated concurrently (max_workers, default EVAL_MAX_WORKERS); 1 = serial.
+    - mode="batch" packs several answers into one Gemini request (default EVAL_MODE).
+    - progress_callback(done, total) reports evaluation progress (used by the job queue).
+    - precomputed maps answer_hash(question, answer) -> evaluation for answers already graded
+      during the interview; only answers without a matching hash are sent to Gemini.
+    - Optionally keeps a history record for the Excel store (the SQLite store keeps every interview).
     - Returns only a minimal confirmation dict (no full transcript).
     """
     candidate = eh.get_candidate(candidate_id)
@@ -141,9 +224,8 @@ def conduct_interview(candidate_id: str, answers: dict = None, keep_history: boo
     if not isinstance(questions, list):
         questions = []
 
-    # Start a fresh transcript for this interview
-    transcript = []
-
+    # Pair every question with the candidate's answer (order = transcript order)
+    pairs = []
     for q in questions:
         # q might be a dict or plain string
         if isinstance(q, dict):
@@ -152,18 +234,24 @@ def conduct_interview(candidate_id: str, answers: dict = None, keep_history: boo
             question_text = str(q)
 
         answer_text = answers.get(question_text, "") if answers else ""
+        pairs.append((question_text, answer_text))
 
-        # Evaluate via Gemini
-        evaluation_raw = gh.evaluate_answer(question_text, answer_text)
-        # evaluation_raw might be dict already or a string
-        if isinstance(evaluation_raw, dict):
-            evaluation = evaluation_raw
-        else:
-            try:
-                evaluation = json.loads(evaluation_raw)
-            except Exception:
-                evaluation = {"score": None, "strengths": [], "weaknesses": []}
+    # Start a fresh transcript for this interview
+    # Reuse evaluations computed while the candidate was still answering
+    precomputed = precomputed or {}
+    keys = [answer_hash(q, a) for q, a in pairs]
+    pending = [i for i, k in enumerate(keys) if not isinstance(precomputed.get(k), dict)]
+    reused = len(pairs) - len(pending)
+    callback = None
+    if progress_callback:
+        callback = lambda done, _total: progress_callback(reused + done, len(pairs))
 
+    fresh = _evaluate_pairs([pairs[i] for i in pending], max_workers, mode, callback)
+    evaluations = [precomputed.get(k) for k in keys]
+    for i, evaluation in zip(pending, fresh):
+        evaluations[i] = evaluation
+    transcript = []
+    for (question_text, answer_text), evaluation in zip(pairs, evaluations):
         transcript_entry = {
             "question": question_text,
             "answer": answer_text,
@@ -171,6 +259,8 @@ def conduct_interview(candidate_id: str, answers: dict = None, keep_history: boo
             "strengths": evaluation.get("strengths", []),
             "weaknesses": evaluation.get("weaknesses", [])
         }
+        if evaluation.get("parse_error"):
+            transcript_entry["parse_error"] = evaluation["parse_error"]
         transcript.append(transcript_entry)
 
     # Build summary
@@ -186,28 +276,13 @@ def conduct_interview(candidate_id: str, answers: dict = None, keep_history: boo
         "timestamp": datetime.datetime.now().isoformat()
     }
 
-    # Save last interview (overwrite previous last_interview_json)
-    eh.update_candidate(candidate_id, {
-        "last_interview_json": transcript,
-        "transcript_json": transcript,  # keep compatibility if other parts use transcript_json
-        "summary_json": summary,
-        "status": "completed",
-        "timestamp": datetime.datetime.now().isoformat()
-    })
-
-    # Optionally append to history (keeps record of all interviews)
-    if keep_history:
-        history_raw = candidate.get("interview_history", "")
-        history = _safe_load(history_raw, default=[])
-        # push a compact history record
-        history_record = {
-            "timestamp": datetime.datetime.now().isoformat(),
-            "summary": summary,
-            # don't store full transcript in history to keep file smaller; store small extract
-            "num_questions": len(transcript)
-        }
-        history.append(history_record)
-        eh.update_candidate(candidate_id, {"interview_history": history})
+    # One write per interview: transcript, summary and history go to the interview
+    # tables (or JSON columns for the Excel store) together with the status change
+    eh.record_interview(
+        candidate_id, transcript, summary,
+        updates={"status": "completed", "timestamp": datetime.datetime.now().isoformat()},
+        keep_history=keep_history,
+    )
 
     # Return only confirmation to the frontend (no transcript)
     return {
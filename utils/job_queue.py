@@ -0,0 +1,318 @@
+"""
+Persistent background job queue for interview evaluation.
+
+Jobs live in a local SQLite file, so queued work survives restarts. Submitting
+is a single INSERT; a pool of worker threads (in-process or started with
+`python -m utils.job_queue`) claims jobs one at a time and reports progress.
+"""
+from pathlib import Path
+from contextlib import closing
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+from utils import settings
+
+JOB_DB = Path(os.getenv("JOB_DB", settings.data_path("jobs.db")))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# A running job not heard from for this long is assumed dead (worker crashed / restarted).
+# Workers refresh the lease of the job they run every JOB_LEASE_SECONDS / 4 and look for
+# expired leases every JOB_REQUEUE_INTERVAL seconds.
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "600"))
+JOB_REQUEUE_INTERVAL = float(os.getenv("JOB_REQUEUE_INTERVAL", "30"))
+# A failed attempt is retried after JOB_RETRY_BACKOFF seconds, doubled per attempt
+JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "5"))
+JOB_RETRY_BACKOFF_MAX = float(os.getenv("JOB_RETRY_BACKOFF_MAX", "300"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_initialized = set()
+
+
+def _connect(path: Path = None):
+    path = Path(path or JOB_DB)
+    if path not in _initialized:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)  # explicit transactions
+    conn.row_factory = sqlite3.Row
+    if path not in _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, candidate_id TEXT, kind TEXT NOT NULL, payload TEXT, "
+            "status TEXT NOT NULL, progress REAL DEFAULT 0, result TEXT, error TEXT, "
+            "attempts INTEGER DEFAULT 0, worker TEXT, created REAL, updated REAL, run_after REAL DEFAULT 0)"
+        )
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "run_after" not in columns:  # queue created before retry backoff
+            conn.execute("ALTER TABLE jobs ADD COLUMN run_after REAL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_candidate ON jobs(candidate_id, created)")
+        _initialized.add(path)
+    return conn
+
+
+def _row_to_job(row):
+    if row is None:
+        return None
+    job = dict(row)
+    for key in ("payload", "result"):
+        if job.get(key):
+            job[key] = json.loads(job[key])
+    return job
+
+
+# ---------- producer side ----------
+def submit(candidate_id: str, kind: str = "interview", payload: dict = None, db_path: Path = None) -> str:
+    """Queue a job and return its id immediately."""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    with closing(_connect(db_path)) as conn:
+        conn.execute(
+            "INSERT INTO jobs (job_id, candidate_id, kind, payload, status, created, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, candidate_id, kind, json.dumps(payload or {}, ensure_ascii=False), QUEUED, now, now),
+        )
+    return job_id
+
+
+def submit_interview(candidate_id: str, answers: dict, precomputed: dict = None, db_path: Path = None) -> str:
+    """
+    Queue conduct_interview(candidate_id, answers) for background evaluation.
+    precomputed: {answer_hash: evaluation} already graded during the interview.
+    """
+    payload = {"answers": answers or {}, "precomputed": precomputed or {}}
+    return submit(candidate_id, "interview", payload, db_path)
+
+
+def get_job(job_id: str, db_path: Path = None):
+    with closing(_connect(db_path)) as conn:
+        return _row_to_job(conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone())
+
+
+def latest_job(candidate_id: str, kind: str = None, db_path: Path = None):
+    """Most recent job for a candidate (status / progress for the UI)."""
+    sql = "SELECT * FROM jobs WHERE candidate_id = ?"
+    params = [candidate_id]
+    if kind:
+        sql += " AND kind = ?"
+        params.append(kind)
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute(sql + " ORDER BY created DESC LIMIT 1", params).fetchone()
+    return _row_to_job(row)
+
+
+def queue_stats(db_path: Path = None) -> dict:
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+    return {r["status"]: r["n"] for r in rows}
+
+
+# ---------- worker side ----------
+def claim(worker: str, db_path: Path = None):
+    """Atomically move the oldest queued job that is due to running and return it (or None)."""
+    now = time.time()
+    with closing(_connect(db_path)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE status = ? AND COALESCE(run_after, 0) <= ? "
+                "ORDER BY created LIMIT 1", (QUEUED, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, updated = ? WHERE job_id = ?",
+                (RUNNING, worker, now, row["job_id"]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return _row_to_job(conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone())
+
+
+def set_progress(job_id: str, progress: float, db_path: Path = None):
+    with closing(_connect(db_path)) as conn:
+        conn.execute("UPDATE jobs SET progress = ?, updated = ? WHERE job_id = ?", (progress, time.time(), job_id))
+
+
+def heartbeat(job_id: str, worker: str, db_path: Path = None) -> bool:
+    """Renew the lease of a running job; False if it is no longer this worker's."""
+    with closing(_connect(db_path)) as conn:
+        return conn.execute(
+            "UPDATE jobs SET updated = ? WHERE job_id = ? AND status = ? AND worker = ?",
+            (time.time(), job_id, RUNNING, worker),
+        ).rowcount == 1
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before a job that failed `attempts` times is run again."""
+    return min(JOB_RETRY_BACKOFF_MAX, JOB_RETRY_BACKOFF * 2 ** max(attempts - 1, 0))
+
+
+def _finish(job_id, status, result=None, error=None, db_path=None, run_after=0.0):
+    with closing(_connect(db_path)) as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END, "
+            "updated = ?, run_after = ? WHERE job_id = ?",
+            (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+             error, status, time.time(), run_after, job_id),
+        )
+
+
+def requeue_stale(db_path: Path = None) -> int:
+    """Put jobs whose worker stopped reporting back in the queue (or fail them after max attempts)."""
+    cutoff = time.time() - JOB_LEASE_SECONDS
+    with closing(_connect(db_path)) as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = 'worker lease expired', updated = ? "
+            "WHERE status = ? AND updated < ? AND attempts >= ?",
+            (FAILED, time.time(), RUNNING, cutoff, JOB_MAX_ATTEMPTS),
+        )
+        return conn.execute(
+            "UPDATE jobs SET status = ?, worker = NULL, updated = ? WHERE status = ? AND updated < ?",
+            (QUEUED, time.time(), RUNNING, cutoff),
+        ).rowcount
+
+
+def _run_interview(job, report):
+    from utils import interview_flow as iflow
+    return iflow.conduct_interview(
+        job["candidate_id"],
+        job["payload"].get("answers", {}),
+        progress_callback=lambda done, total: report(done / total if total else 1.0),
+        precomputed=job["payload"].get("precomputed"),
+    )
+
+
+# kind -> handler(job, report_progress) returning a JSON-serializable result
+HANDLERS = {"interview": _run_interview}
+
+
+def _keep_alive(job, stop: threading.Event, db_path):
+    # Long jobs keep their lease, so requeue_stale() never hands them to another worker
+    while not stop.wait(JOB_LEASE_SECONDS / 4):
+        if not heartbeat(job["job_id"], job["worker"], db_path):
+            return
+
+
+def run_job(job, db_path: Path = None):
+    """Execute one claimed job (renewing its lease while it runs) and record its outcome."""
+    handler = HANDLERS.get(job["kind"])
+    if handler is None:
+        _finish(job["job_id"], FAILED, error=f"Unknown job kind: {job['kind']}", db_path=db_path)
+        return
+    stop = threading.Event()
+    keep_alive = threading.Thread(target=_keep_alive, args=(job, stop, db_path), daemon=True,
+                                  name=f"job-heartbeat-{job['job_id'][:8]}")
+    keep_alive.start()
+    try:
+        result = handler(job, lambda p: set_progress(job["job_id"], p, db_path))
+        _finish(job["job_id"], DONE, result=result, db_path=db_path)
+    except Exception as e:
+        # Retry transient failures (after a growing pause) until JOB_MAX_ATTEMPTS, then give up
+        error = f"{e}\n{traceback.format_exc(limit=3)}"
+        if job["attempts"] < JOB_MAX_ATTEMPTS:
+            _finish(job["job_id"], QUEUED, error=error, db_path=db_path,
+                    run_after=time.time() + retry_delay(job["attempts"]))
+        else:
+            _finish(job["job_id"], FAILED, error=error, db_path=db_path)
+    finally:
+        stop.set()
+        keep_alive.join()
+
+
+class WorkerPool:
+    """
+    N threads polling the queue; throughput scales with num_workers (within the LLM rate limit).
+    Jobs orphaned by a crashed worker (here or in another process) are re-queued every
+    requeue_interval seconds once their lease has expired.
+    """
+
+    def __init__(self, num_workers: int = JOB_WORKERS, poll_interval: float = 0.5, db_path: Path = None,
+                 requeue_interval: float = None):
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.db_path = db_path
+        self.requeue_interval = JOB_REQUEUE_INTERVAL if requeue_interval is None else requeue_interval
+        self._stop = threading.Event()
+        self._threads = []
+        self._requeue_lock = threading.Lock()
+        self._next_requeue = 0.0
+
+    def _requeue_due(self):
+        """requeue_stale() at most once per requeue_interval across this pool's threads."""
+        with self._requeue_lock:
+            now = time.monotonic()
+            if now < self._next_requeue:
+                return
+            self._next_requeue = now + self.requeue_interval
+        try:
+            requeue_stale(self.db_path)
+        except sqlite3.Error:
+            traceback.print_exc()  # retried on the next interval
+
+    def _loop(self, name):
+        while not self._stop.is_set():
+            self._requeue_due()
+            job = claim(name, self.db_path)
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            run_job(job, self.db_path)
+
+    def start(self):
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for i in range(self.num_workers):
+            t = threading.Thread(target=self._loop, args=(f"{prefix}:{i}",), daemon=True, name=f"job-worker-{i}")
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, wait: bool = True):
+        self._stop.set()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self._threads)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def ensure_workers(num_workers: int = JOB_WORKERS):
+    """Start the in-process worker pool once per process (no-op if num_workers is 0)."""
+    global _pool
+    if num_workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None or not _pool.running:
+            _pool = WorkerPool(num_workers).start()
+    return _pool
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background evaluation workers.")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    args = parser.parse_args()
+
+    pool = WorkerPool(args.workers).start()
+    print(f"⚙️ {args.workers} workers polling {JOB_DB} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
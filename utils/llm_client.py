@@ -0,0 +1,276 @@
+"""
+Shared Gemini client used by both the Flask server (REST) and utils.gemini_handler (SDK).
+One GenerativeModel per model name and one pooled requests.Session per process,
+with timeouts, a process-wide rate limit and jittered exponential backoff on 429/5xx.
+LLM_BACKEND=fake swaps Gemini for the offline stand-in in utils/fake_llm.py
+(same retries and rate limit, no API key or network needed).
+The Gemini SDK, requests and the API key are only loaded on the first call.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from utils import metrics, settings
+from utils.rate_limit import TokenBucket
+
+DEFAULT_MODEL = "gemini-1.5-flash"
+REST_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+STREAM_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent?alt=sse"
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))          # seconds per request
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))     # retries after the first attempt
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))  # seconds, doubled per retry
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "10"))
+
+# Shared request budget for every Gemini call in this process (free tier: 15 requests/min)
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "15"))
+GEMINI_BURST = float(os.getenv("GEMINI_BURST", str(GEMINI_RPM)))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+LLM_REQUEST_SECONDS = metrics.histogram(
+    "llm_request_seconds", "Gemini call time including rate-limit waits and retries", ["method"]
+)
+LLM_ATTEMPTS = metrics.counter("llm_attempts_total", "Gemini request attempts by outcome", ["method", "outcome"])
+LLM_TOKENS = metrics.counter("llm_tokens_total", "Tokens reported by Gemini usage metadata", ["type"])
+LLM_RATE_LIMIT_WAIT = metrics.histogram("llm_rate_limit_wait_seconds", "Time spent waiting for the shared rate limit")
+
+# "gemini" (default) or "fake" (utils/fake_llm.py, for tests and load benchmarks)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+
+
+class LLMRequestError(RuntimeError):
+    """Raised when a Gemini call still fails after all retries."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def _is_network_error(exc) -> bool:
+    # requests is imported lazily with the REST session; if it isn't loaded, exc can't be one of its errors
+    requests = sys.modules.get("requests")
+    return requests is not None and isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+def _status_of(exc):
+    """HTTP status carried by an SDK / requests exception (None if unknown)."""
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def _count_tokens(usage):
+    """Add prompt/output token counts from SDK usage_metadata or REST usageMetadata."""
+    if not usage:
+        return
+    if isinstance(usage, dict):
+        counts = {"prompt": usage.get("promptTokenCount"), "output": usage.get("candidatesTokenCount")}
+    else:
+        counts = {"prompt": getattr(usage, "prompt_token_count", None),
+                  "output": getattr(usage, "candidates_token_count", None)}
+    for kind, value in counts.items():
+        if value:
+            LLM_TOKENS.inc(value, type=kind)
+
+
+def backoff_delay(attempt: int, base: float = LLM_BACKOFF_BASE, cap: float = LLM_BACKOFF_MAX) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class LLMClient:
+    """Thread-safe holder of the Gemini SDK models and the pooled HTTP session."""
+
+    def __init__(self, api_key: str = None, timeout: float = LLM_TIMEOUT,
+                 max_retries: int = LLM_MAX_RETRIES, rate_limiter: TokenBucket = None, fake=None):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or TokenBucket(rate=GEMINI_RPM / 60.0, capacity=GEMINI_BURST)
+        self._models = {}
+        self._session = None
+        self._configured = False
+        self._lock = threading.Lock()
+        # FakeGemini instance used instead of the real API (see LLM_BACKEND)
+        self.fake = fake
+        if self.fake is None and LLM_BACKEND == "fake":
+            from utils.fake_llm import FakeGemini
+            self.fake = FakeGemini()
+        elif LLM_BACKEND not in ("gemini", "fake"):
+            raise ValueError(f"Unknown LLM_BACKEND: {LLM_BACKEND}")
+
+    # ---------- shared resources ----------
+    def model(self, name: str = DEFAULT_MODEL):
+        """Return the process-wide GenerativeModel for `name` (built on first use)."""
+        if self.fake is not None:
+            return self.fake
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            if name not in self._models:
+                import google.generativeai as genai
+                if not self._configured:
+                    genai.configure(api_key=self._require_key())
+                    self._configured = True
+                self._models[name] = genai.GenerativeModel(name)
+            return self._models[name]
+
+    @property
+    def session(self):
+        """Keep-alive session with a connection pool shared by all threads."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=LLM_POOL_SIZE, pool_maxsize=LLM_POOL_SIZE)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    # ---------- retry loop ----------
+    def _call(self, fn, method: str = "generate"):
+        """Run fn() under the rate limiter, retrying 429/5xx with jittered backoff."""
+        with LLM_REQUEST_SECONDS.time(method=method):
+            return self._call_with_retries(fn, method)
+
+    def _call_with_retries(self, fn, method):
+        for attempt in range(self.max_retries + 1):
+            with LLM_RATE_LIMIT_WAIT.time():
+                self.rate_limiter.acquire()
+            try:
+                result = fn()
+                LLM_ATTEMPTS.inc(method=method, outcome="ok")
+                return result
+            except Exception as exc:
+                status = _status_of(exc)
+                LLM_ATTEMPTS.inc(method=method, outcome=str(status or type(exc).__name__))
+                retryable = status in RETRY_STATUS or _is_network_error(exc)
+                if not retryable:
+                    raise
+                if attempt >= self.max_retries:
+                    raise LLMRequestError(f"Gemini request failed after {attempt + 1} attempts: {exc}",
+                                          status=status) from exc
+                time.sleep(backoff_delay(attempt))
+
+    # ---------- public API ----------
+    def generate(self, prompt: str, model: str = DEFAULT_MODEL, **kwargs):
+        """SDK call: GenerativeModel.generate_content with timeout + retries."""
+        response = self._call(lambda: self.model(model).generate_content(
+            prompt, request_options={"timeout": self.timeout}, **kwargs
+        ), method="generate")
+        _count_tokens(getattr(response, "usage_metadata", None))
+        return response
+
+    def _rest_body(self, prompt: str, generation_config: dict = None) -> dict:
+        body = {"contents": [{"parts": [{"text": prompt}]}]}
+        if generation_config:
+            body["generationConfig"] = generation_config
+        return body
+
+    def _require_key(self) -> str:
+        """API key from configure() or, on first use, from settings (secrets.toml / .env)."""
+        if not self.api_key:
+            self.api_key = settings.gemini_api_key()
+        if not self.api_key:
+            raise ValueError("⚠️ Missing GEMINI_API_KEY (set it in .env or .streamlit/secrets.toml)")
+        return self.api_key
+
+    def _headers(self) -> dict:
+        return {"Content-Type": "application/json", "x-goog-api-key": self._require_key()}
+
+    def generate_rest(self, prompt: str, model: str = DEFAULT_MODEL, generation_config: dict = None) -> dict:
+        """REST call over the pooled session; returns the decoded JSON body."""
+        if self.fake is not None:
+            result = self._call(lambda: self.fake.generate_rest(prompt), method="generate_rest")
+            _count_tokens(result.get("usageMetadata"))
+            return result
+        body = self._rest_body(prompt, generation_config)
+
+        def _post():
+            response = self.session.post(
+                REST_URL.format(model=model),
+                json=body,
+                headers=self._headers(),
+                timeout=self.timeout,
+            )
+            # Every non-2xx raises: RETRY_STATUS is retried by _call, other 4xx surface to the caller
+            response.raise_for_status()
+            return response.json()
+
+        result = self._call(_post, method="generate_rest")
+        _count_tokens(result.get("usageMetadata") if isinstance(result, dict) else None)
+        return result
+
+    def stream_rest(self, prompt: str, model: str = DEFAULT_MODEL, generation_config: dict = None):
+        """
+        Streaming REST call (server-sent events from Gemini).
+        Yields text chunks as they arrive. Retries only apply before the first byte.
+        """
+        if self.fake is not None:
+            yield from self._call(lambda: self.fake.open_stream(prompt), method="stream_rest")
+            return
+        body = self._rest_body(prompt, generation_config)
+
+        def _open():
+            response = self.session.post(
+                STREAM_URL.format(model=model),
+                json=body,
+                headers=self._headers(),
+                timeout=self.timeout,
+                stream=True,
+            )
+            if response.status_code >= 400:
+                response.close()
+                response.raise_for_status()
+            return response
+
+        response = self._call(_open, method="stream_rest")
+        usage = None
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                try:
+                    chunk = json.loads(line[len("data:"):].strip())
+                except json.JSONDecodeError:
+                    continue
+                usage = chunk.get("usageMetadata") or usage  # running totals; the last one counts
+                for candidate in chunk.get("candidates", []):
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+        _count_tokens(usage)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def configure(api_key: str):
+    """Override the API key of the shared client (by default it is read from settings on first use)."""
+    client = get_client()
+    with client._lock:
+        client.api_key = api_key
+        client._configured = False
+        client._models.clear()
+
+
+def get_client() -> LLMClient:
+    """Process-wide LLMClient."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+    return _client
@@ -0,0 +1,327 @@
+"""
+Tolerant parsers for Gemini output.
+
+- NumberedListParser: question lists ("1.", "1)", "(1)", "Q1:", "**1.**", bullets),
+  multi-line items, headers/footers and code fences skipped.
+- JSONExtractor: the first balanced JSON object/array in the text (fences, prose
+  around it and braces inside strings are fine); truncated output is closed.
+- repair_json(): trailing commas, single/smart quotes, Python literals, // comments.
+- validate(): light schema check/coercion (e.g. score "7/10" -> 7).
+
+Both parsers are incremental (feed() chunks as they stream in, then close()) and
+look at every character once. Failures raise ParseError with a `kind` and a
+reask_hint() that can be sent back to the model instead of silently giving up.
+"""
+import json
+import re
+
+_ITEM = re.compile(
+    r"""^\s*(?:\*\*|__)?\s*                       # optional bold
+        (?:(?:q(?:uestion)?\s*)?                  # "Q1:" / "Question 1:"
+           \(?(?P<num>\d{1,3})\s*[.):\]]          # "1." "1)" "(1)" "1:" "1]"
+          |(?P<bullet>[-*•]))                     # "- " "* " "• "
+        \s*(?:\*\*|__)?\s+(?P<text>\S.*)$""",
+    re.IGNORECASE | re.VERBOSE,
+)
+_FENCE = re.compile(r"^\s*```")
+
+
+class ParseError(ValueError):
+    """Structured parse failure; kind is one of empty, no_json, invalid_json, schema, no_items."""
+
+    def __init__(self, kind: str, message: str, text: str = ""):
+        super().__init__(f"{kind}: {message}")
+        self.kind = kind
+        self.message = message
+        self.text = (text or "")[:500]
+
+    def reask_hint(self) -> str:
+        """Instruction appended to the prompt when asking the model again."""
+        return (
+            f"Your previous reply could not be used ({self.message}). "
+            "Reply again following the requested format exactly, with no extra text."
+        )
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "message": self.message}
+
+
+# ---------- numbered lists ----------
+def _clean_item(text: str) -> str:
+    text = text.strip()
+    for marker in ("**", "__"):
+        if text.startswith(marker):
+            text = text[len(marker):]
+        if text.endswith(marker):
+            text = text[:-len(marker)]
+    return text.strip()
+
+
+class NumberedListParser:
+    """
+    Incremental list parser. feed() returns items completed so far; close() returns the rest.
+    Numbered items win over bullets: once a numbered item is seen, bullets count as
+    continuation text (sub-points of a question).
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._current = None
+        self._numbered = False
+        self._in_fence = False
+
+    def _line(self, line: str):
+        done = []
+        if _FENCE.match(line):
+            self._in_fence = not self._in_fence
+            return done
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            # A blank line or heading ends the item; trailing prose is not appended to it
+            if self._current:
+                done.append(self._current)
+            self._current = None
+            return done
+
+        match = _ITEM.match(line)
+        if match and (match.group("num") or not self._numbered):
+            if match.group("num"):
+                self._numbered = True
+            if self._current:
+                done.append(self._current)
+            self._current = _clean_item(match.group("text"))
+        elif self._current is not None:
+            extra = match.group("text") if match else stripped
+            self._current = f"{self._current} {_clean_item(extra)}"
+        # Anything before the first item is a header and is skipped
+        return done
+
+    def feed(self, chunk: str) -> list:
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        done = []
+        for line in lines:
+            done.extend(self._line(line))
+        return [d for d in done if d]
+
+    def close(self) -> list:
+        done = self._line(self._buffer) if self._buffer else []
+        self._buffer = ""
+        if self._current:
+            done.append(self._current)
+        self._current = None
+        return [d for d in done if d]
+
+
+def parse_numbered_list(text: str) -> list:
+    """Item texts of a numbered (or bulleted) list; [] if none found."""
+    parser = NumberedListParser()
+    items = parser.feed(text or "")
+    return items + parser.close()
+
+
+# ---------- JSON ----------
+class JSONExtractor:
+    """
+    Incremental scanner for the first balanced {...} / [...] (string-aware).
+    feed() returns the raw JSON text once it closes, else None.
+    """
+
+    _PAIRS = {"{": "}", "[": "]"}
+
+    def __init__(self):
+        self._chars = []
+        self._stack = []
+        self._quote = None
+        self._escape = False
+        self.result = None
+        self.truncated = False
+
+    def feed(self, chunk: str):
+        if self.result is not None:
+            return self.result
+        for ch in chunk:
+            if not self._stack:
+                if ch in self._PAIRS:
+                    self._stack.append(self._PAIRS[ch])
+                    self._chars.append(ch)
+                continue
+            self._chars.append(ch)
+            if self._quote:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == self._quote:
+                    self._quote = None
+            elif ch in ('"', "'", "“"):
+                self._quote = "”" if ch == "“" else ch
+            elif ch in self._PAIRS:
+                self._stack.append(self._PAIRS[ch])
+            elif ch in "}]":
+                if ch == self._stack[-1]:
+                    self._stack.pop()
+                if not self._stack:
+                    self.result = "".join(self._chars)
+                    return self.result
+        return None
+
+    def close(self):
+        """Final text; output cut off mid-way is closed with the missing brackets."""
+        if self.result is None and self._stack:
+            text = "".join(self._chars)
+            if self._quote:
+                text += self._quote
+            self.result = text + "".join(reversed(self._stack))
+            self.truncated = True
+        return self.result
+
+
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def repair_json(raw: str) -> str:
+    """Fix common LLM JSON defects in one pass, leaving string contents untouched."""
+    out = []
+    i, n = 0, len(raw)
+    while i < n:
+        ch = raw[i]
+        if ch in ('"', "'", "“", "”"):
+            close = {"“": "”"}.get(ch, ch)
+            j = i + 1
+            buf = []
+            while j < n and raw[j] != close and not (close == "”" and raw[j] == "“"):
+                if raw[j] == "\\" and j + 1 < n:
+                    buf.append(raw[j:j + 2])
+                    j += 2
+                    continue
+                buf.append('\\"' if raw[j] == '"' and close != '"' else raw[j])
+                j += 1
+            body = "".join(buf)
+            if close != '"':
+                body = body.replace("\\'", "'")
+            out.append('"' + body + '"')
+            i = j + 1
+        elif ch == "/" and raw.startswith("//", i):
+            while i < n and raw[i] != "\n":
+                i += 1
+        elif ch == ",":
+            j = i + 1
+            while j < n and raw[j].isspace():
+                j += 1
+            if j < n and raw[j] in "}]":
+                i += 1  # trailing comma
+            else:
+                out.append(ch)
+                i += 1
+        elif ch.isalpha():
+            j = i
+            while j < n and (raw[j].isalnum() or raw[j] == "_"):
+                j += 1
+            word = raw[i:j]
+            out.append(_LITERALS.get(word, word))
+            i = j
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def extract_json(text: str):
+    """First JSON object/array in text (repaired if needed). Raises ParseError."""
+    if not text or not text.strip():
+        raise ParseError("empty", "the reply was empty", text)
+    extractor = JSONExtractor()
+    raw = extractor.feed(text) or extractor.close()
+    if raw is None:
+        raise ParseError("no_json", "no JSON object or array was found", text)
+    try:
+        return json.loads(raw)
+    except ValueError:
+        pass
+    try:
+        return json.loads(repair_json(raw))
+    except ValueError as e:
+        raise ParseError("invalid_json", f"the JSON could not be decoded ({e.msg})", text) from None
+
+
+# ---------- schema ----------
+class Field:
+    """Expected type of one key; numbers may be bounded, missing keys may have a default."""
+
+    _MISSING = object()
+
+    def __init__(self, types, minimum=None, maximum=None, default=_MISSING):
+        self.types = types if isinstance(types, tuple) else (types,)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.default = default
+
+    def coerce(self, value):
+        if (int in self.types or float in self.types) and isinstance(value, str):
+            # "7", "7.5", "7/10"
+            match = re.match(r"^\s*(-?\d+(?:\.\d+)?)\s*(?:/\s*10)?\s*$", value)
+            if match:
+                number = float(match.group(1))
+                value = int(number) if number.is_integer() else number
+        if list in self.types and isinstance(value, str):
+            value = [value] if value.strip() else []
+        return value
+
+    def check(self, name, value):
+        if isinstance(value, bool) or not isinstance(value, self.types):
+            names = "/".join(t.__name__ for t in self.types)
+            return f'"{name}" should be {names}, got {type(value).__name__}'
+        if self.minimum is not None and value < self.minimum:
+            return f'"{name}" is below {self.minimum}'
+        if self.maximum is not None and value > self.maximum:
+            return f'"{name}" is above {self.maximum}'
+        return None
+
+
+def validate(obj, schema: dict) -> dict:
+    """Coerce and check an object against {key: Field}; extra keys are kept. Raises ParseError."""
+    if not isinstance(obj, dict):
+        raise ParseError("schema", f"expected a JSON object, got {type(obj).__name__}")
+    result = dict(obj)
+    for name, field in schema.items():
+        if result.get(name) is None and field.default is not Field._MISSING:
+            result.pop(name, None)
+        if name not in result:
+            if field.default is Field._MISSING:
+                raise ParseError("schema", f'missing "{name}"')
+            result[name] = list(field.default) if isinstance(field.default, list) else field.default
+            continue
+        result[name] = field.coerce(result[name])
+        problem = field.check(name, result[name])
+        if problem:
+            raise ParseError("schema", problem)
+    return result
+
+
+def parse_json(text: str, schema: dict = None, expect: type = None):
+    """
+    extract_json() + checks. expect=dict/list requires that top-level type; with a schema,
+    a dict is validated and a list keeps only items that validate (none valid -> ParseError).
+    """
+    value = extract_json(text)
+    if expect is not None and not isinstance(value, expect):
+        if expect is list and isinstance(value, dict):
+            value = [value]
+        elif expect is dict and isinstance(value, list) and len(value) == 1 and isinstance(value[0], dict):
+            value = value[0]
+        else:
+            raise ParseError("schema", f"expected a JSON {expect.__name__}, got {type(value).__name__}", text)
+    if schema is None:
+        return value
+    if isinstance(value, list):
+        items = []
+        for item in value:
+            try:
+                items.append(validate(item, schema))
+            except ParseError:
+                items.append(None)
+        if value and not any(items):
+            raise ParseError("schema", "no item matched the expected fields", text)
+        return items
+    return validate(value, schema)
@@ -0,0 +1,292 @@
+"""
+In-process timers and counters with a Prometheus text export.
+
+Histograms use fixed buckets, so recording a value is a bisect plus a few integer
+adds under a per-series lock; nothing is kept per observation. app.py serves
+render() at /metrics and the admin portal shows summary() (p50/p95 estimated from
+the buckets, like Prometheus' histogram_quantile).
+
+    LLM_SECONDS = metrics.histogram("llm_request_seconds", "Gemini request time", ["method"])
+    with LLM_SECONDS.time(method="generate"):
+        ...
+
+Set METRICS=0 to turn recording off.
+"""
+from bisect import bisect_left
+from functools import wraps
+import math
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.getenv("METRICS", "1") not in ("0", "false", "no")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; covers cache hits (~ms) up to slow LLM calls with retries
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_text(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class _Timer:
+    """Context manager / decorator that observes elapsed seconds into one histogram series."""
+
+    def __init__(self, metric, labels):
+        self.metric = metric
+        self.child = metric._child(labels)  # resolved once, not per observation
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metric._record(self.child, time.perf_counter() - self._start)
+
+    def __call__(self, fn):
+        metric, child = self.metric, self.child
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metric._record(child, time.perf_counter() - start)
+        return wrapper
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _child(self, labels: dict):
+        key = self._key(labels)
+        child = self._series.get(key)
+        if child is None:
+            with self._lock:
+                child = self._series.setdefault(key, self._new_child())
+        return child
+
+    def series(self):
+        """[(label values, child)] snapshot."""
+        with self._lock:
+            return list(self._series.items())
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1, **labels):
+        if not METRICS_ENABLED:
+            return
+        child = self._child(labels)
+        with child.lock:
+            child.value += amount
+
+    def render(self):
+        lines = []
+        for key, child in self.series():
+            lines.append(f"{self.name}{_label_text(self.labelnames, key)} {child.value:g}")
+        return lines
+
+
+class _HistogramChild:
+    def __init__(self, n_buckets):
+        self.counts = [0] * (n_buckets + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(len(self.buckets))
+
+    def observe(self, value: float, **labels):
+        if METRICS_ENABLED:
+            self._record(self._child(labels), value)
+
+    def _record(self, child, value: float):
+        if not METRICS_ENABLED:
+            return
+        i = bisect_left(self.buckets, value)
+        with child.lock:
+            child.counts[i] += 1
+            child.sum += value
+            child.count += 1
+
+    def time(self, **labels) -> _Timer:
+        """`with hist.time(op="x"):` or `@hist.time(op="x")`."""
+        return _Timer(self, labels)
+
+    def render(self):
+        lines = []
+        for key, child in self.series():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += n
+                le = "+Inf" if bound == math.inf else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, [('le', le)])} {cumulative}")
+            labels = _label_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {child.sum:g}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+    def quantile(self, child: _HistogramChild, q: float):
+        """Estimate of the q-quantile from bucket counts (linear within a bucket)."""
+        if not child.count:
+            return None
+        rank = q * child.count
+        cumulative, lower = 0, 0.0
+        for bound, n in zip(self.buckets + (math.inf,), child.counts):
+            if n and cumulative + n >= rank:
+                if bound == math.inf:
+                    return self.buckets[-1]
+                return lower + (bound - lower) * (rank - cumulative) / n
+            cumulative += n
+            lower = bound if bound != math.inf else lower
+        return self.buckets[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def metrics(self):
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> list:
+        """One row per series: count, total, mean/p50/p95 in ms for histograms, value for counters."""
+        rows = []
+        for metric in self.metrics():
+            for key, child in metric.series():
+                row = {"metric": metric.name, "labels": ", ".join(f"{k}={v}" for k, v in zip(metric.labelnames, key))}
+                if isinstance(metric, Histogram):
+                    p50, p95 = metric.quantile(child, 0.5), metric.quantile(child, 0.95)
+                    row.update({
+                        "count": child.count,
+                        "total_s": round(child.sum, 3),
+                        "mean_ms": round(child.sum / child.count * 1000, 2) if child.count else None,
+                        "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+                        "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+                    })
+                else:
+                    row["count"] = child.value
+                rows.append(row)
+        return rows
+
+
+def parse(text: str) -> Registry:
+    """Rebuild a Registry from Prometheus text (e.g. the Flask server's /metrics)."""
+    registry = Registry()
+    kinds, helps, samples = {}, {}, []
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ", 3)
+            kinds[name] = kind
+        elif line.startswith("# HELP "):
+            _, _, name, *rest = line.split(" ", 3)
+            helps[name] = rest[0] if rest else ""
+        elif line and not line.startswith("#"):
+            head, _, value = line.rpartition(" ")
+            name, _, raw_labels = head.partition("{")
+            labels = {}
+            for part in raw_labels.rstrip("}").split('",') if raw_labels else []:
+                k, _, v = part.partition('="')
+                labels[k] = v.rstrip('"')
+            samples.append((name, labels, float(value)))
+
+    bounds = {}
+    for name, labels, _ in samples:
+        if name.endswith("_bucket") and labels.get("le") not in (None, "+Inf"):
+            bounds.setdefault(name[:-len("_bucket")], set()).add(float(labels["le"]))
+
+    for name, labels, value in samples:
+        base = next((name[:-len(s)] for s in ("_bucket", "_sum", "_count")
+                     if name.endswith(s) and kinds.get(name[:-len(s)]) == "histogram"), name)
+        labels = dict(labels)
+        if kinds.get(base) == "histogram":
+            le = labels.pop("le", None)
+            metric = registry.histogram(base, helps.get(base, ""), sorted(labels), buckets=bounds.get(base, ()))
+            child = metric._child(labels)
+            if name.endswith("_bucket"):
+                i = len(metric.buckets) if le == "+Inf" else metric.buckets.index(float(le))
+                child.counts[i] = value  # cumulative for now, differenced below
+            elif name.endswith("_sum"):
+                child.sum = value
+            else:
+                child.count = int(value)
+        elif kinds.get(base) == "counter":
+            metric = registry.counter(base, helps.get(base, ""), sorted(labels))
+            metric._child(labels).value = value
+
+    for metric in registry.metrics():
+        if isinstance(metric, Histogram):
+            for _, child in metric.series():
+                cumulative = child.counts
+                child.counts = [int(c - (cumulative[i - 1] if i else 0)) for i, c in enumerate(cumulative)]
+    return registry
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+histogram = REGISTRY.histogram
+render = REGISTRY.render
+summary = REGISTRY.summary
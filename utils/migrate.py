@@ -0,0 +1,51 @@
+"""
+Move candidates (and their interview JSON columns) from the workbook into the
+normalized SQLite tables.
+
+    python -m utils.migrate                      # candidates.xlsx -> data/candidates.db
+    python -m utils.migrate --excel other.xlsx --db /tmp/candidates.db
+
+Safe to re-run: only candidates missing from the database are added, so rows the app
+has updated since are kept, and interviews are not duplicated. --force replaces every
+candidate row with the workbook's instead.
+"""
+from pathlib import Path
+import argparse
+
+import pandas as pd
+
+from utils.storage import SQLiteCandidateStore
+
+
+def migrate_workbook(excel_path: Path, db_path: Path, force: bool = False) -> dict:
+    """
+    Import the workbook's candidate rows that are not in the database yet and split
+    their JSON columns into interview rows. force=True overwrites all stored rows.
+    """
+    store = SQLiteCandidateStore(db_path)
+    df = pd.read_excel(excel_path, engine="openpyxl", dtype=str)
+    if force:
+        store.save_all(df)
+        added = len(df)
+    else:
+        added = store.add_candidates(df)
+    interviews = store.migrate_interviews()
+    with_answers = store.latest_answers()["candidate_id"].nunique()
+    return {"candidates": len(df), "candidates_added": added, "interviews_created": interviews,
+            "candidates_with_answers": with_answers}
+
+
+if __name__ == "__main__":
+    from utils.excel_handler import CANDIDATES_FILE, DB_FILE
+
+    parser = argparse.ArgumentParser(description="Migrate candidates.xlsx into the normalized SQLite store.")
+    parser.add_argument("--excel", type=Path, default=CANDIDATES_FILE)
+    parser.add_argument("--db", type=Path, default=DB_FILE)
+    parser.add_argument("--force", action="store_true",
+                        help="Overwrite candidates already in the database with the workbook rows")
+    args = parser.parse_args()
+
+    result = migrate_workbook(args.excel, args.db, force=args.force)
+    print(f"✅ Migrated {result['candidates_added']} of {result['candidates']} candidates into {args.db}: "
+          f"{result['interviews_created']} interviews created, "
+          f"{result['candidates_with_answers']} candidates with stored answers")
@@ -0,0 +1,338 @@
+"""
+Persistent question bank with an in-memory inverted index.
+
+Questions are stored once in SQLite (data/question_bank.db), tagged with skill
+keywords and a difficulty level. At load time they are indexed as
+keyword -> difficulty -> [question_id], so assembling a candidate's set is a few
+dict lookups. Gemini is only called to top up (keyword, difficulty) categories
+that hold fewer than BANK_MIN_PER_CATEGORY questions. New questions that are
+near-duplicates (MinHash/LSH, see utils/dedup.py) of a stored one are merged into
+it: the existing question just gains the new keyword tags.
+
+    python -m utils.question_bank seed --tech-stack excel --keywords "vlookup, pivot tables"
+    python -m utils.question_bank stats
+"""
+from pathlib import Path
+from contextlib import closing
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from utils import metrics, settings
+from utils.llm_cache import normalize_text
+from utils.llm_parse import parse_numbered_list
+
+BANK_DB = Path(os.getenv("QUESTION_BANK_DB", settings.data_path("question_bank.db")))
+# Set QUESTION_BANK=0 to always generate questions per candidate (old behaviour)
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK", "1") not in ("0", "false", "no")
+BANK_MIN_PER_CATEGORY = int(os.getenv("BANK_MIN_PER_CATEGORY", "5"))
+BANK_TOP_UP_SIZE = int(os.getenv("BANK_TOP_UP_SIZE", "10"))
+# How often (seconds) to look for questions added by other processes
+BANK_RELOAD_INTERVAL = float(os.getenv("BANK_RELOAD_INTERVAL", "5"))
+
+BANK_TOP_UP_FAILURES = metrics.counter(
+    "question_bank_top_up_failures_total", "Question bank top-ups that failed (Gemini or parsing)", ["error"]
+)
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTIES = ("basic", "medium", "advanced")
+# Mirrors the YOE rules of the question prompt
+DIFFICULTY_MIX = {
+    "0-1": ("basic", "medium"),
+    "2-3": ("medium", "advanced"),
+    "4+": ("advanced",),
+}
+
+
+def yoe_band(yoe: int) -> str:
+    """Difficulty band used by the question prompt (0-1 fresher, 2-3 mid, 4+ senior)."""
+    if yoe <= 1:
+        return "0-1"
+    return "2-3" if yoe <= 3 else "4+"
+
+
+def split_keywords(keywords) -> list:
+    """Normalized, de-duplicated keywords from a comma-separated string or a list."""
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    seen = []
+    for k in keywords or []:
+        k = normalize_text(k)
+        if k and k not in seen:
+            seen.append(k)
+    return seen
+
+
+class QuestionBank:
+    """Question store + inverted index (keyword -> difficulty -> question ids)."""
+
+    def __init__(self, path: Path = BANK_DB):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._version = None
+        self._checked = 0.0
+        self._text = {}     # question_id -> text
+        self._meta = {}     # question_id -> (difficulty, tech_stack)
+        self._index = {}    # keyword -> {difficulty -> [question_id]}
+        self._lsh = None    # near-duplicate index over self._text, built on first add()
+        self._initialized = False
+
+    # ---------- storage ----------
+    def _connect(self):
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                # The same wording may be stored once per difficulty, so every level can fill up
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS questions ("
+                    "question_id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT NOT NULL, "
+                    "text_key TEXT NOT NULL, difficulty TEXT NOT NULL, tech_stack TEXT, created REAL, "
+                    "UNIQUE (text_key, difficulty))"
+                )
+                self._upgrade_text_key(conn)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS question_keywords ("
+                    "keyword TEXT NOT NULL, question_id INTEGER NOT NULL REFERENCES questions(question_id), "
+                    "PRIMARY KEY (keyword, question_id))"
+                )
+            self._initialized = True
+        return conn
+
+    @staticmethod
+    def _upgrade_text_key(conn):
+        """Banks created with a globally unique text_key: rebuild the table (ids are kept)."""
+        sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'questions'").fetchone()[0]
+        if "UNIQUE (text_key, difficulty)" in sql:
+            return
+        conn.execute(
+            "CREATE TABLE questions_new ("
+            "question_id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT NOT NULL, "
+            "text_key TEXT NOT NULL, difficulty TEXT NOT NULL, tech_stack TEXT, created REAL, "
+            "UNIQUE (text_key, difficulty))"
+        )
+        conn.execute("INSERT INTO questions_new SELECT question_id, text, text_key, difficulty, tech_stack, created "
+                     "FROM questions")
+        conn.execute("DROP TABLE questions")
+        conn.execute("ALTER TABLE questions_new RENAME TO questions")
+
+    def _file_version(self):
+        sig = []
+        for p in (self.path, Path(f"{self.path}-wal")):
+            try:
+                st = p.stat()
+                sig.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append(None)
+        return tuple(sig)
+
+    def _ensure_loaded(self):
+        """(Re)build the in-memory index when the database changed on disk."""
+        now = time.monotonic()
+        if self._version is not None and now - self._checked < BANK_RELOAD_INTERVAL:
+            return
+        self._checked = now
+        version = self._file_version()
+        if version == self._version:
+            return
+        with self._lock, closing(self._connect()) as conn:
+            text, meta, index = {}, {}, {}
+            for qid, q_text, difficulty, tech_stack in conn.execute(
+                "SELECT question_id, text, difficulty, tech_stack FROM questions"
+            ):
+                text[qid] = q_text
+                meta[qid] = (difficulty, tech_stack)
+            for keyword, qid in conn.execute("SELECT keyword, question_id FROM question_keywords"):
+                if qid in meta:
+                    index.setdefault(keyword, {}).setdefault(meta[qid][0], []).append(qid)
+            self._text, self._meta, self._index = text, meta, index
+            self._lsh = None
+        # Closing the connection may checkpoint the WAL; record the signature after that
+        self._version = self._file_version()
+
+    def _near_duplicates(self):
+        if self._lsh is None:
+            # NumPy is only needed when questions are added, not to assemble sets
+            from utils.dedup import DEFAULT_THRESHOLD, LSHIndex
+            lsh = LSHIndex(DEFAULT_THRESHOLD)
+            for qid, q_text in self._text.items():
+                lsh.add(qid, q_text)
+            self._lsh = lsh
+        return self._lsh
+
+    def _duplicate_at(self, lsh, signature, difficulty: str):
+        """Most similar stored question of the same difficulty, or None."""
+        for qid, _ in lsh.query(signature=signature):
+            # Questions added earlier in the same add() call are not in _meta yet; they share `difficulty`
+            if self._meta.get(qid, (difficulty,))[0] == difficulty:
+                return qid
+        return None
+
+    def add(self, questions: list, keywords, difficulty: str, tech_stack: str = None) -> int:
+        """
+        Store question texts under keywords/difficulty. Exact or near-duplicates of a
+        stored question of the same difficulty only add the keyword tags to it.
+        Returns the number of new questions.
+        """
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        keywords = split_keywords(keywords)
+        new_rows, tags = [], []
+        with self._lock:
+            self._ensure_loaded()
+            lsh = self._near_duplicates()
+            with closing(self._connect()) as conn, conn:
+                for q_text in questions:
+                    q_text = q_text.strip()
+                    if not q_text:
+                        continue
+                    sig = lsh.hasher.signature(q_text)
+                    qid = self._duplicate_at(lsh, sig, difficulty)
+                    if qid is None:
+                        cur = conn.execute(
+                            "INSERT OR IGNORE INTO questions (text, text_key, difficulty, tech_stack, created) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (q_text, normalize_text(q_text), difficulty, normalize_text(tech_stack) or None,
+                             time.time()),
+                        )
+                        qid = conn.execute(
+                            "SELECT question_id FROM questions WHERE text_key = ? AND difficulty = ?",
+                            (normalize_text(q_text), difficulty),
+                        ).fetchone()[0]
+                        if cur.rowcount:
+                            new_rows.append((qid, q_text, normalize_text(tech_stack) or None))
+                        lsh.add(qid, signature=sig)
+                    for k in keywords:
+                        cur = conn.execute(
+                            "INSERT OR IGNORE INTO question_keywords (keyword, question_id) VALUES (?, ?)", (k, qid)
+                        )
+                        if cur.rowcount:
+                            tags.append((k, qid))
+
+            # Apply the same rows to the in-memory index instead of reloading everything
+            for qid, q_text, stack in new_rows:
+                self._text[qid] = q_text
+                self._meta[qid] = (difficulty, stack)
+            for k, qid in tags:
+                if qid in self._meta:
+                    self._index.setdefault(k, {}).setdefault(self._meta[qid][0], []).append(qid)
+            self._version = self._file_version()
+        return len(new_rows)
+
+    # ---------- retrieval ----------
+    def text(self, question_id: int):
+        self._ensure_loaded()
+        return self._text.get(question_id)
+
+    def count(self, keyword: str, difficulty: str) -> int:
+        self._ensure_loaded()
+        return len(self._index.get(normalize_text(keyword), {}).get(difficulty, ()))
+
+    def thin_categories(self, keywords, yoe: int, minimum: int = BANK_MIN_PER_CATEGORY) -> list:
+        """(keyword, difficulty) pairs needed for this profile that hold fewer than `minimum` questions."""
+        difficulties = DIFFICULTY_MIX[yoe_band(yoe)]
+        return [
+            (k, d) for k in split_keywords(keywords) for d in difficulties
+            if self.count(k, d) < minimum
+        ]
+
+    def assemble(self, keywords, yoe: int, n: int = 5, seed=None, exclude=()) -> list:
+        """
+        Pick up to n questions for the keywords at the difficulties of the YOE band,
+        round-robin over keyword x difficulty so every skill is covered.
+        Returns [{"question_id", "question", "keyword", "difficulty"}].
+        """
+        self._ensure_loaded()
+        rng = random.Random(seed)
+        slots = []
+        for k in split_keywords(keywords):
+            for d in DIFFICULTY_MIX[yoe_band(yoe)]:
+                pool = [q for q in self._index.get(k, {}).get(d, ()) if q not in exclude]
+                if pool:
+                    rng.shuffle(pool)
+                    slots.append((k, d, pool))
+        rng.shuffle(slots)
+
+        picked, used = [], set(exclude)
+        while slots and len(picked) < n:
+            remaining = []
+            for k, d, pool in slots:
+                while pool and pool[-1] in used:
+                    pool.pop()
+                if not pool or len(picked) >= n:
+                    continue
+                qid = pool.pop()
+                used.add(qid)
+                picked.append({"question_id": qid, "question": self._text[qid], "keyword": k, "difficulty": d})
+                remaining.append((k, d, pool))
+            slots = remaining
+        return picked
+
+    def top_up(self, tech_stack: str, keyword: str, difficulty: str, count: int = BANK_TOP_UP_SIZE) -> int:
+        """Ask Gemini for `count` new questions in one category and store them."""
+        from utils import gemini_handler as gh
+        text = gh.generate_tagged_questions(tech_stack, keyword, difficulty, count)
+        return self.add(parse_numbered_list(text), [keyword], difficulty, tech_stack)
+
+    def questions_for(self, tech_stack: str, keywords, yoe: int, n: int = 5, seed=None) -> list:
+        """assemble(), topping up thin categories through Gemini first."""
+        for keyword, difficulty in self.thin_categories(keywords, yoe):
+            try:
+                self.top_up(tech_stack, keyword, difficulty)
+            except Exception as e:
+                # Use whatever the bank already has; callers fall back if that is too little
+                BANK_TOP_UP_FAILURES.inc(error=type(e).__name__)
+                logger.warning("Question bank top-up failed for %s/%s: %s", keyword, difficulty, e)
+        return self.assemble(keywords, yoe, n, seed=seed)
+
+    def stats(self) -> dict:
+        self._ensure_loaded()
+        return {
+            "questions": len(self._text),
+            "keywords": len(self._index),
+            "categories": {
+                k: {d: len(ids) for d, ids in by_diff.items()} for k, by_diff in sorted(self._index.items())
+            },
+        }
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_bank() -> QuestionBank:
+    """Process-wide QuestionBank."""
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = QuestionBank()
+    return _bank
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the interview question bank.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed = sub.add_parser("seed", help="Top up every difficulty of the given keywords")
+    seed.add_argument("--tech-stack", required=True)
+    seed.add_argument("--keywords", required=True, help="Comma-separated skills")
+    seed.add_argument("--per-category", type=int, default=BANK_TOP_UP_SIZE)
+    sub.add_parser("stats", help="Show question counts per keyword / difficulty")
+    args = parser.parse_args()
+
+    bank = get_bank()
+    if args.command == "seed":
+        for keyword in split_keywords(args.keywords):
+            for difficulty in DIFFICULTIES:
+                if bank.count(keyword, difficulty) < args.per_category:
+                    added = bank.top_up(args.tech_stack, keyword, difficulty, args.per_category)
+                    print(f"  {keyword} / {difficulty}: +{added}")
+    for keyword, by_diff in bank.stats()["categories"].items():
+        print(f"{keyword}: " + ", ".join(f"{d}={by_diff.get(d, 0)}" for d in DIFFICULTIES))
@@ -1,43 +1,289 @@
 from utils import excel_handler as eh
 from utils import gemini_handler as gh
+from utils.dedup import DEFAULT_THRESHOLD, LSHIndex, MinHasher, dedupe
+from utils.llm_cache import normalize_text
+from utils.llm_parse import parse_numbered_list
+from utils.question_bank import QUESTION_BANK_ENABLED, get_bank, yoe_band
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import argparse
 import json
+import os
 
-def generate_and_store_questions(candidate_id: str, num_questions: int = 5):
+# Bulk generation: concurrent Gemini calls (the shared client still enforces GEMINI_RPM)
+BULK_MAX_WORKERS = int(os.getenv("BULK_MAX_WORKERS", "4"))
+# Questions generated by an unfinished bulk run, reused when it is restarted
+BULK_CHECKPOINT = eh.DB_FILE.parent / "bulk_questions_checkpoint.json"
+
+
+def generate_and_store_questions(candidate_id: str, num_questions: int = 5, use_bank: bool = None):
     """
-    Fetch candidate info from Excel, generate questions using Gemini,
+    Fetch candidate info from Excel, assemble questions from the question bank
+    (Gemini only tops up thin categories; falls back to a fresh Gemini list),
     and update the candidate row in Excel.
     """
     candidate = eh.get_candidate(candidate_id)
     if not candidate:
         raise ValueError(f"Candidate {candidate_id} not found.")
 
+    structured_questions = _questions_for(candidate, num_questions, use_bank, seed=candidate_id)
+
+    # Update candidate in Excel
+    eh.update_candidate(candidate_id, {
+        "questions_json": structured_questions,
+        "transcript_json": []  # initialize empty transcript
+    })
+
+    return structured_questions
+
+
+def _questions_for(candidate: dict, num_questions: int, use_bank: bool = None, seed=None) -> list:
     tech_stack = candidate.get("tech_stack")
     keywords = candidate.get("keywords")
-    yoe = int(candidate.get("yoe", 0))
+    yoe = _parse_yoe(candidate.get("yoe"))
+
+    if use_bank is None:
+        use_bank = QUESTION_BANK_ENABLED
+    if use_bank:
+        # Draw a few spare questions so near-duplicates can be dropped without a second lookup
+        picked = get_bank().questions_for(tech_stack, keywords, yoe, num_questions * 2, seed=seed)
+        picked = [picked[i] for i in dedupe([q["question"] for q in picked])][:num_questions]
+        if len(picked) >= num_questions:
+            return [
+                {**_blank_question(q["question"]), "question_id": q["question_id"],
+                 "keyword": q["keyword"], "difficulty": q["difficulty"]}
+                for q in picked
+            ]
 
     # Generate questions from Gemini
     questions_text = gh.generate_questions(tech_stack, keywords, yoe, num_questions)
+    return _dedupe_questions(_structure_questions(questions_text))
+
+
+def _dedupe_questions(questions: list) -> list:
+    """Drop questions that are near-duplicates of an earlier one in the same set."""
+    return [questions[i] for i in dedupe([q["question"] for q in questions])]
+
+
+def _blank_question(q_text: str) -> dict:
+    return {
+        "question": q_text,
+        "answer": "",   # empty placeholder
+        "score": None,
+        "strengths": [],
+        "weaknesses": []
+    }
+
+
+def _structure_questions(questions_text: str) -> list:
+    """Convert numbered list text to structured JSON (headers, fences and sub-bullets are not questions)."""
+    return [_blank_question(q_text) for q_text in parse_numbered_list(questions_text)]
+
+
+def _parse_yoe(value) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def profile_key(candidate: dict) -> str:
+    """Candidates with the same key get the same generated questions."""
+    keywords = sorted(k.strip() for k in normalize_text(candidate.get("keywords")).split(",") if k.strip())
+    return json.dumps([
+        normalize_text(candidate.get("tech_stack")),
+        keywords,
+        yoe_band(_parse_yoe(candidate.get("yoe"))),
+    ])
+
+
+def _load_checkpoint(path: Path, num_questions: int) -> dict:
+    """{profile_key: questions} finished by an earlier run with the same settings."""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("num_questions") != num_questions:
+        return {}
+    return data.get("groups", {})
+
 
-    # Convert numbered list text to structured JSON
-    structured_questions = []
-    for line in questions_text.split("\n"):
-        line = line.strip()
-        if not line:
+def _save_checkpoint(path: Path, num_questions: int, done: dict):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"num_questions": num_questions, "groups": done}, ensure_ascii=False),
+                   encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def generate_bulk(candidate_ids: list = None, num_questions: int = 5, overwrite: bool = False,
+                  max_workers: int = None, progress_callback=None, checkpoint: Path = BULK_CHECKPOINT) -> dict:
+    """
+    Generate questions for many candidates at once.
+    - Candidates are grouped by (tech_stack, keywords, YOE band); Gemini is called once per group,
+      up to max_workers groups at a time.
+    - All questions_json updates are committed in a single eh.update_many() at the end.
+    - Every finished group is saved to `checkpoint`, so re-running after a crash or failed
+      groups only generates what is missing. The checkpoint is removed after a clean run;
+      overwrite=True ignores it and regenerates every group.
+    - candidate_ids=None means every candidate without questions (all of them with overwrite=True).
+    - progress_callback(done_groups, total_groups) is called as groups finish.
+    Returns counts: candidates, groups, generated, reused, failed (list of error strings).
+    """
+    df = eh._load_candidates()
+    if candidate_ids is not None:
+        df = df[df["candidate_id"].isin(candidate_ids)]
+    if not overwrite and "questions_json" in df.columns:
+        missing = df["questions_json"].fillna("").astype(str).str.strip().isin(["", "[]"])
+        df = df[missing]
+
+    groups = {}
+    for candidate in df.to_dict(orient="records"):
+        groups.setdefault(profile_key(candidate), []).append(candidate)
+
+    # overwrite asks for fresh questions, so groups saved by an earlier run don't count
+    done = {} if overwrite else _load_checkpoint(checkpoint, num_questions)
+    reused = sum(1 for key in groups if key in done)
+    todo = {key: members for key, members in groups.items() if key not in done}
+    failed = []
+    finished = len(groups) - len(todo)
+    if progress_callback:
+        progress_callback(finished, len(groups))
+
+    def _generate(members):
+        # Lowest YOE of the group keeps the prompt's difficulty rule for the whole band
+        first = min(members, key=lambda c: _parse_yoe(c.get("yoe")))
+        questions = _questions_for(first, num_questions, seed=first["candidate_id"])
+        if not questions:
+            raise ValueError("Gemini returned no questions")
+        return questions
+
+    workers = max(1, min(max_workers or BULK_MAX_WORKERS, len(todo) or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_generate, members): key for key, members in todo.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                done[key] = future.result()
+                _save_checkpoint(checkpoint, num_questions, done)
+            except Exception as e:
+                failed.append(f"{key}: {e}")
+            finished += 1
+            if progress_callback:
+                progress_callback(finished, len(groups))
+
+    updates = {
+        c["candidate_id"]: {"questions_json": done[key], "transcript_json": []}
+        for key, members in groups.items() if key in done
+        for c in members
+    }
+    eh.update_many(updates)
+    if not failed:
+        Path(checkpoint).unlink(missing_ok=True)
+
+    return {
+        "candidates": len(updates),
+        "groups": len(groups),
+        "generated": len(todo) - len(failed),
+        "reused": reused,
+        "failed": failed,
+    }
+
+
+def clean_question_sets(candidate_ids: list = None, threshold: float = DEFAULT_THRESHOLD) -> dict:
+    """
+    Batch clean-up of stored questions_json:
+    - near-duplicates inside a candidate's set are removed;
+    - a paraphrase of a question already seen for another candidate AT THE SAME DIFFICULTY
+      is replaced by that first wording, so the roster shares one text per question.
+      Questions without a difficulty tag are only de-duplicated within their own set.
+    One LSH index per difficulty is shared across all candidates (sub-linear lookup per
+    question) and every changed row is written with a single eh.update_many().
+    """
+    df = eh._load_candidates()
+    if candidate_ids is not None:
+        df = df[df["candidate_id"].isin(candidate_ids)]
+
+    hasher = MinHasher()
+    rosters = {}    # difficulty -> LSHIndex over the first wordings seen
+    canonical = {}  # difficulty -> [first question seen], indexed by roster key
+    updates, removed, merged = {}, 0, 0
+    for candidate in df.to_dict(orient="records"):
+        raw = candidate.get("questions_json")
+        try:
+            questions = json.loads(raw) if isinstance(raw, str) and raw.strip() else []
+        except ValueError:
+            continue
+        if not isinstance(questions, list) or not questions:
             continue
-        # Remove leading numbering (e.g., "1. ")
-        q_text = line.split(". ", 1)[-1] if ". " in line else line
-        structured_questions.append({
-            "question": q_text,
-            "answer": "",   # empty placeholder
-            "score": None,
-            "strengths": [],
-            "weaknesses": []
-        })
 
-    # Update candidate in Excel
-    eh.update_candidate(candidate_id, {
-        "questions_json": structured_questions,
-        "transcript_json": []  # initialize empty transcript
-    })
+        own = LSHIndex(threshold, hasher=hasher)
+        cleaned, seen_here, changed = [], set(), False
+        for q in questions:
+            q = dict(q) if isinstance(q, dict) else _blank_question(str(q))
+            sig = hasher.signature(q.get("question", ""))
+            if own.find_duplicate(signature=sig) is not None:
+                removed += 1
+                changed = True
+                continue
+            difficulty = q.get("difficulty")
+            if difficulty:
+                roster = rosters.setdefault(difficulty, LSHIndex(threshold, hasher=hasher))
+                firsts = canonical.setdefault(difficulty, [])
+                key = roster.find_duplicate(signature=sig)
+                if key is None:
+                    key = len(firsts)
+                    firsts.append(q)
+                    roster.add(key, signature=sig)
+                if (difficulty, key) in seen_here:  # two paraphrases of one roster question
+                    removed += 1
+                    changed = True
+                    continue
+                seen_here.add((difficulty, key))
+                first = firsts[key]
+                if q.get("question") != first.get("question"):
+                    q["question"] = first.get("question")
+                    # Keep the bank reference in step with the wording
+                    if "question_id" in first:
+                        q["question_id"] = first["question_id"]
+                    else:
+                        q.pop("question_id", None)
+                    merged += 1
+                    changed = True
+            own.add(len(cleaned), signature=sig)
+            cleaned.append(q)
+        if changed:
+            updates[candidate["candidate_id"]] = {"questions_json": cleaned}
 
-    return structured_questions
+    eh.update_many(updates)
+    return {"candidates_changed": len(updates), "removed": removed, "merged": merged,
+            "distinct_questions": sum(len(firsts) for firsts in canonical.values())}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate interview questions for the whole roster.")
+    parser.add_argument("candidate_ids", nargs="*", help="Only these candidates (default: all without questions)")
+    parser.add_argument("--num", type=int, default=5, help="Questions per candidate")
+    parser.add_argument("--workers", type=int, default=BULK_MAX_WORKERS)
+    parser.add_argument("--overwrite", action="store_true", help="Regenerate even if questions exist")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Only clean near-duplicate questions in stored questions_json")
+    args = parser.parse_args()
+
+    if args.dedupe:
+        result = clean_question_sets(args.candidate_ids or None)
+        print(f"✅ {result['candidates_changed']} candidates cleaned: {result['removed']} duplicates removed, "
+              f"{result['merged']} paraphrases merged ({result['distinct_questions']} distinct questions)")
+        raise SystemExit(0)
+
+    result = generate_bulk(
+        args.candidate_ids or None, args.num, args.overwrite, args.workers,
+        progress_callback=lambda d, t: print(f"  {d}/{t} groups", flush=True),
+    )
+    print(f"✅ {result['candidates']} candidates updated from {result['groups']} profile groups "
+          f"({result['generated']} generated, {result['reused']} resumed)")
+    for error in result["failed"]:
+        print(f"⚠️ {error}")
+    if result["failed"]:
+        print("Re-run the command to retry the failed groups.")
@@ -0,0 +1,173 @@
+"""
+Session stores for the Flask interview server.
+
+MemorySessionStore: per-process LRU with idle TTL (bounded memory, single worker).
+SQLiteSessionStore: shared file, so several gunicorn workers see the same sessions.
+Records are plain dicts serialized as compact JSON.
+"""
+from pathlib import Path
+from collections import OrderedDict
+from contextlib import closing
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from utils import settings
+
+
+def _dumps(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+class SessionStore:
+    """Interface: get/put/pop by session id. Records are copies, call put() to persist changes."""
+
+    def get(self, session_id: str):
+        raise NotImplementedError
+
+    def put(self, session_id: str, record: dict):
+        raise NotImplementedError
+
+    def pop(self, session_id: str):
+        raise NotImplementedError
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """LRU + TTL session store; abandoned sessions expire after ttl_seconds idle."""
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 2 * 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()  # session_id -> (last_access, serialized record)
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        # Oldest entries sit at the front of the OrderedDict
+        while self._data:
+            sid, (ts, _) = next(iter(self._data.items()))
+            if now - ts <= self.ttl_seconds:
+                break
+            del self._data[sid]
+
+    def get(self, session_id):
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            item = self._data.get(session_id)
+            if item is None:
+                return None
+            self._data[session_id] = (now, item[1])
+            self._data.move_to_end(session_id)
+            return json.loads(item[1])
+
+    def put(self, session_id, record):
+        now = time.time()
+        with self._lock:
+            self._data[session_id] = (now, _dumps(record))
+            self._data.move_to_end(session_id)
+            self._expire(now)
+            while len(self._data) > self.max_sessions:
+                self._data.popitem(last=False)
+
+    def pop(self, session_id):
+        with self._lock:
+            item = self._data.pop(session_id, None)
+        return json.loads(item[1]) if item else None
+
+    def __len__(self):
+        with self._lock:
+            self._expire(time.time())
+            return len(self._data)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store in a shared SQLite file (safe across processes), with idle TTL."""
+
+    def __init__(self, path: Path, ttl_seconds: float = 2 * 3600, purge_every: int = 100):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.purge_every = purge_every
+        self._writes = 0
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sessions ("
+                    "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated)")
+            self._initialized = True
+        return conn
+
+    def purge_expired(self):
+        with closing(self._connect()) as conn, conn:
+            return conn.execute(
+                "DELETE FROM sessions WHERE updated < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+
+    def get(self, session_id):
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ? AND updated >= ?",
+                (session_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE sessions SET updated = ? WHERE session_id = ?", (time.time(), session_id))
+        return json.loads(row[0])
+
+    def put(self, session_id, record):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, updated) VALUES (?, ?, ?)",
+                (session_id, _dumps(record), time.time()),
+            )
+        self._writes += 1
+        if self.purge_every and self._writes % self.purge_every == 0:
+            self.purge_expired()
+
+    def pop(self, session_id):
+        """Remove and return a session; of several workers popping the same one, only one gets it."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ? AND updated >= ?",
+                (session_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+            if row is None or conn.execute(
+                "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+            ).rowcount != 1:
+                return None
+        return json.loads(row[0])
+
+    def __len__(self):
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE updated >= ?", (time.time() - self.ttl_seconds,)
+            ).fetchone()[0]
+
+
+def create_session_store():
+    """Build the store selected by SESSION_STORE ("memory" default, or "sqlite")."""
+    kind = os.getenv("SESSION_STORE", "memory").lower()
+    ttl = float(os.getenv("SESSION_TTL", str(2 * 3600)))
+    if kind == "memory":
+        return MemorySessionStore(max_sessions=int(os.getenv("SESSION_MAX", "10000")), ttl_seconds=ttl)
+    if kind == "sqlite":
+        default_path = settings.data_path("sessions.db")
+        return SQLiteSessionStore(Path(os.getenv("SESSION_DB", str(default_path))), ttl_seconds=ttl)
+    raise ValueError(f"Unknown SESSION_STORE: {kind}")
@@ -0,0 +1,77 @@
+"""
+Process-wide settings, resolved once on first use.
+
+Secrets (GEMINI_API_KEY) come from Streamlit's secrets.toml or the environment
+(plus a .env file). Inside a Streamlit app st.secrets is used; everywhere else
+the TOML files are read directly, so the Flask server and CLI tools never import
+Streamlit. Importing this module reads nothing and touches no files.
+"""
+from functools import lru_cache
+from pathlib import Path
+import os
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# Local runtime data (SQLite stores, caches, backups); created by whichever store writes first
+DATA_DIR = Path(os.getenv("DATA_DIR", PROJECT_ROOT / "data"))
+
+
+def data_path(name: str) -> Path:
+    return DATA_DIR / name
+
+
+def _secrets_files():
+    # Same locations Streamlit reads; the project file overrides the user-wide one
+    return [Path.home() / ".streamlit" / "secrets.toml", Path.cwd() / ".streamlit" / "secrets.toml",
+            PROJECT_ROOT / ".streamlit" / "secrets.toml"]
+
+
+@lru_cache(maxsize=None)
+def _secrets() -> dict:
+    if "streamlit" not in sys.modules:
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11: let Streamlit parse the files
+            tomllib = None
+        if tomllib is not None:
+            merged = {}
+            for path in dict.fromkeys(_secrets_files()):
+                if path.is_file():
+                    with open(path, "rb") as fh:
+                        merged.update(tomllib.load(fh))
+            return merged
+    import streamlit as st
+    try:
+        return st.secrets.to_dict()
+    except (FileNotFoundError, KeyError):
+        # StreamlitSecretNotFoundError (no secrets.toml) is a FileNotFoundError
+        return {}
+
+
+@lru_cache(maxsize=None)
+def load_env():
+    """Load .env into os.environ (once; existing variables win)."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def get(name: str, default=None):
+    """Secret / setting `name`: secrets.toml first, then the environment (.env included)."""
+    value = _secrets().get(name)
+    if value in (None, ""):
+        load_env()
+        value = os.getenv(name)
+    return value if value not in (None, "") else default
+
+
+def gemini_api_key():
+    return get("GEMINI_API_KEY")
+
+
+def reload():
+    """Forget resolved values (tests, or after editing secrets.toml / .env)."""
+    _secrets.cache_clear()
+    load_env.cache_clear()
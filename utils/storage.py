@@ -0,0 +1,768 @@
+import pandas as pd
+from pathlib import Path
+from contextlib import closing, nullcontext
+import datetime
+import json
+import os
+import sqlite3
+import tempfile
+
+from utils.backup import NoBackupPolicy
+from utils.file_lock import FileLock
+
+# Columns every candidate row is expected to carry
+BASE_COLUMNS = [
+    "candidate_id", "name", "email", "tech_stack", "keywords", "yoe",
+    "interview_link", "status", "questions_json", "transcript_json",
+    "summary_json", "score", "timestamp", "last_interview_json",
+    "interview_history", "row_version",
+]
+
+# Columns initialised empty when missing from a loaded sheet
+REQUIRED_COLUMNS = ["transcript_json", "summary_json", "status", "timestamp"]
+
+
+class ConflictError(Exception):
+    """A row changed since the caller read it (compare-and-swap update refused)."""
+
+    def __init__(self, candidate_id, expected, actual):
+        super().__init__(f"Candidate {candidate_id} is at version {actual}, expected {expected}.")
+        self.candidate_id = candidate_id
+        self.expected = expected
+        self.actual = actual
+
+
+def row_version(row) -> int:
+    """Version counter of a candidate row (rows written before versioning count as 0)."""
+    try:
+        return int(float((row or {}).get("row_version") or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _check_versions(current: dict, expected_versions: dict):
+    """Raise ConflictError unless every {candidate_id: version} in expected_versions still holds."""
+    for candidate_id, expected in (expected_versions or {}).items():
+        if candidate_id not in current:
+            raise ValueError(f"Candidate {candidate_id} not found.")
+        if current[candidate_id] != expected:
+            raise ConflictError(candidate_id, expected, current[candidate_id])
+
+
+def _quote(name: str) -> str:
+    """Quote an SQL identifier (column names come from the sheet / callers)."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _file_signature(*paths):
+    """(mtime_ns, size) for each path; changes whenever any file is rewritten."""
+    sig = []
+    for p in paths:
+        try:
+            st = Path(p).stat()
+            sig.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            sig.append(None)
+    return tuple(sig)
+
+
+# Legacy per-candidate JSON blob columns replaced by the interview tables
+INTERVIEW_BLOB_COLUMNS = ["last_interview_json", "transcript_json", "summary_json", "interview_history"]
+
+
+def _load_json(raw, default):
+    """json.loads for a stored cell; empty / malformed values give `default`."""
+    if isinstance(raw, (list, dict)):
+        return raw
+    if not isinstance(raw, str) or not raw.strip():
+        return default
+    try:
+        return json.loads(raw)
+    except (ValueError, TypeError):
+        return default
+
+
+def _like_prefix(text: str) -> str:
+    """LIKE pattern matching values that start with `text` (wildcards escaped)."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def filter_candidates(df: pd.DataFrame, status=None, tech_stack=None, since=None, until=None,
+                      prefix=None, limit=None, offset=0):
+    """
+    In-memory version of CandidateStore.query() for a loaded DataFrame.
+    Returns (page DataFrame, total matching rows).
+    """
+    mask = pd.Series(True, index=df.index)
+    if status:
+        mask &= df["status"].fillna("").str.lower() == status.lower()
+    if tech_stack and "tech_stack" in df.columns:
+        mask &= df["tech_stack"].fillna("").str.lower() == tech_stack.lower()
+    if since:
+        mask &= df["timestamp"].fillna("") >= str(since)
+    if until:
+        mask &= (df["timestamp"].fillna("") != "") & (df["timestamp"].fillna("") <= str(until))
+    if prefix:
+        p = prefix.lower()
+        name = df["name"].fillna("").str.lower() if "name" in df.columns else pd.Series("", index=df.index)
+        email = df["email"].fillna("").str.lower() if "email" in df.columns else pd.Series("", index=df.index)
+        mask &= name.str.startswith(p) | email.str.startswith(p)
+    matched = df[mask]
+    end = None if limit is None else offset + limit
+    return matched.iloc[offset:end], len(matched)
+
+
+def _to_cell(val):
+    """Coerce a python value into something both Excel and SQLite accept."""
+    if val is None or isinstance(val, (str, int, float)):
+        return val
+    return str(val)
+
+
+class CandidateStore:
+    """
+    Base interface for candidate storage backends.
+    All values passed to update/update_many are already serialized (no dict/list).
+    `indexed` tells callers whether get() is cheaper than a full load_all().
+    Writes are reported to `backup_policy` (see utils/backup.py).
+    Every row update bumps the row's `row_version`; update_many(expected_versions=...)
+    only writes if the given rows are still at those versions (compare-and-swap).
+    """
+
+    indexed = False
+    backup_policy = NoBackupPolicy()
+    _lock = None
+
+    def lock(self):
+        """Context manager held around read-modify-write sequences (cross-process for file stores)."""
+        return self._lock or nullcontext()
+
+    def version(self):
+        """Token that changes whenever the underlying data changes on disk."""
+        return None
+
+    def load_all(self) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def save_all(self, df: pd.DataFrame):
+        raise NotImplementedError
+
+    def get(self, candidate_id: str):
+        raise NotImplementedError
+
+    def update(self, candidate_id: str, updates: dict, expected_version: int = None):
+        expected = None if expected_version is None else {candidate_id: expected_version}
+        return self.update_many({candidate_id: updates}, expected)
+
+    def update_many(self, updates_by_id: dict, expected_versions: dict = None):
+        """
+        Apply {candidate_id: {col: value}} in one write; all rows or none.
+        expected_versions {candidate_id: version} may also name rows that are only read:
+        if any of them moved on, ConflictError is raised and nothing is written.
+        """
+        raise NotImplementedError
+
+    def query(self, status=None, tech_stack=None, since=None, until=None, prefix=None,
+              limit=50, offset=0, columns=None):
+        """
+        One page of candidates matching every given filter, ordered as stored.
+        since/until bound the ISO `timestamp`; prefix matches the start of name or email
+        (case-insensitive). Returns (page DataFrame, total matching rows).
+        """
+        page, total = filter_candidates(self.load_all(), status, tech_stack, since, until, prefix, limit, offset)
+        return (page[columns] if columns else page), total
+
+    def distinct(self, column: str) -> list:
+        """Sorted non-empty values of a column (filter choices)."""
+        df = self.load_all()
+        if column not in df.columns:
+            return []
+        return sorted(v for v in df[column].dropna().unique() if str(v).strip())
+
+    # ---------- interviews ----------
+    # Default implementation keeps the legacy JSON columns on the candidate row;
+    # SQLiteCandidateStore overrides these with normalized tables.
+    def record_interview(self, candidate_id: str, transcript: list, summary: dict,
+                         updates: dict = None, keep_history: bool = True):
+        """Store one finished interview (plus optional candidate `updates`, e.g. status) in one write."""
+        changes = {
+            "last_interview_json": json.dumps(transcript, ensure_ascii=False),
+            "transcript_json": json.dumps(transcript, ensure_ascii=False),
+            "summary_json": json.dumps(summary, ensure_ascii=False),
+        }
+        with self.lock():  # history is read-modify-write
+            if keep_history:
+                candidate = self.get(candidate_id) or {}
+                history = _load_json(candidate.get("interview_history"), [])
+                history.append({
+                    "timestamp": summary.get("timestamp") or datetime.datetime.now().isoformat(),
+                    "summary": summary,
+                    "num_questions": len(transcript),
+                })
+                changes["interview_history"] = json.dumps(history, ensure_ascii=False)
+            changes.update(updates or {})
+            self.update_many({candidate_id: changes})
+        return None
+
+    def latest_interview(self, candidate_id: str):
+        """{"transcript": [...], "summary": {...}} of the most recent interview, or None."""
+        return _legacy_latest_interview(self.get(candidate_id))
+
+    def interview_history(self, candidate_id: str) -> list:
+        """Compact records (timestamp, summary, num_questions) of every interview, oldest first."""
+        candidate = self.get(candidate_id) or {}
+        return _load_json(candidate.get("interview_history"), [])
+
+    def latest_answers(self):
+        """Per-answer rows of each candidate's latest interview, or None if not stored separately."""
+        return None
+
+
+def _legacy_latest_interview(candidate):
+    if not candidate:
+        return None
+    transcript = _load_json(candidate.get("last_interview_json"), None) or \
+        _load_json(candidate.get("transcript_json"), [])
+    summary = _load_json(candidate.get("summary_json"), {})
+    if not transcript and not summary:
+        return None
+    return {"transcript": transcript if isinstance(transcript, list) else [],
+            "summary": summary if isinstance(summary, dict) else {}}
+
+
+class ExcelCandidateStore(CandidateStore):
+    """
+    Legacy backend: the whole workbook is the live store (O(rows) per write).
+    Writers take candidates.xlsx.lock for the whole load -> modify -> write, so
+    concurrent sessions / workers can't overwrite each other's rows.
+    """
+
+    def __init__(self, path: Path, backup_policy=None):
+        self.path = Path(path)
+        if backup_policy is not None:
+            self.backup_policy = backup_policy
+        self._lock = FileLock(self.path.with_name(self.path.name + ".lock"))
+
+    def version(self):
+        return _file_signature(self.path)
+
+    def load_all(self):
+        """Load Excel into pandas DataFrame with safe dtypes (avoid float warnings)."""
+        df = pd.read_excel(self.path, engine="openpyxl", dtype=str)
+
+        # Ensure essential columns exist
+        for col in REQUIRED_COLUMNS:
+            if col not in df.columns:
+                df[col] = ""  # initialize empty column
+
+        return df
+
+    def _write(self, df):
+        """Write DataFrame to Excel atomically via temp file + fsync + rename."""
+        fd, tmp_path = tempfile.mkstemp(prefix=".candidates_", suffix=".xlsx", dir=self.path.parent)
+        os.close(fd)
+        try:
+            df.to_excel(tmp_path, index=False, engine="openpyxl")
+            with open(tmp_path, "rb+") as fh:
+                os.fsync(fh.fileno())  # a crash after the rename must not leave a truncated workbook
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def save_all(self, df):
+        """Write DataFrame back to Excel (with backup)."""
+        with self._lock:
+            if self.path.exists():
+                self.backup_policy.ensure_base(self.load_all)
+            self.backup_policy.snapshot(df)
+            self._write(df)
+
+    def get(self, candidate_id: str):
+        df = self.load_all()
+        row = df[df["candidate_id"] == candidate_id]
+        if row.empty:
+            return None
+        return row.iloc[0].to_dict()
+
+    def update_many(self, updates_by_id: dict, expected_versions: dict = None):
+        with self._lock:
+            df = self.load_all()
+            if "row_version" not in df.columns:
+                df["row_version"] = ""
+            df["row_version"] = df["row_version"].astype(object)
+            positions = {}
+            for i, cid in zip(df.index, df["candidate_id"]):
+                positions.setdefault(cid, i)
+            versions = {cid: row_version({"row_version": df.at[positions[cid], "row_version"]})
+                        for cid in expected_versions or {} if cid in positions}
+            _check_versions(versions, expected_versions)
+            self.backup_policy.ensure_base(df.copy)
+            recorded = {}
+            for candidate_id, updates in updates_by_id.items():
+                if candidate_id not in positions:
+                    raise ValueError(f"Candidate {candidate_id} not found.")
+                idx = positions[candidate_id]
+
+                for col, val in updates.items():
+                    # Create column if missing
+                    if col not in df.columns:
+                        df[col] = ""
+                    df[col] = df[col].astype(object)
+                    df.at[idx, col] = _to_cell(val)
+                version = str(row_version({"row_version": df.at[idx, "row_version"]}) + 1)
+                df.at[idx, "row_version"] = version
+                recorded[candidate_id] = {**updates, "row_version": version}
+
+            # Journal only the diff (before the save, still under the lock); the policy
+            # decides when a full snapshot is due
+            self.backup_policy.record(recorded, lambda: df)
+            self._write(df)
+        return True
+
+
+class SQLiteCandidateStore(CandidateStore):
+    """
+    SQLite backend keyed by candidate_id (PRIMARY KEY -> B-tree index),
+    so single-row reads and writes are O(log n) instead of a full workbook rewrite.
+    candidates.xlsx is only used to seed an empty database and for import/export.
+
+    Interviews are normalized into two append-only tables:
+      interviews(interview_id, candidate_id, timestamp, average_score, num_questions, summary)
+      answer_evaluations(interview_id, position, question, answer, score, strengths, weaknesses, feedback)
+    Recording an interview is a handful of INSERTs; nothing grows inside the candidate row.
+    Candidates that predate the tables (JSON columns only) are still read through the old columns
+    until `python -m utils.migrate` moves them over.
+    """
+
+    indexed = True
+
+    def __init__(self, path: Path, seed_excel: Path = None, backup_policy=None):
+        self.path = Path(path)
+        self.seed_excel = Path(seed_excel) if seed_excel else None
+        if backup_policy is not None:
+            self.backup_policy = backup_policy
+        self._initialized = False
+
+    def version(self):
+        # WAL mode: committed writes land in the -wal file before a checkpoint
+        return _file_signature(self.path, f"{self.path}-wal")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_schema(self):
+        if self._initialized:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        cols = ", ".join(f"{_quote(c)} TEXT" for c in BASE_COLUMNS if c != "candidate_id")
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS candidates (candidate_id TEXT PRIMARY KEY, {cols})")
+            self._create_candidate_indexes(conn)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS interviews ("
+                "interview_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "candidate_id TEXT NOT NULL REFERENCES candidates(candidate_id), "
+                "timestamp TEXT NOT NULL, average_score REAL, num_questions INTEGER, summary TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_interviews_candidate ON interviews(candidate_id, timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_interviews_timestamp ON interviews(timestamp)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS answer_evaluations ("
+                "interview_id INTEGER NOT NULL REFERENCES interviews(interview_id), "
+                "position INTEGER NOT NULL, question TEXT, answer TEXT, score REAL, "
+                "strengths TEXT, weaknesses TEXT, feedback TEXT, "
+                "PRIMARY KEY (interview_id, position))"
+            )
+            empty = conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0] == 0
+        self._initialized = True
+
+        # First run: seed from the workbook so existing data carries over
+        if empty and self.seed_excel and self.seed_excel.exists():
+            self.import_excel(self.seed_excel)
+
+    @staticmethod
+    def _create_candidate_indexes(conn):
+        # Admin list filters; NOCASE so case-insensitive LIKE 'abc%' can use the index
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_status ON candidates(status COLLATE NOCASE, timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_timestamp ON candidates(timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_tech ON candidates(tech_stack COLLATE NOCASE)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_name ON candidates(name COLLATE NOCASE)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates(email COLLATE NOCASE)")
+
+    def _columns(self, conn):
+        return [r["name"] for r in conn.execute("PRAGMA table_info(candidates)")]
+
+    def _add_missing_columns(self, conn, columns):
+        existing = set(self._columns(conn))
+        for col in columns:
+            if col not in existing:
+                conn.execute(f"ALTER TABLE candidates ADD COLUMN {_quote(col)} TEXT")
+                existing.add(col)
+
+    def load_all(self):
+        self._ensure_schema()
+        with closing(self._connect()) as conn:
+            return self._read_frame(conn)
+
+    @staticmethod
+    def _read_frame(conn):
+        """All candidates as seen by `conn` (inside a write: including its uncommitted changes)."""
+        df = pd.read_sql_query("SELECT * FROM candidates ORDER BY rowid", conn, dtype=str)
+        for col in REQUIRED_COLUMNS:
+            if col not in df.columns:
+                df[col] = ""
+        return df
+
+    @classmethod
+    def _read_tables(cls, conn):
+        """{table: DataFrame} of everything the backup policy snapshots, as seen by `conn`."""
+        return {
+            "candidates": cls._read_frame(conn),
+            "interviews": pd.read_sql_query("SELECT * FROM interviews ORDER BY interview_id", conn),
+            "answer_evaluations": pd.read_sql_query(
+                "SELECT * FROM answer_evaluations ORDER BY interview_id, position", conn
+            ),
+        }
+
+    def _load_tables(self):
+        with closing(self._connect()) as conn:
+            return self._read_tables(conn)
+
+    def save_all(self, df):
+        """Replace the full table with df (bulk import path, not the per-answer path)."""
+        self._ensure_schema()
+        self.backup_policy.ensure_base(self._load_tables)
+        df = df.astype(object).where(pd.notna(df), None)
+        with closing(self._connect()) as conn, conn:
+            self._add_missing_columns(conn, df.columns)
+            conn.execute("DELETE FROM candidates")
+            if not df.empty:
+                cols = ", ".join(_quote(c) for c in df.columns)
+                marks = ", ".join("?" for _ in df.columns)
+                conn.executemany(
+                    f"INSERT INTO candidates ({cols}) VALUES ({marks})",
+                    [tuple(_to_cell(v) for v in row) for row in df.itertuples(index=False)],
+                )
+            self.backup_policy.snapshot(self._read_tables(conn))
+
+    def add_candidates(self, df) -> int:
+        """INSERT the rows of df whose candidate_id is not stored yet; stored rows are left as they are."""
+        self._ensure_schema()
+        self.backup_policy.ensure_base(self._load_tables)
+        df = df.astype(object).where(pd.notna(df), None)
+        if df.empty:
+            return 0
+        with closing(self._connect()) as conn, conn:
+            self._add_missing_columns(conn, df.columns)
+            conn.execute("BEGIN IMMEDIATE")
+            cols = ", ".join(_quote(c) for c in df.columns)
+            marks = ", ".join("?" for _ in df.columns)
+            added = conn.executemany(
+                f"INSERT OR IGNORE INTO candidates ({cols}) VALUES ({marks})",
+                [tuple(_to_cell(v) for v in row) for row in df.itertuples(index=False)],
+            ).rowcount
+            if added:
+                self.backup_policy.snapshot(self._read_tables(conn))
+        return added
+
+    def get(self, candidate_id: str):
+        self._ensure_schema()
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM candidates WHERE candidate_id = ?", (candidate_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _row_versions(self, conn, candidate_ids):
+        versions = {}
+        for candidate_id in candidate_ids:
+            row = conn.execute("SELECT row_version FROM candidates WHERE candidate_id = ?", (candidate_id,)).fetchone()
+            if row is not None:
+                versions[candidate_id] = row_version(dict(row))
+        return versions
+
+    def _update_row(self, conn, candidate_id, updates, version):
+        """UPDATE one row and bump its version; returns the changes as written."""
+        changes = {**updates, "row_version": str(version + 1)}
+        assignments = ", ".join(f"{_quote(c)} = ?" for c in changes)
+        params = [_to_cell(v) for v in changes.values()] + [candidate_id]
+        conn.execute(f"UPDATE candidates SET {assignments} WHERE candidate_id = ?", params)
+        return changes
+
+    def update_many(self, updates_by_id: dict, expected_versions: dict = None):
+        self._ensure_schema()
+        self.backup_policy.ensure_base(self._load_tables)
+        recorded = {}
+        with closing(self._connect()) as conn, conn:
+            self._add_missing_columns(conn, {c for u in updates_by_id.values() for c in u} | {"row_version"})
+            # SQLite's write lock (taken up front) makes version check + writes atomic across processes
+            conn.execute("BEGIN IMMEDIATE")
+            versions = self._row_versions(conn, set(updates_by_id) | set(expected_versions or {}))
+            _check_versions(versions, expected_versions)
+            for candidate_id, updates in updates_by_id.items():
+                if not updates:
+                    continue
+                if candidate_id not in versions:
+                    # Raising inside the `with conn` block rolls back the whole batch
+                    raise ValueError(f"Candidate {candidate_id} not found.")
+                recorded[candidate_id] = self._update_row(conn, candidate_id, updates, versions[candidate_id])
+            # Journaled while the write lock is held, so entries follow commit order
+            self.backup_policy.record(recorded, lambda: self._read_tables(conn))
+        return True
+
+    def query(self, status=None, tech_stack=None, since=None, until=None, prefix=None,
+              limit=50, offset=0, columns=None):
+        """Indexed WHERE + LIMIT/OFFSET: only the requested page is read and parsed."""
+        self._ensure_schema()
+        where, params = [], []
+        if status:
+            where.append("status = ? COLLATE NOCASE")
+            params.append(status)
+        if tech_stack:
+            where.append("tech_stack = ? COLLATE NOCASE")
+            params.append(tech_stack)
+        if since:
+            where.append("timestamp >= ?")
+            params.append(str(since))
+        if until:
+            where.append("timestamp <= ?")
+            params.append(str(until))
+        if prefix:
+            where.append("(name LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\')")
+            params += [_like_prefix(prefix)] * 2
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+
+        with closing(self._connect()) as conn:
+            select = ", ".join(_quote(c) for c in columns) if columns else "*"
+            total = conn.execute(f"SELECT COUNT(*) FROM candidates{clause}", params).fetchone()[0]
+            page = pd.read_sql_query(
+                f"SELECT {select} FROM candidates{clause} ORDER BY rowid LIMIT ? OFFSET ?",
+                conn, params=params + [-1 if limit is None else limit, offset], dtype=str,
+            )
+        return page, total
+
+    def distinct(self, column):
+        self._ensure_schema()
+        with closing(self._connect()) as conn:
+            if column not in self._columns(conn):
+                return []
+            rows = conn.execute(
+                f"SELECT DISTINCT {_quote(column)} FROM candidates WHERE {_quote(column)} IS NOT NULL "
+                f"AND TRIM({_quote(column)}) != '' ORDER BY 1"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    # ---------- interviews ----------
+    def _insert_interview(self, conn, candidate_id, transcript, summary, timestamp=None, num_questions=None):
+        summary = summary or {}
+        timestamp = timestamp or summary.get("timestamp") or datetime.datetime.now().isoformat()
+        avg = summary.get("average_score")
+        if transcript is not None:
+            num_questions = len(transcript)
+        cur = conn.execute(
+            "INSERT INTO interviews (candidate_id, timestamp, average_score, num_questions, summary) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (candidate_id, timestamp, avg if isinstance(avg, (int, float)) else None,
+             num_questions, json.dumps(summary, ensure_ascii=False)),
+        )
+        interview_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO answer_evaluations "
+            "(interview_id, position, question, answer, score, strengths, weaknesses, feedback) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [_answer_row(interview_id, i, entry) for i, entry in enumerate(transcript or [])],
+        )
+        return interview_id
+
+    def record_interview(self, candidate_id, transcript, summary, updates=None, keep_history=True):
+        """
+        INSERT the interview and its answers; only `updates` touch the candidate row.
+        Every interview is kept, so keep_history has no effect here.
+        The inserted rows are journaled with the row change.
+        """
+        self._ensure_schema()
+        self.backup_policy.ensure_base(self._load_tables)
+        with closing(self._connect()) as conn, conn:
+            self._add_missing_columns(conn, set(updates or {}) | {"row_version"})
+            conn.execute("BEGIN IMMEDIATE")
+            versions = self._row_versions(conn, [candidate_id])
+            if candidate_id not in versions:
+                raise ValueError(f"Candidate {candidate_id} not found.")
+            interview_id = self._insert_interview(conn, candidate_id, transcript, summary)
+            # A new interview counts as a change of the candidate for version checks
+            changes = self._update_row(conn, candidate_id, updates or {}, versions[candidate_id])
+            self.backup_policy.record({candidate_id: changes}, lambda: self._read_tables(conn),
+                                      inserts=self._interview_rows(conn, interview_id))
+        return interview_id
+
+    @staticmethod
+    def _interview_rows(conn, interview_id):
+        """{table: [row dict]} of one interview, in the shape journal entries carry."""
+        return {
+            "interviews": [dict(r) for r in conn.execute(
+                "SELECT * FROM interviews WHERE interview_id = ?", (interview_id,))],
+            "answer_evaluations": [dict(r) for r in conn.execute(
+                "SELECT * FROM answer_evaluations WHERE interview_id = ? ORDER BY position", (interview_id,))],
+        }
+
+    def latest_interview(self, candidate_id):
+        self._ensure_schema()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT interview_id, summary FROM interviews WHERE candidate_id = ? "
+                "ORDER BY timestamp DESC, interview_id DESC LIMIT 1",
+                (candidate_id,),
+            ).fetchone()
+            if row is None:
+                return _legacy_latest_interview(self.get(candidate_id))
+            answers = conn.execute(
+                "SELECT * FROM answer_evaluations WHERE interview_id = ? ORDER BY position",
+                (row["interview_id"],),
+            ).fetchall()
+        return {
+            "interview_id": row["interview_id"],
+            "transcript": [_answer_entry(a) for a in answers],
+            "summary": _load_json(row["summary"], {}),
+        }
+
+    def interview_history(self, candidate_id):
+        self._ensure_schema()
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT timestamp, summary, num_questions FROM interviews WHERE candidate_id = ? "
+                "ORDER BY timestamp, interview_id",
+                (candidate_id,),
+            ).fetchall()
+        if not rows:
+            return super().interview_history(candidate_id)
+        return [
+            {"timestamp": r["timestamp"], "summary": _load_json(r["summary"], {}), "num_questions": r["num_questions"]}
+            for r in rows
+        ]
+
+    def latest_answers(self):
+        """
+        One row per answer of each candidate's latest interview
+        (candidate_id, question_idx, question, score) straight from the indexed tables.
+        """
+        self._ensure_schema()
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                "SELECT i.candidate_id, a.position AS question_idx, a.question, a.score "
+                "FROM interviews i JOIN answer_evaluations a ON a.interview_id = i.interview_id "
+                "WHERE i.interview_id = (SELECT i2.interview_id FROM interviews i2 "
+                "WHERE i2.candidate_id = i.candidate_id ORDER BY i2.timestamp DESC, i2.interview_id DESC LIMIT 1) "
+                "ORDER BY i.candidate_id, a.position",
+                conn,
+            )
+
+    def migrate_interviews(self) -> int:
+        """
+        Move legacy JSON columns of every candidate into the interview tables and clear them.
+        Candidates that already have normalized interviews are left alone. Returns interviews created.
+        """
+        self._ensure_schema()
+        created = 0
+        with closing(self._connect()) as conn, conn:
+            columns = set(self._columns(conn))
+            blob_cols = [c for c in INTERVIEW_BLOB_COLUMNS if c in columns]
+            if not blob_cols:
+                return 0
+            done = {r[0] for r in conn.execute("SELECT DISTINCT candidate_id FROM interviews")}
+            rows = conn.execute(
+                f"SELECT candidate_id, {', '.join(_quote(c) for c in blob_cols)} FROM candidates"
+            ).fetchall()
+            for row in rows:
+                candidate = dict(row)
+                if candidate["candidate_id"] in done:
+                    continue
+                for transcript, summary, timestamp, num_questions in _legacy_interviews(candidate):
+                    self._insert_interview(conn, candidate["candidate_id"], transcript, summary,
+                                           timestamp, num_questions)
+                    created += 1
+            conn.execute(
+                f"UPDATE candidates SET {', '.join(f'{_quote(c)} = NULL' for c in blob_cols)}"
+            )
+            if created:
+                # Many rows moved between tables at once: snapshot rather than journal them
+                self.backup_policy.snapshot(self._read_tables(conn))
+        return created
+
+    def import_excel(self, excel_path: Path):
+        """Replace the candidate rows with those of an Excel workbook (JSON columns are normalized)."""
+        df = pd.read_excel(excel_path, engine="openpyxl", dtype=str)
+        self.save_all(df)
+        self.migrate_interviews()
+        return len(df)
+
+    def export_excel(self, excel_path: Path):
+        """
+        Write the current database contents to an Excel workbook. Interviews are
+        flattened back into the JSON columns so the sheet stays readable offline.
+        """
+        df = self.load_all()
+        for col in INTERVIEW_BLOB_COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+            df[col] = df[col].astype(object)
+        for idx, candidate_id in df["candidate_id"].items():
+            latest = self.latest_interview(candidate_id)
+            if not latest or "interview_id" not in latest:
+                continue
+            transcript = json.dumps(latest["transcript"], ensure_ascii=False)
+            df.at[idx, "last_interview_json"] = transcript
+            df.at[idx, "transcript_json"] = transcript
+            df.at[idx, "summary_json"] = json.dumps(latest["summary"], ensure_ascii=False)
+            df.at[idx, "interview_history"] = json.dumps(self.interview_history(candidate_id), ensure_ascii=False)
+        df.to_excel(excel_path, index=False, engine="openpyxl")
+        return len(df)
+
+
+def _answer_row(interview_id, position, entry):
+    entry = entry if isinstance(entry, dict) else {"answer": str(entry)}
+    score = entry.get("score")
+    return (
+        interview_id, position, entry.get("question"), entry.get("answer"),
+        score if isinstance(score, (int, float)) else None,
+        json.dumps(entry.get("strengths") or [], ensure_ascii=False),
+        json.dumps(entry.get("weaknesses") or [], ensure_ascii=False),
+        entry.get("feedback"),
+    )
+
+
+def _answer_entry(row):
+    """answer_evaluations row -> transcript entry in the shape conduct_interview produces."""
+    entry = {
+        "question": row["question"],
+        "answer": row["answer"],
+        "score": row["score"],
+        "strengths": _load_json(row["strengths"], []),
+        "weaknesses": _load_json(row["weaknesses"], []),
+    }
+    if row["feedback"] is not None:
+        entry["feedback"] = row["feedback"]
+    return entry
+
+
+def _legacy_interviews(candidate):
+    """
+    Split a candidate's JSON columns into (transcript, summary, timestamp, num_questions)
+    interviews, oldest first.
+    Only the latest interview has a full transcript; older history records carry the summary only.
+    """
+    latest = _legacy_latest_interview(candidate)
+    history = _load_json(candidate.get("interview_history"), [])
+    history = [h for h in history if isinstance(h, dict)] if isinstance(history, list) else []
+
+    interviews = []
+    for i, record in enumerate(history):
+        summary = record.get("summary") if isinstance(record.get("summary"), dict) else {}
+        is_last = i == len(history) - 1
+        transcript = latest["transcript"] if (is_last and latest) else None
+        interviews.append((transcript, summary, record.get("timestamp"), record.get("num_questions")))
+    if latest and not history:
+        interviews.append((latest["transcript"], latest["summary"], latest["summary"].get("timestamp"), None))
+    return interviews
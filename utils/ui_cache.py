@@ -0,0 +1,98 @@
+"""
+Streamlit caches shared by app_streamlit.py and app_admin.py.
+
+Every cached function takes the current eh.data_version() as an argument, so a
+rerun with unchanged data is served from memory and any write (this process or
+another) produces a new key. invalidate() drops everything right after a write
+the page itself made, instead of waiting for stale entries to age out.
+"""
+import json
+
+import pandas as pd
+import streamlit as st
+
+from utils import analytics
+from utils import excel_handler as eh
+from utils import job_queue as jq
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _candidate(candidate_id, version):
+    return eh.get_candidate(candidate_id)
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _query(filters, limit, offset, columns, version):
+    return eh.query_candidates(**dict(filters), limit=limit, offset=offset, columns=list(columns) if columns else None)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _distinct(column, version):
+    return eh.distinct_values(column)
+
+
+# What app_admin.py renders from analytics.cohort_summary(); the per-answer facts table is not cached
+COHORT_KEYS = ("answers", "candidates", "mean_score", "percentiles", "distribution",
+               "by_keyword", "by_tech_stack", "by_yoe")
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _cohort(version):
+    summary = analytics.cohort_summary(eh._load_candidates(), answers=eh.load_latest_answers())
+    return {key: summary[key] for key in COHORT_KEYS}
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _interview_view(candidate_id, version):
+    latest = eh.get_latest_interview(candidate_id) or {}
+    transcript = latest.get("transcript") or []
+    summary = latest.get("summary") or {}
+    history = eh.get_interview_history(candidate_id)
+    transcript_df = pd.DataFrame(transcript) if isinstance(transcript, list) and transcript else None
+    return {
+        "transcript_df": transcript_df,
+        "transcript_csv": transcript_df.to_csv(index=False).encode("utf-8") if transcript_df is not None else None,
+        "summary": summary if isinstance(summary, dict) else {},
+        "summary_json": json.dumps(summary, indent=2),
+        "history": history,
+        "history_json": json.dumps(history, indent=2),
+    }
+
+
+@st.cache_data(show_spinner=False, ttl=2, max_entries=256)
+def _latest_job(candidate_id, kind):
+    # Jobs change outside this process without touching the candidate store: short TTL
+    return jq.latest_job(candidate_id, kind=kind)
+
+
+def get_candidate(candidate_id: str):
+    return _candidate(candidate_id, eh.data_version())
+
+
+def query_candidates(limit=50, offset=0, columns=None, **filters):
+    """Cached eh.query_candidates(); returns (page DataFrame, total)."""
+    key = tuple(sorted(filters.items()))
+    return _query(key, limit, offset, tuple(columns) if columns else None, eh.data_version())
+
+
+def distinct_values(column: str) -> list:
+    return _distinct(column, eh.data_version())
+
+
+def cohort_summary() -> dict:
+    return _cohort(eh.data_version())
+
+
+def interview_view(candidate_id: str) -> dict:
+    """Latest transcript table, summary, history and their download payloads for one candidate."""
+    return _interview_view(candidate_id, eh.data_version())
+
+
+def latest_job(candidate_id: str, kind: str = None):
+    return _latest_job(candidate_id, kind)
+
+
+def invalidate():
+    """Drop all cached views (call after the page itself writes candidate data)."""
+    for fn in (_candidate, _query, _distinct, _cohort, _interview_view, _latest_job):
+        fn.clear()
@@ -0,0 +1,232 @@
+"""
+Write-behind buffer for candidate updates.
+
+Updates are appended to a durable log and merged into an in-memory set of dirty
+rows; a background thread writes all dirty rows to the store in ONE update_many()
+every `interval` seconds, or as soon as `max_dirty` rows are waiting. A burst of
+set_status / append_transcript / summary writes therefore costs one workbook save
+instead of one per call. Readers overlay overlay()/pending() on the stored rows.
+
+Log layout (one directory per store):
+    <pid>.lock          held by the owning process while it runs
+    <pid>-<seq>.log     JSON lines {"ts": ..., "updates": {candidate_id: {col: value}}}
+A flush closes the current segment and deletes it once the store write succeeded.
+Segments whose owner lock is free belong to a process that died before flushing;
+start() replays them into the store.
+"""
+from pathlib import Path
+import datetime
+import json
+import os
+import threading
+import traceback
+
+from utils import metrics
+from utils.file_lock import FileLock, LockTimeout
+
+WRITE_BEHIND_FLUSHES = metrics.counter("write_behind_flushes_total", "Write-behind flushes to the store", ["trigger"])
+WRITE_BEHIND_UPDATES = metrics.counter("write_behind_updates_total", "Updates accepted into the write-behind buffer")
+WRITE_BEHIND_DROPPED = metrics.counter(
+    "write_behind_dropped_total", "Buffered row updates dropped because the row was deleted before the flush"
+)
+
+
+def _segment_seq(path: Path) -> int:
+    return int(path.stem.rsplit("-", 1)[1])
+
+
+def read_segments(segments) -> dict:
+    """Merge the updates of log segments (oldest first); a torn last line is skipped."""
+    merged = {}
+    for segment in sorted(segments, key=_segment_seq):
+        with open(segment, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # crash mid-append
+                for candidate_id, updates in entry.get("updates", {}).items():
+                    merged.setdefault(candidate_id, {}).update(updates)
+    return merged
+
+
+class WriteBehindBuffer:
+    """
+    flush_fn({candidate_id: {col: value}}) writes a batch to the store and raises on failure;
+    failed batches stay buffered (and logged) and are retried on the next flush. It returns
+    the ids of rows that no longer exist, which are dropped and counted in stats["dropped"].
+    exists(candidate_id) -> bool, if given, makes put() reject unknown rows with ValueError.
+    """
+
+    def __init__(self, flush_fn, log_dir: Path, interval: float = 2.0, max_dirty: int = 100, fsync: bool = True,
+                 exists=None):
+        self.flush_fn = flush_fn
+        self.exists = exists
+        self.log_dir = Path(log_dir)
+        self.interval = interval
+        self.max_dirty = max_dirty
+        self.fsync = fsync
+        self.stats = {"updates": 0, "flushes": 0, "rows_flushed": 0, "replayed": 0, "dropped": 0}
+        self._lock = threading.Lock()        # dirty rows + current segment
+        self._flush_lock = threading.Lock()  # one flush at a time
+        self._dirty = {}
+        self._flushing = {}
+        self._log = None
+        self._seq = 0
+        self._closed_segments = []
+        self._owner = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------- lifecycle ----------
+    def start(self):
+        """Take ownership of this process' log, replay logs of dead processes, start the flusher."""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._owner = FileLock(self.log_dir / f"{os.getpid()}.lock", timeout=0)
+        self._owner.acquire()
+        self.replay()
+        if self.interval and self.interval > 0:
+            self._thread = threading.Thread(target=self._loop, daemon=True, name="write-behind")
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop the flusher and write everything out. Logs are kept if the final flush fails."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.flush(trigger="close")
+        finally:
+            with self._lock:
+                self._close_segment()
+            if self._owner is not None:
+                self._owner.release()
+                if not self._closed_segments:
+                    (self.log_dir / f"{os.getpid()}.lock").unlink(missing_ok=True)
+                self._owner = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush(trigger="interval")
+            except Exception:
+                # Still in the buffer and the log; retried on the next tick
+                traceback.print_exc()
+
+    # ---------- writes ----------
+    def _segment(self):
+        if self._log is None:
+            self._seq += 1
+            self._log = open(self.log_dir / f"{os.getpid()}-{self._seq}.log", "a", encoding="utf-8")
+        return self._log
+
+    def _close_segment(self):
+        if self._log is not None:
+            self._log.close()
+            self._closed_segments.append(Path(self._log.name))
+            self._log = None
+
+    def put(self, updates_by_id: dict):
+        """Log and buffer {candidate_id: {col: value}} (values already serialized)."""
+        if self.exists is not None:
+            for candidate_id in updates_by_id:
+                if not self.exists(candidate_id):
+                    raise ValueError(f"Candidate {candidate_id} not found.")
+        line = json.dumps({"ts": datetime.datetime.now().isoformat(), "updates": updates_by_id},
+                          ensure_ascii=False, default=str)
+        with self._lock:
+            log = self._segment()
+            log.write(line + "\n")
+            log.flush()
+            if self.fsync:
+                os.fsync(log.fileno())  # durable before the caller sees success
+            for candidate_id, updates in updates_by_id.items():
+                self._dirty.setdefault(candidate_id, {}).update(updates)
+            self.stats["updates"] += 1
+            full = len(self._dirty) >= self.max_dirty
+        WRITE_BEHIND_UPDATES.inc()
+        if full:
+            self.flush(trigger="size")
+
+    def flush(self, trigger: str = "explicit") -> int:
+        """Write all dirty rows in one flush_fn call; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return 0
+                batch, self._dirty = self._dirty, {}
+                self._flushing = batch
+                self._close_segment()
+                segments = list(self._closed_segments)
+            try:
+                dropped = self.flush_fn(batch)
+            except BaseException:
+                with self._lock:
+                    # Newer updates that arrived during the failed flush win
+                    for candidate_id, updates in self._dirty.items():
+                        batch.setdefault(candidate_id, {}).update(updates)
+                    self._dirty = batch
+                    self._flushing = {}
+                raise
+            with self._lock:
+                self._flushing = {}
+                self._closed_segments = [s for s in self._closed_segments if s not in segments]
+                self.stats["flushes"] += 1
+                self.stats["rows_flushed"] += len(batch)
+            self._count_dropped(dropped)
+            for segment in segments:
+                segment.unlink(missing_ok=True)
+        WRITE_BEHIND_FLUSHES.inc(trigger=trigger)
+        return len(batch)
+
+    def _count_dropped(self, dropped):
+        if dropped:
+            with self._lock:
+                self.stats["dropped"] += len(dropped)
+            WRITE_BEHIND_DROPPED.inc(len(dropped))
+
+    # ---------- reads ----------
+    def overlay(self, candidate_id: str) -> dict:
+        """Buffered (not yet stored) values of one row."""
+        with self._lock:
+            merged = dict(self._flushing.get(candidate_id, {}))
+            merged.update(self._dirty.get(candidate_id, {}))
+        return merged
+
+    def pending(self) -> dict:
+        """Buffered values of every dirty row."""
+        with self._lock:
+            merged = {cid: dict(updates) for cid, updates in self._flushing.items()}
+            for candidate_id, updates in self._dirty.items():
+                merged.setdefault(candidate_id, {}).update(updates)
+        return merged
+
+    # ---------- recovery ----------
+    def replay(self) -> int:
+        """Apply and remove logs of processes that exited without flushing; returns rows replayed."""
+        replayed = 0
+        own = str(os.getpid())
+        owners = {p.name.split("-", 1)[0] for p in self.log_dir.glob("*-*.log")}
+        for pid in sorted(owners):
+            lock = None
+            if pid != own:  # our own leftovers: an earlier process with the same pid
+                lock = FileLock(self.log_dir / f"{pid}.lock", timeout=0)
+                try:
+                    lock.acquire()
+                except LockTimeout:
+                    continue  # owner still running
+            try:
+                segments = list(self.log_dir.glob(f"{pid}-*.log"))
+                updates = read_segments(segments)
+                if updates:
+                    self._count_dropped(self.flush_fn(updates))
+                for segment in segments:
+                    segment.unlink()
+                replayed += len(updates)
+            finally:
+                if lock is not None:
+                    lock.release()
+                    (self.log_dir / f"{pid}.lock").unlink(missing_ok=True)
+        self.stats["replayed"] += replayed
+        return replayed